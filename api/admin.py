@@ -15,6 +15,7 @@ class CoursesAdmin(admin.ModelAdmin):
 class LessonFile(admin.StackedInline):
     model = LessonFile
     extra = 1
+    readonly_fields = ('metadata',)
 
 
 @admin.register(Lessons)
@@ -61,4 +62,23 @@ class CommentsAdmin(admin.ModelAdmin):
                 kwargs['empty_label'] = 'Tanlang'
             else:
                 kwargs['empty_label'] = "Mavjud emas"
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
\ No newline at end of file
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(LessonNotification)
+class LessonNotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'lesson', 'status', 'attempts', 'created_at', 'sent_at')
+    list_display_links = ('id', 'lesson')
+    list_filter = ('status',)
+    readonly_fields = ('lessons', 'last_user_id', 'attempts', 'error', 'created_at', 'sent_at')
+    actions_on_top = False
+    actions_on_bottom = True
+
+
+@admin.register(Upload)
+class UploadAdmin(admin.ModelAdmin):
+    list_display = ('id', 'filename', 'lesson', 'offset', 'length', 'updated_at')
+    list_display_links = ('id', 'filename')
+    readonly_fields = ('offset', 'length', 'lesson_file', 'created_at', 'updated_at')
+    actions_on_top = False
+    actions_on_bottom = True
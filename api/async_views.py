@@ -0,0 +1,150 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+from django.urls import re_path
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+
+
+class AsyncReadMixin:
+    '''
+    AsyncReadMixin - viewsetga list va retrieve amallarining async (alist, aretrieve) variantlarini qo'shadi.
+
+    Autentifikatsiya, ruxsatlar, throttle va filterlar avvalgidek sinxron ishlaydi (sync_to_async orqali), bazadan
+    o'qish esa async ORM (acount, aget, async for) bilan bajariladi. Shu sababli bitta ASGI worker bazani kutayotgan
+    ko'plab so'rovlarni bir vaqtda xizmat qila oladi. Javoblar sinxron list/retrieve bilan bir xil bo'ladi.
+    '''
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f'a{self.action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self):
+        return await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        try:
+            obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+
+        self.check_object_permissions(self.request, obj)
+
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+        return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+
+    async def aserialize(self, *args, **kwargs):
+        '''
+        aserialize - serializer.data ni oqimda hisoblaydi: ko'p qatorli sahifani serializatsiya qilish event loop ni
+        (va shu workerdagi boshqa so'rovlarni) to'xtatib qo'ymaydi.
+        '''
+
+        return await sync_to_async(lambda: self.get_serializer(*args, **kwargs).data)()
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset()
+        page = await self.apaginate_queryset(queryset)
+
+        if page is not None:
+            return self.get_paginated_response(await self.aserialize(page, many=True))
+
+        return Response(await self.aserialize([obj async for obj in queryset], many=True))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aserialize(instance))
+
+
+def as_async_view(viewset_class, actions, **initkwargs):
+    '''
+    as_async_view - ViewSet.as_view ning async varianti. Async varianti (a<action>) bor amallar event loop da,
+    qolganlari (create, update, destroy) esa odatiy sinxron view orqali bajariladi.
+    '''
+
+    if 'get' in actions and 'head' not in actions:
+        actions = {**actions, 'head': actions['get']}
+
+    sync_view = viewset_class.as_view(actions, **initkwargs)
+
+    async def view(request, *args, **kwargs):
+        action = actions.get(request.method.lower())
+
+        if action is None or not hasattr(viewset_class, f'a{action}'):
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+        self = viewset_class(**initkwargs)
+        self.action_map = actions
+
+        for method, name in actions.items():
+            setattr(self, method, getattr(self, name))
+
+        self.request = request
+        self.args = args
+        self.kwargs = kwargs
+
+        return await self.adispatch(request, *args, **kwargs)
+
+    view.cls = viewset_class
+    view.initkwargs = initkwargs
+    view.actions = actions
+
+    return csrf_exempt(view)
+
+
+def async_urlpatterns(router):
+    '''
+    async_urlpatterns - routerda ro'yxatdan o'tgan va AsyncReadMixin dan meros olgan viewsetlar uchun
+    list va detail yo'llarini async view lar bilan qaytaradi. Ular router.urls dan oldin qo'yilishi kerak.
+    '''
+
+    patterns = []
+
+    for prefix, viewset, basename in router.registry:
+        if not issubclass(viewset, AsyncReadMixin):
+            continue
+
+        lookup = router.get_lookup_regex(viewset)
+        trailing_slash = router.trailing_slash
+
+        patterns += [
+            re_path(
+                rf'^{prefix}{trailing_slash}$',
+                as_async_view(viewset, {'get': 'list', 'post': 'create'}, basename=basename, detail=False, suffix='List'),
+                name=f'{basename}-list',
+            ),
+            re_path(
+                rf'^{prefix}/{lookup}{trailing_slash}$',
+                as_async_view(
+                    viewset,
+                    {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'},
+                    basename=basename, detail=True, suffix='Instance',
+                ),
+                name=f'{basename}-detail',
+            ),
+        ]
+
+    return patterns
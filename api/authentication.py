@@ -0,0 +1,108 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .profiling import timing
+
+
+def get_options():
+    return {
+        'TTL': 30,
+        'MAX_SIZE': 10000,
+        **getattr(settings, 'AUTH_USER_CACHE', {}),
+    }
+
+
+class UserCache:
+    '''
+    UserCache - har bir jarayon (process) uchun user_id -> User keshi (LRU, TTL soniya).
+
+    Shu jarayonda foydalanuvchi saqlansa yoki o'chirilsa yozuv darhol o'chiriladi (api.signals), boshqa
+    jarayonlarda esa eskirgan yozuv ko'pi bilan TTL soniya yashaydi. Har bir so'rovga obyektning nusxasi beriladi,
+    shuning uchun view ichida request.user ni o'zgartirish keshdagi obyektga ta'sir qilmaydi.
+    '''
+
+    timer = time.monotonic
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id, loader):
+        options = get_options()
+        key = str(user_id)
+        now = self.timer()
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(key)
+                return copy.copy(entry[0])
+
+        user = loader(user_id)
+
+        with self.lock:
+            self.entries[key] = (user, now + options['TTL'])
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > options['MAX_SIZE']:
+                self.entries.popitem(last=False)
+
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    '''
+    CachedJWTAuthentication - JWTAuthentication bilan bir xil tekshiruvlarni bajaradi, lekin foydalanuvchini har
+    so'rovda bazadan o'qish o'rniga user_cache dan oladi. Tokendagi user_id bo'yicha qator faqat TTL da bir marta o'qiladi.
+
+    is_active, is_staff va parol o'zgarganini tekshirish (CHECK_REVOKE_TOKEN) keshdagi obyekt bo'yicha bajariladi,
+    shuning uchun IsAdminOrReadOnly kabi ruxsatlar avvalgidek ishlaydi.
+    '''
+
+    def authenticate(self, request):
+        with timing('auth'):
+            return super().authenticate(request)
+
+    def load_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id, self.load_user)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
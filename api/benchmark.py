@@ -0,0 +1,61 @@
+import json
+import math
+import time
+
+
+def percentile(values, q):
+    '''
+    percentile - tartiblangan qiymatlar ro'yxatidan q (0..100) foizli qiymatni oladi (nearest-rank).
+    '''
+
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def measure(func, iterations, warmup=0):
+    '''
+    measure - func ni iterations marta chaqirib, o'tkazish qobiliyati (ops/s) va kechikish (ms) statistikasini qaytaradi.
+    '''
+
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    started = time.perf_counter()
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        'iterations': iterations,
+        'seconds': round(elapsed, 6),
+        'per_second': round(iterations / elapsed, 2) if elapsed else None,
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 4) if timings else 0.0,
+        'p50_ms': round(percentile(timings, 50) * 1000, 4),
+        'p99_ms': round(percentile(timings, 99) * 1000, 4),
+    }
+
+
+def report(stdout, results, as_json=False):
+    '''
+    report - natijalarni jadval yoki JSON (boshqa ishga tushirishlar bilan solishtirish uchun) ko'rinishida chiqaradi.
+    '''
+
+    if as_json:
+        stdout.write(json.dumps(results, indent=2, default=str))
+        return
+
+    for name, result in results.items():
+        if not isinstance(result, dict):
+            stdout.write(f"{name}: {result}")
+            continue
+
+        stats = ', '.join(f"{key}={value}" for key, value in result.items())
+        stdout.write(f"{name}: {stats}")
@@ -0,0 +1,242 @@
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from .models import BlacklistedToken
+
+logger = logging.getLogger(__name__)
+
+
+def get_jti(token):
+    '''
+    get_jti - JWT tokenining imzosini tekshirmasdan jti qiymatini oladi. Token noto'g'ri bo'lsa None qaytaradi.
+
+    Imzo bu yerda tekshirilmaydi, chunki jti faqat qora ro'yxatdan qidirish kaliti sifatida ishlatiladi,
+    tokenning haqiqiyligini esa keyinroq JWTAuthentication tekshiradi.
+    '''
+
+    try:
+        return jwt.decode(token, options={'verify_signature': False}).get(api_settings.JTI_CLAIM)
+    except (jwt.InvalidTokenError, AttributeError):
+        return None
+
+
+def token_digest(jti):
+    return hashlib.sha256(str(jti).encode()).hexdigest()
+
+
+class BloomFilter:
+    '''
+    BloomFilter - berilgan sig'im (capacity) va xatolik ehtimoli (error_rate) uchun hisoblangan bit massivi.
+
+    Elementlar SHA-256 hash ko'rinishida beriladi, k ta pozitsiya shu hashdan double hashing orqali olinadi.
+    "Yo'q" javobi har doim aniq, "bor" javobi esa error_rate ehtimol bilan xato bo'lishi mumkin.
+    '''
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest):
+        raw = bytes.fromhex(digest)
+        h1 = int.from_bytes(raw[:8], 'big')
+        h2 = int.from_bytes(raw[8:16], 'big') | 1
+
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class TokenBlacklist:
+    '''
+    TokenBlacklist - har bir jarayon (process) uchun BlacklistedToken jadvalining Bloom filterdagi nusxasi.
+
+    Filter REFRESH_INTERVAL soniyada bir marta blacklisted_at watermarkidan boshlab faqat yangi qatorlar bilan
+    to'ldiriladi (tranzaksiyalar kechikib commit bo'lishi uchun WATERMARK_OVERLAP soniya orqaga qaytib o'qiladi).
+    Filter to'lib qolsa (CAPACITY dan oshsa) yoki REBUILD_INTERVAL soniya o'tsa, o'chirilgan tokenlarni
+    chiqarib tashlash uchun bazadan qaytadan quriladi. Bazaga faqat filter "bor" deganda murojaat qilinadi.
+
+    Logout qilingan token shu jarayonda darhol (LogoutView add() ni chaqiradi), boshqa jarayon va serverlarda esa
+    ularning filteri yangilanganda, ya'ni REFRESH_INTERVAL soniyagacha kechikib rad etiladi. Shu vaqt ichida
+    token boshqa workerlarda hali ishlashi mumkin.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filter = None
+        self.watermark = None
+        self.refreshed_at = 0
+        self.built_at = 0
+
+    @property
+    def options(self):
+        return {
+            'CAPACITY': 100000,
+            'ERROR_RATE': 0.001,
+            'REFRESH_INTERVAL': 1,
+            'WATERMARK_OVERLAP': 5,
+            'REBUILD_INTERVAL': 3600,
+            **getattr(settings, 'TOKEN_BLACKLIST', {}),
+        }
+
+    def refresh(self, force=False):
+        if not force and self.filter is not None and time.monotonic() - self.refreshed_at < self.options['REFRESH_INTERVAL']:
+            return
+
+        if not self.lock.acquire(blocking=self.filter is None or force):
+            return
+
+        try:
+            options = self.options
+
+            rebuild = (
+                self.filter is None
+                or self.filter.count > self.filter.capacity
+                or time.monotonic() - self.built_at > options['REBUILD_INTERVAL']
+            )
+
+            if rebuild:
+                rows = BlacklistedToken.objects.values_list('jti_hash', 'blacklisted_at')
+                bloom = BloomFilter(max(options['CAPACITY'], 2 * rows.count()), options['ERROR_RATE'])
+                watermark = None
+                self.built_at = time.monotonic()
+            else:
+                since = self.watermark - timedelta(seconds=options['WATERMARK_OVERLAP'])
+                rows = BlacklistedToken.objects.filter(blacklisted_at__gte=since).values_list('jti_hash', 'blacklisted_at')
+                bloom = self.filter
+                watermark = self.watermark
+
+            for digest, blacklisted_at in rows.iterator():
+                bloom.add(digest)
+                watermark = blacklisted_at if watermark is None else max(watermark, blacklisted_at)
+
+            self.filter = bloom
+            self.watermark = watermark or self.watermark or timezone.now()
+            self.refreshed_at = time.monotonic()
+        finally:
+            self.lock.release()
+
+    def add(self, digest):
+        self.refresh()
+
+        with self.lock:
+            self.filter.add(digest)
+
+    def contains_digest(self, digest):
+        self.refresh()
+
+        if digest not in self.filter:
+            return False
+
+        return BlacklistedToken.objects.filter(jti_hash=digest).exists()
+
+    def contains(self, token):
+        jti = get_jti(token)
+
+        if jti is None:
+            return False
+
+        return self.contains_digest(token_digest(jti))
+
+
+token_blacklist = TokenBlacklist()
+
+
+def _delete_in_batches(queryset, batch_size, removed):
+    queryset = queryset.order_by()
+
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+
+        if not ids:
+            return
+
+        removed.update(queryset.model.objects.filter(pk__in=ids).delete()[1])
+
+        if len(ids) < batch_size:
+            return
+
+
+def purge_expired_tokens(batch_size=1000):
+    '''
+    purge_expired_tokens - muddati tugagan tokenlarni batch_size dan oshmaydigan bo'laklarda o'chiradi.
+
+    api.BlacklistedToken (expires_at yozilmagan eski qatorlar uchun blacklisted_at + ACCESS_TOKEN_LIFETIME) va
+    simplejwt ning OutstandingToken jadvali (unga bog'langan token_blacklist.BlacklistedToken lar CASCADE bilan)
+    tozalanadi. {model: o'chirilgan qatorlar soni} va sarflangan vaqt (soniya) qaytariladi.
+    '''
+
+    started = time.perf_counter()
+    now = timezone.now()
+    removed = Counter()
+
+    _delete_in_batches(
+        BlacklistedToken.objects.filter(
+            Q(expires_at__lte=now) |
+            Q(expires_at__isnull=True, blacklisted_at__lte=now - api_settings.ACCESS_TOKEN_LIFETIME)
+        ),
+        batch_size,
+        removed,
+    )
+    _delete_in_batches(OutstandingToken.objects.filter(expires_at__lte=now), batch_size, removed)
+
+    return dict(removed), time.perf_counter() - started
+
+
+class TokenSweeper:
+    '''
+    TokenSweeper - TOKEN_BLACKLIST['SWEEP_INTERVAL'] berilgan bo'lsa, jarayon ichida fon oqimida
+    purge_expired_tokens ni vaqti-vaqti bilan ishga tushiradi. Workerlar bir vaqtda ishga tushmasligi uchun interval
+    tasodifiy (10% gacha) siljitiladi.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        interval = token_blacklist.options.get('SWEEP_INTERVAL')
+
+        with self.lock:
+            if not interval or (self.thread is not None and self.thread.is_alive()):
+                return
+
+            self.thread = threading.Thread(target=self._run, args=(interval,), name='token-sweeper', daemon=True)
+            self.thread.start()
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval * random.uniform(1, 1.1))
+
+            try:
+                removed, elapsed = purge_expired_tokens(token_blacklist.options.get('SWEEP_BATCH_SIZE', 1000))
+                logger.info("Expired tokens removed: %s in %.3fs", removed, elapsed)
+            except Exception:
+                logger.exception("Expired token sweep failed.")
+            finally:
+                close_old_connections()
+
+
+token_sweeper = TokenSweeper()
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.dispatch import Signal
+
+# bulk_create/bulk_update post_save signallarini yubormaydi, ularning o'rniga butun partiya uchun bitta signal yuboriladi.
+# Argumentlar: sender (model), instances, created, update_fields (bulk_update dan oldin to'ldirilishi mumkin bo'lgan set)
+pre_bulk_save = Signal()
+post_bulk_save = Signal()
+
+
+def get_options():
+    return {
+        'MAX_ITEMS': 500,
+        **getattr(settings, 'BULK_WRITE', {}),
+    }
+
+
+def to_pk(model, value):
+    '''
+    to_pk - so'rovdagi ID qiymatini modelning pk turiga o'tkazadi, noto'g'ri qiymat uchun None qaytaradi.
+    '''
+
+    if value is None or isinstance(value, (bool, dict, list)):
+        return None
+
+    try:
+        return model._meta.pk.to_python(value)
+    except (ValidationError, TypeError, ValueError):
+        return None
+
+
+def bulk_save(model, instances, update_fields=None):
+    '''
+    bulk_save - obyektlarni bitta tranzaksiyada bitta bulk_create (update_fields berilmasa) yoki bulk_update bilan yozadi.
+
+    Saqlashdan oldin va keyin pre_bulk_save/post_bulk_save yuboriladi: hisoblagichlar, qidiruv indeksi, kesh versiyasi
+    va xabarnomalar (api.signals) butun partiya uchun bir marta yangilanadi. auto_now maydonlari (updated_at)
+    save() dagidek yangilanadi.
+    '''
+
+    created = update_fields is None
+
+    if not created:
+        update_fields = set(update_fields)
+
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                for instance in instances:
+                    field.pre_save(instance, add=False)
+                update_fields.add(field.name)
+
+    with transaction.atomic(using=router.db_for_write(model)):
+        pre_bulk_save.send(sender=model, instances=instances, created=created, update_fields=update_fields)
+
+        if created:
+            model.objects.bulk_create(instances)
+        else:
+            model.objects.bulk_update(instances, sorted(update_fields))
+
+        post_bulk_save.send(sender=model, instances=instances, created=created, update_fields=update_fields)
+
+    return instances
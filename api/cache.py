@@ -0,0 +1,235 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import ModelVersion
+from .renderers import EnvelopeResponse
+from .serializers import NestedSerializerMixin
+
+# Keshdagi qiymat formati o'zgarganda oshiriladi, eski formatdagi yozuvlar o'qilmaydi
+CACHE_FORMAT = 2
+
+
+def get_options():
+    return {
+        'ENABLED': True,
+        'ALIAS': 'default',
+        'TIMEOUT': 300,
+        **getattr(settings, 'API_CACHE', {}),
+    }
+
+
+class PendingVersions:
+    '''
+    PendingVersions - bitta tranzaksiyada versiyasi oshirilishi kerak bo'lgan modellar. on_commit ga bir marta qo'shiladi,
+    shu tranzaksiyadagi keyingi bump_version chaqiruvlari faqat nomlarni to'plamga qo'shadi.
+    '''
+
+    def __init__(self):
+        self.labels = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        increment_versions(sorted(self.labels))
+
+
+def bump_version(*models, using=None):
+    '''
+    bump_version - berilgan modellar versiyasini oshiradi, natijada ularga bog'liq barcha kesh kalitlari va ETag lar eskiradi.
+
+    Joriy tranzaksiya ichida chaqirilsa, versiya commit dan keyin (transaction.on_commit) oshiriladi: ModelVersion
+    qatori yozuvchi tranzaksiya oxirigacha qulflanib qolmaydi va bir modelga yozuvchilar bir-birini kutmaydi.
+    Versiya ma'lumotlar ko'rinadigan bo'lgandan keyin oshgani uchun eski ma'lumot yangi kalit bilan keshga tushmaydi.
+
+    Bitta tranzaksiyadagi barcha chaqiruvlar bitta PendingVersions ga yig'iladi va commit dan keyin bitta UPDATE
+    bajariladi. Callback joriy yoki tashqi savepoint da ro'yxatdan o'tgan bo'lsagina qayta ishlatiladi: ichki savepoint
+    bekor qilinsa Django uning callbacklarini ham o'chiradi, tashqi callbackdagi ortiqcha nom esa faqat keshni eskirtadi.
+    '''
+
+    labels = {model._meta.label_lower for model in models}
+    connection = transaction.get_connection(using)
+
+    if not connection.in_atomic_block:
+        increment_versions(sorted(labels))
+        return
+
+    savepoints = set(connection.savepoint_ids)
+    pending = next((
+        func for sids, func, _ in connection.run_on_commit
+        if isinstance(func, PendingVersions) and not func.done and sids <= savepoints
+    ), None)
+
+    if pending is None:
+        pending = PendingVersions()
+        transaction.on_commit(pending, using=using)
+
+    pending.labels |= labels
+
+
+def increment_versions(labels):
+    '''
+    increment_versions - versiyalarni bitta UPDATE bilan oshiradi, hali qatori yo'q modellar uchun qator yaratadi.
+    '''
+
+    now = timezone.now()
+    existing = set(ModelVersion.objects.filter(name__in=labels).values_list('name', flat=True))
+
+    if existing:
+        ModelVersion.objects.filter(name__in=existing).update(version=F('version') + 1, updated_at=now)
+
+    for name in labels:
+        if name in existing:
+            continue
+
+        try:
+            with transaction.atomic():
+                ModelVersion.objects.create(name=name, version=1)
+        except IntegrityError:
+            ModelVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=now)
+
+
+def serializer_models(serializer_class):
+    '''
+    serializer_models - serializer va uning Meta.nested dagi serializerlari chiqaradigan barcha modellar.
+    '''
+
+    models = {serializer_class.Meta.model}
+
+    if issubclass(serializer_class, NestedSerializerMixin):
+        for nested in serializer_class.get_nested().values():
+            models |= serializer_models(nested)
+
+    return models
+
+
+class CachedResponseMixin:
+    '''
+    CachedResponseMixin - viewsetdagi list va retrieve javoblarini keshlaydi va shartli GET (ETag/Last-Modified) ni qo'llaydi.
+
+    Kesh kaliti so'rov yo'li, query string va javobga kiradigan modellar (serializer_class va uning nested
+    serializerlari) versiyalaridan tuziladi. Versiyalar bitta so'rov bilan o'qiladi. If-None-Match yoki
+    If-Modified-Since mos kelsa, serializer ishga tushmasdan 304 qaytariladi.
+    '''
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(super().aretrieve, request, *args, **kwargs)
+
+    def get_cache_models(self):
+        return serializer_models(self.get_serializer_class())
+
+    def cache_state(self, request, labels, rows):
+        '''
+        cache_state - modellar versiyalaridan kesh kalitini va javob sarlavhalarini (ETag, Last-Modified) hisoblaydi.
+        '''
+
+        versions = dict.fromkeys(labels, (0, None))
+        versions.update((name, (version, updated_at)) for name, version, updated_at in rows)
+
+        key = hashlib.sha1('|'.join([
+            str(CACHE_FORMAT),
+            request.path,
+            '&'.join(sorted(request.META.get('QUERY_STRING', '').split('&'))),
+            getattr(request.accepted_renderer, 'format', ''),
+            *(f'{name}:{version}' for name, (version, _) in versions.items()),
+        ]).encode()).hexdigest()
+
+        etag = f'"{key}"'
+        modified = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+        last_modified = max(modified) if len(modified) == len(versions) else None
+
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified.timestamp())
+
+        return key, headers, self.is_not_modified(request, etag, last_modified)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        options = get_options()
+
+        if not options['ENABLED']:
+            return handler(request, *args, **kwargs)
+
+        labels = sorted(model._meta.label_lower for model in self.get_cache_models())
+        rows = ModelVersion.objects.filter(name__in=labels).values_list('name', 'version', 'updated_at')
+        key, headers, not_modified = self.cache_state(request, labels, rows)
+
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache = caches[options['ALIAS']]
+        cached = cache.get(f'api:response:{key}')
+
+        if cached is not None:
+            response = EnvelopeResponse(cached['data'], meta=cached['meta'], status=status.HTTP_200_OK)
+        else:
+            response = handler(request, *args, **kwargs)
+
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(f'api:response:{key}', {'data': response.data, 'meta': getattr(response, 'meta', {})}, options['TIMEOUT'])
+
+        return self.set_cache_headers(response, headers)
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        '''
+        acached_response - cached_response ning async (ASGI) varianti, versiyalar va kesh async API orqali o'qiladi.
+        '''
+
+        options = get_options()
+
+        if not options['ENABLED']:
+            return await handler(request, *args, **kwargs)
+
+        labels = sorted(model._meta.label_lower for model in self.get_cache_models())
+        rows = [row async for row in ModelVersion.objects.filter(name__in=labels).values_list('name', 'version', 'updated_at')]
+        key, headers, not_modified = self.cache_state(request, labels, rows)
+
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cache = caches[options['ALIAS']]
+        cached = await cache.aget(f'api:response:{key}')
+
+        if cached is not None:
+            response = EnvelopeResponse(cached['data'], meta=cached['meta'], status=status.HTTP_200_OK)
+        else:
+            response = await handler(request, *args, **kwargs)
+
+            if response.status_code == status.HTTP_200_OK:
+                await cache.aset(f'api:response:{key}', {'data': response.data, 'meta': getattr(response, 'meta', {})}, options['TIMEOUT'])
+
+        return self.set_cache_headers(response, headers)
+
+    def set_cache_headers(self, response, headers):
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+
+        return response
+
+    def is_not_modified(self, request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+
+        return bool(if_modified_since and last_modified and int(last_modified.timestamp()) <= if_modified_since)
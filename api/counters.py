@@ -0,0 +1,174 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import bump_version
+from .models import Comments, Courses, LessonFile, Lessons
+
+# {model: [(ForeignKey, ota model, hisoblagich maydoni)]}
+COUNTERS = {
+    Lessons: [('course', Courses, 'lesson_count')],
+    Comments: [('lesson', Lessons, 'comment_count')],
+    LessonFile: [('lesson', Lessons, 'file_count')],
+}
+
+# deferred_counters bloki ichida o'chirilgan qatorlar uchun o'zgarishlar shu yerga yig'iladi
+pending_deltas = ContextVar('pending_deltas', default=None)
+
+
+def adjust(model, field, pk, delta):
+    '''
+    adjust - hisoblagichni bazaning o'zida F() orqali o'zgartiradi (parallel yozuvlarda yo'qolmaydi, 0 dan pastga tushmaydi)
+    va ota model versiyasini oshiradi, chunki hisoblagichlar uning API javoblarida chiqadi.
+    '''
+
+    if model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, Value(0))}):
+        bump_version(model)
+
+
+def counter_changes(instance, created):
+    '''
+    counter_changes - saqlangan qator uchun ota hisoblagichlar o'zgarishini (ota model, maydon, ota ID, +1/-1) qaytaradi:
+    qator qo'shilganda yangi otaga +1, ForeignKey o'zgarganda eski otaga -1 va yangisiga +1.
+    Bazadan o'qilmagan va yangi bo'lmagan obyektlarda eski qiymat noma'lum, bunday holat rebuild_counters bilan tuzatiladi.
+    '''
+
+    loaded = getattr(instance, '_loaded_values', None)
+
+    if loaded is None:
+        loaded = instance._loaded_values = {}
+
+    deferred = instance.get_deferred_fields()
+
+    for field_name, parent, field in COUNTERS[type(instance)]:
+        attname = instance._meta.get_field(field_name).attname
+
+        if attname in deferred:
+            continue
+
+        new = getattr(instance, attname)
+
+        if not created and attname not in loaded:
+            loaded[attname] = new
+            continue
+
+        old = None if created else loaded[attname]
+        loaded[attname] = new
+
+        if old == new:
+            continue
+
+        if old is not None:
+            yield parent, field, old, -1
+        if new is not None:
+            yield parent, field, new, 1
+
+
+def update_counters(instance, created):
+    for parent, field, pk, delta in counter_changes(instance, created):
+        adjust(parent, field, pk, delta)
+
+
+def apply_deltas(deltas):
+    '''
+    apply_deltas - {(ota model, maydon, ota ID): o'zgarish} ni qo'llaydi. Bir xil o'zgarishli ota qatorlar bitta
+    UPDATE ... WHERE id IN (...) bilan yangilanadi, shuning uchun so'rovlar soni qatorlar soniga bog'liq emas.
+    '''
+
+    groups = defaultdict(list)
+
+    for (parent, field, pk), delta in deltas.items():
+        if delta:
+            groups[parent, field, delta].append(pk)
+
+    for (parent, field, delta), pks in groups.items():
+        if parent.objects.filter(pk__in=pks).update(**{field: Greatest(F(field) + delta, Value(0))}):
+            bump_version(parent)
+
+
+def bulk_update_counters(instances, created):
+    '''
+    bulk_update_counters - bulk_create/bulk_update qilingan qatorlar uchun o'zgarishlarni ota qatorlar bo'yicha
+    yig'ib, apply_deltas bilan qo'llaydi.
+    '''
+
+    deltas = defaultdict(int)
+
+    for instance in instances:
+        for parent, field, pk, delta in counter_changes(instance, created):
+            deltas[parent, field, pk] += delta
+
+    apply_deltas(deltas)
+
+
+@contextmanager
+def deferred_counters():
+    '''
+    deferred_counters - blok ichida o'chirilgan qatorlar (post_delete) uchun hisoblagichlar har bir qatorda
+    yangilanmaydi, balki yig'ilib blok oxirida apply_deltas bilan qo'llanadi. Xatolik bo'lsa hech narsa yozilmaydi.
+
+    Namuna:
+        with transaction.atomic(), deferred_counters():
+            Lessons.objects.filter(pk__in=ids).delete()
+    '''
+
+    deltas = defaultdict(int)
+    token = pending_deltas.set(deltas)
+
+    try:
+        yield
+    finally:
+        pending_deltas.reset(token)
+
+    apply_deltas(deltas)
+
+
+def release_counters(instance, origin=None):
+    '''
+    release_counters - o'chirilgan qator uchun ota hisoblagichni kamaytiradi. Ota qatorning o'zi o'chirilayotgan
+    bo'lsa (CASCADE, origin - ota qator yoki ota modelning QuerySet.delete() i), uni yangilash shart emas.
+    deferred_counters ichida o'zgarish darhol yozilmaydi, balki yig'iladi.
+    '''
+
+    deltas = pending_deltas.get()
+
+    for field_name, parent, field in COUNTERS[type(instance)]:
+        pk = getattr(instance, instance._meta.get_field(field_name).attname)
+
+        if pk is None or (isinstance(origin, parent) and origin.pk == pk):
+            continue
+
+        if isinstance(origin, QuerySet) and origin.model is parent:
+            continue
+
+        if deltas is None:
+            adjust(parent, field, pk, -1)
+        else:
+            deltas[parent, field, pk] -= 1
+
+
+def counter_expression(model, field_name):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field_name: OuterRef('pk')}).order_by().values(field_name).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def rebuild(parent, field, model, field_name, queryset=None):
+    '''
+    rebuild - ota modeldagi hisoblagichni haqiqiy qatorlar soni bilan bitta UPDATE da qayta hisoblaydi.
+    Faqat qiymati farq qiladigan qatorlar yoziladi, yozilgan qatorlar soni qaytariladi.
+    '''
+
+    queryset = parent.objects.all() if queryset is None else queryset
+    expression = counter_expression(model, field_name)
+    changed = queryset.alias(real=expression).exclude(**{field: F('real')}).update(**{field: expression})
+
+    if changed:
+        bump_version(parent)
+
+    return changed
@@ -0,0 +1,156 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+from rest_framework.renderers import BaseRenderer
+
+from .renderers import ORJSONRenderer
+from .storage import BLOB_RE
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_options():
+    return {
+        'MODE': 'django',
+        'ACCEL_PREFIX': '/protected-media/',
+        'CHUNK_SIZE': 64 * 1024,
+        'MAX_AGE': 3600,
+        **getattr(settings, 'FILE_DELIVERY', {}),
+    }
+
+
+class PassthroughRenderer(BaseRenderer):
+    '''
+    PassthroughRenderer - fayl javoblari uchun, istalgan Accept sarlavhasida (video/mp4, application/pdf) 406 qaytmasligi uchun ishlatiladi.
+    Xatolik javoblari (dict) JSON ko'rinishida qaytariladi.
+    '''
+
+    media_type = '*/*'
+    format = None
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, str)):
+            return data
+
+        return ORJSONRenderer().render(data, renderer_context=renderer_context)
+
+
+def parse_range(header, size):
+    '''
+    parse_range - "bytes=start-end" ko'rinishidagi bitta oraliqni (start, end) qilib qaytaradi.
+    Sarlavha bo'lmasa yoki tushunarsiz (bir nechta oraliq) bo'lsa None, oraliq fayldan tashqarida bo'lsa ValueError.
+    '''
+
+    match = RANGE_RE.match((header or '').replace(' ', ''))
+
+    if not match or match.groups() == ('', ''):
+        return None
+
+    start, end = match.groups()
+
+    if start == '':
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+    if start >= size or start > end:
+        raise ValueError(header)
+
+    return start, end
+
+
+def iter_range(file, start, length, chunk_size):
+    with file:
+        file.seek(start)
+
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+
+            if not chunk:
+                break
+
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, field_file, as_attachment=False, filename=None):
+    '''
+    serve_file - FileField faylini Range/If-Range, ETag va Last-Modified bilan qaytaradi.
+
+    ETag ContentAddressedStorage bloblari uchun nomdagi SHA-256 digest (kuchli ETag), boshqa fayllar uchun fayl hajmi
+    va o'zgartirilgan vaqtidan (mtime) tuziladi. If-None-Match/If-Modified-Since mos kelsa 304 qaytadi.
+    FILE_DELIVERY['MODE'] bo'yicha:
+        django - fayl FileResponse (to'liq) yoki StreamingHttpResponse (206, Range) orqali bo'laklab uzatiladi
+        x-accel-redirect - nginx ga ACCEL_PREFIX + fayl nomi yuboriladi, Range va sendfile ni nginx bajaradi
+        x-sendfile - Apache/lighttpd ga faylning to'liq yo'li yuboriladi
+    '''
+
+    options = get_options()
+    storage = field_file.storage
+    name = field_file.name
+
+    size = storage.size(name)
+    modified = storage.get_modified_time(name).timestamp()
+    match = BLOB_RE.match(name)
+    etag = f'"{match["digest"]}"' if match else f'"{size:x}-{int(modified * 1_000_000):x}"'
+
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(modified),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': f"private, max-age={options['MAX_AGE']}",
+    }
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified))
+
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    filename = filename or os.path.basename(name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    headers['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+
+    if options['MODE'] in ('x-accel-redirect', 'x-sendfile'):
+        response = HttpResponse(content_type=content_type, headers=headers)
+
+        if options['MODE'] == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = quote(options['ACCEL_PREFIX'] + name)
+        else:
+            response['X-Sendfile'] = storage.path(name)
+
+        return response
+
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+
+    if not if_range or if_range == etag or parse_http_date_safe(if_range) == int(modified):
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+
+    if byte_range is None:
+        response = FileResponse(
+            storage.open(name, 'rb'), as_attachment=as_attachment, filename=filename, content_type=content_type, headers=headers
+        )
+        response.block_size = options['CHUNK_SIZE']
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        iter_range(storage.open(name, 'rb'), start, end - start + 1, options['CHUNK_SIZE']),
+        status=206, content_type=content_type, headers=headers,
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+
+    return response
@@ -1,42 +1,45 @@
+import logging
+
+from django.core.exceptions import ValidationError
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import exceptions, status
+
+logger = logging.getLogger(__name__)
 
 
 def exception(exc, content):
     '''
     API error xatoliklarini chiqaradigan funksiyani ma'lumotlarini o'zgartirib qayta ishlanishi
+
+    Faqat error qismi qaytariladi, {data, error, success} konvertiga javob render qilinayotganda
+    (api.renderers.EnvelopeJSONRenderer) o'raladi. Model darajasidagi ValidationError (masalan,
+    Comments.assign_path) ham 400 javobga aylantiriladi.
     '''
 
-    response = exception_handler(exc, content)
+    if isinstance(exc, ValidationError):
+        exc = exceptions.ValidationError(exc.message_dict if hasattr(exc, 'error_dict') else exc.messages)
 
-    if isinstance(response.data, dict):
-        error_msg = response.data
-    else:
-        error_msg = {'detail': response.data}
+    response = exception_handler(exc, content)
 
-    if isinstance(error_msg, str):
-        error_msg = error_msg
-    else:
-        error_msg = error_msg.get('detail', error_msg)
+    if response is None:
+        logger.error("Unhandled API exception", exc_info=exc)
 
-    if response is not None:
         return Response({
-            'data': None,
-            'error': {
-                'errorId': response.status_code,
-                'isFriendly': True,
-                'errorMsg': error_msg
-            },
-            'success': False
-        }, status=response.status_code)
-
-    return Response({
-        'data': None,
-        'error': {
             'errorId': status.HTTP_500_INTERNAL_SERVER_ERROR,
             'isFriendly': False,
             'errorMsg': "Internal server error."
-        },
-        'success': False
-    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    if isinstance(response.data, dict):
+        error_msg = response.data.get('detail', response.data)
+    else:
+        error_msg = response.data
+
+    return Response({
+        'errorId': response.status_code,
+        'isFriendly': True,
+        'errorMsg': error_msg
+    }, status=response.status_code, headers={
+        header: value for header, value in response.items() if header in ('Retry-After', 'WWW-Authenticate')
+    })
@@ -0,0 +1,120 @@
+from functools import cache
+
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+class Shape:
+    '''
+    Shape - javobning bitta darajadagi ko'rinishi.
+
+    fields - chiqariladigan maydonlar (None - serializerdagi hamma maydonlar), children - ochiladigan (expand)
+    nested maydonlar va ularning ko'rinishi. expand_all=True bo'lsa (?expand= berilmagan) Meta.nested dagi
+    barcha maydonlar avvalgidek to'liq ochiladi.
+    '''
+
+    def __init__(self, expand_all=True):
+        self.fields = None
+        self.children = {}
+        self.expand_all = expand_all
+
+    def __repr__(self):
+        return f'Shape(fields={self.fields!r}, children={self.children!r}, expand_all={self.expand_all!r})'
+
+    @property
+    def is_default(self):
+        return self.fields is None and not self.children and self.expand_all
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return self.includes(name) and (self.expand_all or name in self.children)
+
+    def child(self, name):
+        return self.children.get(name) or Shape(self.expand_all)
+
+    def add_field(self, name):
+        if self.fields is None:
+            self.fields = set()
+
+        self.fields.add(name)
+
+    def add_child(self, name):
+        if name not in self.children:
+            self.children[name] = Shape(self.expand_all)
+
+        return self.children[name]
+
+
+DEFAULT_SHAPE = Shape()
+
+
+def parse_paths(value):
+    return [path.strip().split('.') for path in value.split(',') if path.strip()]
+
+
+@cache
+def readable_fields(serializer_class):
+    '''
+    readable_fields - serializer chiqaradigan maydonlar {nomi: modeldagi source}. Maydonlar klass bo'yicha bir marta hisoblanadi.
+    '''
+
+    return {name: field.source for name, field in serializer_class().fields.items() if not field.write_only}
+
+
+def validate_shape(shape, serializer_class, prefix=''):
+    fields = readable_fields(serializer_class)
+    nested = serializer_class.get_nested() if hasattr(serializer_class, 'get_nested') else {}
+
+    for name in sorted(shape.fields or ()):
+        if name not in fields:
+            raise serializers.ValidationError({FIELDS_QUERY_PARAM: f"Unknown field: {prefix}{name}."})
+
+    for name, child in shape.children.items():
+        if name not in nested:
+            raise serializers.ValidationError({EXPAND_QUERY_PARAM: f"Field cannot be expanded: {prefix}{name}."})
+
+        validate_shape(child, nested[name], f'{prefix}{name}.')
+
+
+def shape_from_request(request, serializer_class):
+    '''
+    shape_from_request - ?fields= va ?expand= parametrlaridan javob ko'rinishini (Shape) tuzadi.
+
+    fields - vergul bilan ajratilgan maydonlar, nested maydonlar nuqta bilan yoziladi (lesson.title) va ular
+    avtomatik ochiladi. expand - ochiladigan nested maydonlar (lesson, lesson.course). expand berilsa faqat
+    sanab o'tilgan maydonlar ochiladi, qolganlari ID ko'rinishida qoladi. Noma'lum maydon 400 xatolik qaytaradi.
+
+    Namuna:
+        ?fields=id,text,lesson.title&expand=author
+        ?expand=
+    '''
+
+    params = getattr(request, 'query_params', {})
+
+    if FIELDS_QUERY_PARAM not in params and EXPAND_QUERY_PARAM not in params:
+        return DEFAULT_SHAPE
+
+    shape = Shape(expand_all=EXPAND_QUERY_PARAM not in params)
+
+    for path in parse_paths(params.get(FIELDS_QUERY_PARAM, '')):
+        node = shape
+
+        for name in path[:-1]:
+            node.add_field(name)
+            node = node.add_child(name)
+
+        node.add_field(path[-1])
+
+    for path in parse_paths(params.get(EXPAND_QUERY_PARAM, '')):
+        node = shape
+
+        for name in path:
+            node = node.add_child(name)
+
+    validate_shape(shape, serializer_class)
+
+    return shape
@@ -0,0 +1,533 @@
+import base64
+import json
+import math
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from itertools import count
+
+import django
+import rest_framework
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api import uploads
+from api.benchmark import measure, report
+from api.cache import get_options as get_cache_options
+from api.models import Comments, Courses, LessonFile, LessonReaction, Lessons
+
+# Bitta foydalanuvchi bitta ssenariyda ko'pi bilan shuncha so'rov yuboradi (eng kichik throttle limiti 60/minute)
+REQUESTS_PER_USER = 50
+
+PASSWORD = 'benchmark-password'
+
+# Benchmark qamrab olishi kerak bo'lgan yo'llar: api/urls.py va course/urls.py dagi auth yo'llari
+ROUTE_PREFIXES = ('api/v1/', 'auth/')
+
+
+class Command(BaseCommand):
+    help = (
+        "api/urls.py dagi barcha endpointlar va course/urls.py dagi auth yo'llari uchun kechikish (p50/p99), o'tkazish "
+        "qobiliyati (so'rov/s), SQL so'rovlar soni va javob hajmini o'lchaydi. So'rovlar to'liq middleware zanjiri orqali "
+        "bazadagi mavjud ma'lumotlar (seed_data) ustida yuboriladi, benchmark yaratgan qatorlar oxirida bekor qilinadi. "
+        "--output bilan natija JSON faylga yoziladi, --compare bilan oldingi natija bilan solishtiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help="Har bir endpoint uchun o'lchanadigan so'rovlar soni.")
+        parser.add_argument('--warmup', type=int, default=5, help="O'lchovdan oldingi so'rovlar soni.")
+        parser.add_argument(
+            '--slow-iterations', type=int, default=10,
+            help="Parol xeshlaydigan endpointlar (login, register) uchun so'rovlar soni.",
+        )
+        parser.add_argument('--bulk-size', type=int, default=10, help="/bulk/ so'rovlaridagi elementlar soni.")
+        parser.add_argument('--endpoint', action='append', help="Faqat nomida shu satr bo'lgan ssenariylar (masalan lessons:).")
+        parser.add_argument('--no-cache', action='store_true', help="API javob keshini (API_CACHE) o'chiradi.")
+        parser.add_argument('--output', help="Natija yoziladigan JSON fayl.")
+        parser.add_argument('--compare', help="Solishtiriladigan oldingi natija (JSON fayl).")
+        parser.add_argument(
+            '--max-slowdown', type=float, default=1.25,
+            help="--compare da p50 necha marta sekinlashsa regressiya hisoblanadi.",
+        )
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqaradi.")
+
+    def routes(self, resolver=None, prefix=''):
+        '''
+        routes - benchmark qamrab olishi kerak bo'lgan (url nomi, HTTP metod) juftliklari.
+        '''
+
+        for pattern in (resolver or get_resolver()).url_patterns:
+            path = prefix + str(pattern.pattern)
+
+            if isinstance(pattern, URLResolver):
+                yield from self.routes(pattern, path)
+                continue
+
+            if not pattern.name or not path.startswith(ROUTE_PREFIXES):
+                continue
+
+            view_class = getattr(pattern.callback, 'cls', None) or pattern.callback.view_class
+            actions = getattr(pattern.callback, 'actions', None)
+
+            if actions is None:
+                actions = {
+                    method: method for method in view_class.http_method_names
+                    if method not in ('head', 'options') and hasattr(view_class, method)
+                }
+
+            for method, action in actions.items():
+                if method in ('head', 'options'):
+                    continue
+
+                # BulkMixin.bulk barcha metodlarga ulanadi, lekin viewset faqat bulk_methods dagilarini qabul qiladi
+                if action == 'bulk' and method not in view_class.bulk_methods:
+                    continue
+
+                yield pattern.name, method
+
+    def dataset(self):
+        return {
+            model._meta.label_lower: model.objects.count()
+            for model in (User, Courses, Lessons, LessonReaction, Comments, LessonFile)
+        }
+
+    def meta(self, options, dataset):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except OSError:
+            commit = None
+
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'rest_framework': rest_framework.VERSION,
+            'database': connection.vendor,
+            'api_cache': self.cache_options['ENABLED'],
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'slow_iterations': options['slow_iterations'],
+            'dataset': dataset,
+        }
+
+    def setup(self):
+        '''
+        setup - ssenariylar ishlatadigan qatorlar: kurs, dars, fayl, izohlar daraxti va login uchun foydalanuvchi.
+        '''
+
+        self.teacher = User.objects.create_user(username='benchmark_teacher', email='benchmark_teacher@example.com', is_staff=True)
+        self.member = User.objects.create_user(username='benchmark_member', email='benchmark_member@example.com', password=PASSWORD)
+        self.course = Courses.objects.create(name='Benchmark course')
+        self.lesson = Lessons.objects.create(
+            title='Benchmark lesson', description='Lorem ipsum dolor sit amet. ' * 8, course=self.course, teacher=self.teacher,
+        )
+        self.lesson_file = LessonFile.objects.create(lesson=self.lesson, file=ContentFile(b'benchmark ' * 1024, name='benchmark.txt'))
+        self.comment = Comments.objects.create(text='Benchmark comment', lesson=self.lesson, author=self.teacher)
+
+        parent = self.comment
+
+        for number in range(20):
+            reply = Comments.objects.create(text=f'Reply {number}', lesson=self.lesson, author=self.teacher, reply=parent)
+            parent = reply if number % 4 else self.comment
+
+        self.token = str(AccessToken.for_user(self.teacher))
+        self.bulk_lessons = Lessons.objects.bulk_create([
+            Lessons(title=f'Bulk lesson {number}', course=self.course, teacher=self.teacher) for number in range(self.bulk_size)
+        ])
+        self.bulk_files = LessonFile.objects.bulk_create([
+            LessonFile(lesson=self.lesson, file=self.lesson_file.file.name, name=f'bulk-{number}.txt')
+            for number in range(self.bulk_size)
+        ])
+        self.bulk_comments = Comments.objects.bulk_create([
+            Comments(text=f'Bulk comment {number}', lesson=self.lesson, author=self.teacher) for number in range(self.bulk_size)
+        ])
+
+    def staff(self, count):
+        '''
+        staff - har bir ssenariy uchun alohida admin foydalanuvchilar va ularning access tokenlari, shunda throttle
+        (foydalanuvchi va scope bo'yicha) o'lchovga aralashmaydi.
+        '''
+
+        start = next(self.user_numbers)
+        users = User.objects.bulk_create([
+            User(username=f'benchmark_staff_{start}_{number}', email=f'benchmark_staff_{start}_{number}@example.com', is_staff=True)
+            for number in range(count)
+        ])
+
+        return [(user, f'Bearer {AccessToken.for_user(user)}') for user in users]
+
+    def anonymous(self):
+        number = next(self.numbers)
+        return {'REMOTE_ADDR': f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}'}
+
+    def user(self, index):
+        return self.users[index // REQUESTS_PER_USER][0]
+
+    def auth(self, index):
+        return {**self.anonymous(), 'HTTP_AUTHORIZATION': self.users[index // REQUESTS_PER_USER][1]}
+
+    def upload_metadata(self, encoded=True):
+        values = {'filename': 'benchmark.bin', 'lesson': str(self.lesson.pk)}
+
+        if not encoded:
+            return values
+
+        return ','.join(f'{key} {base64.b64encode(value.encode()).decode()}' for key, value in values.items())
+
+    def create_uploads(self, count, length):
+        return [uploads.create_upload(self.user(index), length, self.upload_metadata(encoded=False)) for index in range(count)]
+
+    def bulk_ids(self, objects, index):
+        return [obj.pk for obj in objects[index * self.bulk_size:(index + 1) * self.bulk_size]]
+
+    def scenarios(self):
+        '''
+        scenarios - (nomi, url nomi, HTTP metod, kutilgan status, so'rov funksiyasi, tayyorlash funksiyasi, sekinmi).
+
+        So'rov funksiyasi ssenariy ichidagi tartib raqamini oladi, tayyorlash funksiyasi esa (bo'lsa) o'lchovdan oldin
+        so'rovlar soniga qarab o'chiriladigan yoki yangilanadigan qatorlarni yaratadi va ularni self.objects ga qo'yadi.
+        '''
+
+        client = self.client
+        lesson, course, lesson_file, comment = self.lesson, self.course, self.lesson_file, self.comment
+        chunk = b'0' * 64 * 1024
+
+        def lessons(count):
+            return Lessons.objects.bulk_create([
+                Lessons(title=f'Delete lesson {next(self.numbers)}', course=course, teacher=self.teacher) for _ in range(count)
+            ])
+
+        def files(count):
+            return LessonFile.objects.bulk_create([
+                LessonFile(lesson=lesson, file=lesson_file.file.name, name='delete.txt') for _ in range(count)
+            ])
+
+        def comments(count):
+            return Comments.objects.bulk_create([
+                Comments(text='Delete comment', lesson=lesson, author=self.teacher) for _ in range(count)
+            ])
+
+        def courses(count):
+            return Courses.objects.bulk_create([Courses(name=f'Delete course {next(self.numbers)}') for _ in range(count)])
+
+        def refresh_tokens(count):
+            return [RefreshToken.for_user(self.user(index)) for index in range(count)]
+
+        def upload(path, method='get', **kwargs):
+            return lambda index: getattr(client, method)(path(index), **self.auth(index), **kwargs)
+
+        def upload_path(index):
+            return reverse('upload-detail', args=[self.objects[index].pk])
+
+        return [
+            ('api-root', 'api-root', 'get', 200, lambda index: client.get(reverse('api-root'), **self.anonymous()), None, False),
+
+            ('courses:list', 'courses-list', 'get', 200, lambda index: client.get(reverse('courses-list'), **self.anonymous()), None, False),
+            ('courses:retrieve', 'courses-detail', 'get', 200, lambda index: client.get(
+                reverse('courses-detail', args=[course.pk]), **self.anonymous()
+            ), None, False),
+            ('courses:create', 'courses-list', 'post', 201, lambda index: client.post(
+                reverse('courses-list'), {'name': f'Created course {next(self.numbers)}'}, format='json', **self.auth(index)
+            ), None, False),
+            ('courses:update', 'courses-detail', 'put', 200, lambda index: client.put(
+                reverse('courses-detail', args=[course.pk]), {'name': f'Benchmark course {next(self.numbers)}'}, format='json',
+                **self.auth(index)
+            ), None, False),
+            ('courses:partial-update', 'courses-detail', 'patch', 200, lambda index: client.patch(
+                reverse('courses-detail', args=[course.pk]), {'name': f'Benchmark course {next(self.numbers)}'}, format='json',
+                **self.auth(index)
+            ), None, False),
+            ('courses:destroy', 'courses-detail', 'delete', 204, lambda index: client.delete(
+                reverse('courses-detail', args=[self.objects[index].pk]), **self.auth(index)
+            ), courses, False),
+
+            ('lessons:list', 'lessons-list', 'get', 200, lambda index: client.get(reverse('lessons-list'), **self.anonymous()), None, False),
+            ('lessons:retrieve', 'lessons-detail', 'get', 200, lambda index: client.get(
+                reverse('lessons-detail', args=[lesson.pk]), **self.anonymous()
+            ), None, False),
+            ('lessons:create', 'lessons-list', 'post', 201, lambda index: client.post(
+                reverse('lessons-list'), {'title': f'Created lesson {next(self.numbers)}', 'course': course.pk}, format='json',
+                **self.auth(index)
+            ), None, False),
+            ('lessons:update', 'lessons-detail', 'put', 200, lambda index: client.put(
+                reverse('lessons-detail', args=[lesson.pk]),
+                {'title': f'Benchmark lesson {next(self.numbers)}', 'course': course.pk, 'description': 'Updated'},
+                format='json', **self.auth(index)
+            ), None, False),
+            ('lessons:partial-update', 'lessons-detail', 'patch', 200, lambda index: client.patch(
+                reverse('lessons-detail', args=[lesson.pk]), {'description': f'Updated {index}'}, format='json', **self.auth(index)
+            ), None, False),
+            ('lessons:destroy', 'lessons-detail', 'delete', 204, lambda index: client.delete(
+                reverse('lessons-detail', args=[self.objects[index].pk]), **self.auth(index)
+            ), lessons, False),
+            ('lessons:like', 'lessons-like', 'post', 200, lambda index: client.post(
+                reverse('lessons-like', args=[lesson.pk]), **self.auth(index)
+            ), None, False),
+            ('lessons:dislike', 'lessons-dislike', 'post', 200, lambda index: client.post(
+                reverse('lessons-dislike', args=[lesson.pk]), **self.auth(index)
+            ), None, False),
+            ('lessons:thread', 'lessons-thread', 'get', 200, lambda index: client.get(
+                reverse('lessons-thread', args=[lesson.pk]), **self.anonymous()
+            ), None, False),
+            ('lessons:bulk-create', 'lessons-bulk', 'post', 201, lambda index: client.post(
+                reverse('lessons-bulk'),
+                [{'title': f'Bulk created {next(self.numbers)}', 'course': course.pk} for _ in range(self.bulk_size)],
+                format='json', **self.auth(index)
+            ), None, False),
+            ('lessons:bulk-update', 'lessons-bulk', 'patch', 200, lambda index: client.patch(
+                reverse('lessons-bulk'), [{'id': obj.pk, 'description': f'Bulk {index}'} for obj in self.bulk_lessons],
+                format='json', **self.auth(index)
+            ), None, False),
+            ('lessons:bulk-destroy', 'lessons-bulk', 'delete', 204, lambda index: client.delete(
+                reverse('lessons-bulk'), self.bulk_ids(self.objects, index), format='json', **self.auth(index)
+            ), lambda count: lessons(count * self.bulk_size), False),
+
+            ('lesson-files:list', 'lessonfile-list', 'get', 200, lambda index: client.get(
+                reverse('lessonfile-list'), **self.anonymous()
+            ), None, False),
+            ('lesson-files:retrieve', 'lessonfile-detail', 'get', 200, lambda index: client.get(
+                reverse('lessonfile-detail', args=[lesson_file.pk]), **self.anonymous()
+            ), None, False),
+            # DEFAULT_PARSER_CLASSES da faqat JSONParser bor, fayllar /uploads/ orqali keladi: bu ikki ssenariy validatsiya yo'lini o'lchaydi
+            ('lesson-files:create', 'lessonfile-list', 'post', 400, lambda index: client.post(
+                reverse('lessonfile-list'), {'lesson': lesson.pk, 'file': lesson_file.file.name}, format='json', **self.auth(index)
+            ), None, False),
+            ('lesson-files:update', 'lessonfile-detail', 'put', 400, lambda index: client.put(
+                reverse('lessonfile-detail', args=[lesson_file.pk]), {'lesson': lesson.pk, 'file': lesson_file.file.name},
+                format='json', **self.auth(index)
+            ), None, False),
+            ('lesson-files:partial-update', 'lessonfile-detail', 'patch', 200, lambda index: client.patch(
+                reverse('lessonfile-detail', args=[lesson_file.pk]), {'name': f'benchmark-{index}.txt'}, format='json',
+                **self.auth(index)
+            ), None, False),
+            ('lesson-files:destroy', 'lessonfile-detail', 'delete', 204, lambda index: client.delete(
+                reverse('lessonfile-detail', args=[self.objects[index].pk]), **self.auth(index)
+            ), files, False),
+            ('lesson-files:download', 'lessonfile-download', 'get', 200, lambda index: client.get(
+                reverse('lessonfile-download', args=[lesson_file.pk]), **self.anonymous()
+            ), None, False),
+            ('lesson-files:bulk-update', 'lessonfile-bulk', 'patch', 200, lambda index: client.patch(
+                reverse('lessonfile-bulk'), [{'id': obj.pk, 'name': f'bulk-{index}.txt'} for obj in self.bulk_files],
+                format='json', **self.auth(index)
+            ), None, False),
+            ('lesson-files:bulk-destroy', 'lessonfile-bulk', 'delete', 204, lambda index: client.delete(
+                reverse('lessonfile-bulk'), self.bulk_ids(self.objects, index), format='json', **self.auth(index)
+            ), lambda count: files(count * self.bulk_size), False),
+
+            ('comments:list', 'comments-list', 'get', 200, lambda index: client.get(
+                reverse('comments-list'), **self.anonymous()
+            ), None, False),
+            ('comments:retrieve', 'comments-detail', 'get', 200, lambda index: client.get(
+                reverse('comments-detail', args=[comment.pk]), **self.anonymous()
+            ), None, False),
+            ('comments:create', 'comments-list', 'post', 201, lambda index: client.post(
+                reverse('comments-list'), {'text': f'Created comment {index}', 'lesson': lesson.pk, 'reply': comment.pk},
+                format='json', **self.auth(index)
+            ), None, False),
+            ('comments:update', 'comments-detail', 'put', 200, lambda index: client.put(
+                reverse('comments-detail', args=[comment.pk]), {'text': f'Updated {index}', 'lesson': lesson.pk}, format='json',
+                **self.auth(index)
+            ), None, False),
+            ('comments:partial-update', 'comments-detail', 'patch', 200, lambda index: client.patch(
+                reverse('comments-detail', args=[comment.pk]), {'text': f'Updated {index}'}, format='json', **self.auth(index)
+            ), None, False),
+            ('comments:destroy', 'comments-detail', 'delete', 204, lambda index: client.delete(
+                reverse('comments-detail', args=[self.objects[index].pk]), **self.auth(index)
+            ), comments, False),
+            ('comments:thread', 'comments-thread', 'get', 200, lambda index: client.get(
+                reverse('comments-thread', args=[comment.pk]), **self.anonymous()
+            ), None, False),
+            ('comments:bulk-create', 'comments-bulk', 'post', 201, lambda index: client.post(
+                reverse('comments-bulk'),
+                [{'text': f'Bulk created {number}', 'lesson': lesson.pk} for number in range(self.bulk_size)],
+                format='json', **self.auth(index)
+            ), None, False),
+            ('comments:bulk-update', 'comments-bulk', 'patch', 200, lambda index: client.patch(
+                reverse('comments-bulk'), [{'id': obj.pk, 'text': f'Bulk {index}'} for obj in self.bulk_comments],
+                format='json', **self.auth(index)
+            ), None, False),
+            ('comments:bulk-destroy', 'comments-bulk', 'delete', 204, lambda index: client.delete(
+                reverse('comments-bulk'), self.bulk_ids(self.objects, index), format='json', **self.auth(index)
+            ), lambda count: comments(count * self.bulk_size), False),
+
+            ('uploads:create', 'upload-list', 'post', 201, lambda index: client.post(
+                reverse('upload-list'), **self.auth(index),
+                HTTP_UPLOAD_LENGTH=str(len(chunk)), HTTP_UPLOAD_METADATA=self.upload_metadata(),
+            ), None, False),
+            ('uploads:status', 'upload-detail', 'get', 200, upload(upload_path, 'head'),
+             lambda count: self.create_uploads(count, len(chunk)), False),
+            ('uploads:chunk', 'upload-detail', 'patch', 204, upload(
+                upload_path, 'patch', data=chunk, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0',
+            ), lambda count: self.create_uploads(count, 2 * len(chunk)), False),
+            ('uploads:cancel', 'upload-detail', 'delete', 204, upload(upload_path, 'delete'),
+             lambda count: self.create_uploads(count, len(chunk)), False),
+
+            ('auth:login', 'login', 'post', 200, lambda index: client.post(
+                reverse('login'), {'username': self.member.username, 'password': PASSWORD}, format='json', **self.anonymous()
+            ), None, True),
+            ('auth:refresh', 'token_refresh', 'post', 200, lambda index: client.post(
+                reverse('token_refresh'), {'refresh': str(self.objects[index])}, format='json', **self.anonymous()
+            ), refresh_tokens, False),
+            ('auth:verify', 'token_verify', 'post', 200, lambda index: client.post(
+                reverse('token_verify'), {'token': self.token}, format='json', **self.anonymous()
+            ), None, False),
+            ('auth:register', 'register', 'post', 201, lambda index: client.post(reverse('register'), {
+                'username': f'benchmark_user_{next(self.numbers)}', 'email': 'benchmark_user@example.com',
+                'password1': PASSWORD, 'password2': PASSWORD,
+            }, format='json', **self.anonymous()), None, True),
+            ('auth:logout', 'logout', 'post', 200, lambda index: client.post(
+                f"{reverse('logout')}?refresh={self.objects[index]}", **self.anonymous(),
+                HTTP_AUTHORIZATION=f'Bearer {self.objects[index].access_token}',
+            ), refresh_tokens, False),
+        ]
+
+    def run(self, scenarios, options):
+        results = {}
+
+        for name, url_name, method, expected, request, prepare, slow in scenarios:
+            iterations = min(options['iterations'], options['slow_iterations']) if slow else options['iterations']
+            warmup = min(options['warmup'], 1) if slow else options['warmup']
+            calls = iterations + warmup + 1
+            self.users = self.staff(math.ceil(calls / REQUESTS_PER_USER))
+            self.objects = prepare(calls) if prepare else None
+            numbers = count()
+            errors = []
+
+            def call():
+                # Test klienti javobni o'zi yopadi (close_old_connections tranzaksiya ichidagi ulanishni yopmaydi),
+                # fayl javoblari esa oxirigacha o'qilganda yopiladi
+                response = request(next(numbers))
+                content = response.getvalue()
+
+                if response.status_code != expected:
+                    errors.append(response.status_code)
+
+                return response, content
+
+            for _ in range(warmup):
+                call()
+
+            # Qizdirishdan keyingi so'rov (ModelVersion qatorlari yaratilgan, kesh to'lgan) SQL so'rovlar sonini o'lchash uchun alohida yuboriladi
+            with CaptureQueriesContext(connection) as queries:
+                response, content = call()
+
+            result = {
+                'route': f'{url_name} {method.upper()}',
+                'status': response.status_code,
+                'queries': len(queries),
+                'bytes': len(content),
+            }
+
+            if errors:
+                result['error'] = content.decode(errors='replace')[:500]
+            else:
+                result.update(measure(call, iterations))
+                result['errors'] = len(errors)
+
+            results[name] = result
+
+        return results
+
+    def compare(self, results, baseline, max_slowdown):
+        '''
+        compare - natijani oldingi ishga tushirish bilan solishtiradi: p50 nisbati va SQL so'rovlar farqi.
+        p50 max_slowdown martadan ko'p sekinlashgan yoki so'rovlar soni oshgan ssenariylar regressiya hisoblanadi.
+        '''
+
+        comparison, regressions = {}, []
+
+        for name, result in results.items():
+            previous = baseline.get('results', {}).get(name)
+
+            if not previous or 'p50_ms' not in previous or 'p50_ms' not in result:
+                continue
+
+            ratio = round(result['p50_ms'] / previous['p50_ms'], 3) if previous['p50_ms'] else None
+            queries = result['queries'] - previous['queries']
+            comparison[name] = {'p50_ratio': ratio, 'queries_delta': queries}
+
+            if (ratio is not None and ratio > max_slowdown) or queries > 0:
+                regressions.append(name)
+
+        return comparison, regressions
+
+    def handle(self, *args, **options):
+        self.client = APIClient()
+        self.numbers = count()
+        self.user_numbers = count()
+        self.bulk_size = options['bulk_size']
+        self.cache_options = {**get_cache_options(), 'ALIAS': 'default'}
+        self.cache_options['ENABLED'] = self.cache_options['ENABLED'] and not options['no_cache']
+
+        # Kesh va throttle hisoblagichlari alohida locmem keshda saqlanadi: tranzaksiya bekor qilinganda ModelVersion
+        # versiyalari orqaga qaytadi va umumiy keshda qolgan benchmark javoblari keyinchalik haqiqiy javob bo'lib chiqishi mumkin edi
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            ALLOWED_HOSTS=['*'],
+            MEDIA_ROOT=media_root,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-api'}},
+            API_CACHE=self.cache_options,
+            THROTTLE_STORE={'BACKEND': 'api.throttling.CacheThrottleStore'},
+            # .part fayllar ham vaqtinchalik MEDIA_ROOT ichida yaratiladi
+            UPLOADS={**getattr(settings, 'UPLOADS', {}), 'TEMP_DIR': None},
+        ):
+            dataset = self.dataset()
+
+            with transaction.atomic():
+                self.setup()
+                scenarios = [
+                    scenario for scenario in self.scenarios()
+                    if not options['endpoint'] or any(part in scenario[0] for part in options['endpoint'])
+                ]
+                results = self.run(scenarios, options)
+                transaction.set_rollback(True)
+
+        covered = {(url_name, method) for _, url_name, method, *_ in scenarios}
+        output = {
+            'meta': self.meta(options, dataset),
+            'results': results,
+            'uncovered': sorted(f'{name} {method.upper()}' for name, method in set(self.routes()) - covered),
+        }
+
+        if options['endpoint']:
+            output['uncovered'] = []
+
+        regressions = []
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                output['comparison'], regressions = self.compare(results, json.load(file), options['max_slowdown'])
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(output, file, indent=2, default=str)
+
+        if options['json']:
+            report(self.stdout, output, as_json=True)
+        else:
+            report(self.stdout, results)
+
+            for name, change in output.get('comparison', {}).items():
+                self.stdout.write(f"{name}: p50 x{change['p50_ratio']}, queries {change['queries_delta']:+d}")
+
+            if output['uncovered']:
+                self.stdout.write(self.style.WARNING(f"Not covered: {', '.join(output['uncovered'])}"))
+
+        failed = [name for name, result in results.items() if 'error' in result or result.get('errors')]
+
+        if failed:
+            raise CommandError(f"Unexpected status codes: {', '.join(failed)}")
+
+        if regressions:
+            raise CommandError(f"Regressions against {options['compare']}: {', '.join(regressions)}")
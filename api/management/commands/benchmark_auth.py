@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import CachedJWTAuthentication, user_cache
+from api.benchmark import measure, report
+from api.views import CourseViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Autentifikatsiya qilingan so'rovlar o'tkazish qobiliyatini JWTAuthentication (har so'rovda User SELECT) va "
+        "CachedJWTAuthentication (jarayon ichidagi kesh) bilan solishtiradi. So'rovlar CourseViewSet.list ga "
+        "throttle siz yuboriladi. Test ma'lumotlari tranzaksiya oxirida bekor qilinadi."
+    )
+
+    classes = {
+        'jwt': JWTAuthentication,
+        'cached': CachedJWTAuthentication,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Har bir autentifikatsiya klassi uchun so'rovlar soni.")
+        parser.add_argument('--users', type=int, default=50, help="So'rov yuboradigan turli foydalanuvchilar soni.")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqaradi.")
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        results = {}
+
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(username=f'benchmark-auth-{i}', email=f'benchmark-auth-{i}@example.com') for i in range(options['users'])
+            ])
+            users = User.objects.filter(username__startswith='benchmark-auth-')
+            headers = [f'Bearer {AccessToken.for_user(user)}' for user in users]
+
+            for name, authentication_class in self.classes.items():
+                view = CourseViewSet.as_view({'get': 'list'}, authentication_classes=[authentication_class], throttle_classes=[])
+                counter = iter(range(10 ** 12))
+                user_cache.clear()
+
+                def request():
+                    response = view(factory.get('/api/v1/courses/', HTTP_AUTHORIZATION=headers[next(counter) % len(headers)]))
+                    assert response.status_code == 200, response.status_code
+
+                results[name] = measure(request, options['requests'], warmup=len(headers))
+
+            transaction.set_rollback(True)
+
+        results['speedup'] = round(results['cached']['per_second'] / results['jwt']['per_second'], 2)
+        report(self.stdout, results, options['json'])
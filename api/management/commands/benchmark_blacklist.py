@@ -0,0 +1,82 @@
+import random
+import uuid
+
+import jwt
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.benchmark import measure, report
+from api.blacklist import TokenBlacklist, get_jti, token_digest
+from api.models import BlacklistedToken
+
+# Avvalgi (baseline) sxema: token to'liq matni indekssiz CharField(500) da saqlanardi
+BASELINE_TABLE = 'benchmark_blacklist_baseline'
+
+
+class Command(BaseCommand):
+    help = (
+        "BlackListAccessTokenMiddleware tekshiruvini o'lchaydi: avvalgi usul (har so'rovda indekssiz token ustuni bo'yicha "
+        "bazaga murojaat), indekslangan jti_hash bo'yicha murojaat va Bloom filter orqali tekshiruv. "
+        "Test ma'lumotlari tranzaksiya oxirida bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=10000, help="Qora ro'yxatdagi tokenlar soni.")
+        parser.add_argument('--lookups', type=int, default=5000, help="Har bir usul uchun tekshiruvlar soni.")
+        parser.add_argument('--hit-rate', type=float, default=0.01, help="Qora ro'yxatdagi tokenlar bilan keladigan so'rovlar ulushi.")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqaradi.")
+
+    def encode(self, jti):
+        return jwt.encode({'jti': jti}, 'benchmark-signing-key-' * 2)
+
+    def create_baseline(self, cursor, tokens):
+        '''
+        create_baseline - avvalgi BlacklistedToken jadvalining nusxasini vaqtinchalik jadval sifatida yaratadi va to'ldiradi.
+        '''
+
+        table = connection.ops.quote_name(BASELINE_TABLE)
+        cursor.execute(f'CREATE TEMPORARY TABLE {table} (id INTEGER PRIMARY KEY, token VARCHAR(500) NOT NULL)')
+        cursor.executemany(f'INSERT INTO {table} (id, token) VALUES (%s, %s)', list(enumerate(tokens, 1)))
+
+        return f'SELECT 1 AS a FROM {table} WHERE token = %s LIMIT 1'
+
+    def handle(self, *args, **options):
+        blacklisted = [str(uuid.uuid4()) for _ in range(options['tokens'])]
+        tokens = {jti: self.encode(jti) for jti in blacklisted}
+        lookups = [
+            tokens[random.choice(blacklisted)] if random.random() < options['hit_rate'] else self.encode(str(uuid.uuid4()))
+            for _ in range(options['lookups'])
+        ]
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(jti_hash=token_digest(jti)) for jti in blacklisted], batch_size=1000
+            )
+            baseline_sql = self.create_baseline(cursor, tokens.values())
+
+            blacklist = TokenBlacklist()
+            blacklist.refresh(force=True)
+
+            baseline = iter(lookups)
+            indexed = iter(lookups)
+            bloom = iter(lookups)
+
+            def baseline_lookup():
+                cursor.execute(baseline_sql, [next(baseline)])
+                return cursor.fetchone() is not None
+
+            results = {
+                'tokens': options['tokens'],
+                'baseline': measure(baseline_lookup, options['lookups']),
+                'indexed': measure(
+                    lambda: BlacklistedToken.objects.filter(jti_hash=token_digest(get_jti(next(indexed)))).exists(),
+                    options['lookups'],
+                ),
+                'bloom': measure(lambda: blacklist.contains(next(bloom)), options['lookups']),
+            }
+
+            transaction.set_rollback(True)
+
+        results['speedup'] = round(results['bloom']['per_second'] / results['baseline']['per_second'], 2)
+        results['speedup_indexed'] = round(results['indexed']['per_second'] / results['baseline']['per_second'], 2)
+        report(self.stdout, results, options['json'])
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.test import Client, override_settings
+
+from api.benchmark import measure, report
+
+
+class Command(BaseCommand):
+    help = (
+        "So'rovga javob berish kechikishini (p50/p99) baza ulanishlarining uch xil rejimida o'lchaydi: har so'rovda yangi ulanish, "
+        "doimiy ulanish (CONN_MAX_AGE + CONN_HEALTH_CHECKS) va psycopg connection pool. "
+        "Har bir so'rovdan oldin va keyin Django so'rov siklidagi kabi close_old_connections chaqiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/courses/', help="O'lchanadigan endpoint.")
+        parser.add_argument('--requests', type=int, default=500, help="Har bir rejim uchun so'rovlar soni.")
+        parser.add_argument('--warmup', type=int, default=20, help="O'lchovdan oldingi so'rovlar soni.")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqaradi.")
+
+    def modes(self, settings_dict):
+        options = {key: value for key, value in settings_dict['OPTIONS'].items() if key != 'pool'}
+
+        yield 'new_connection', {**settings_dict, 'CONN_MAX_AGE': 0, 'OPTIONS': options}
+        yield 'persistent', {**settings_dict, 'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True, 'OPTIONS': options}
+
+        if settings_dict['ENGINE'] == 'django.db.backends.postgresql':
+            yield 'pool', {**settings_dict, 'CONN_MAX_AGE': 0, 'OPTIONS': {**options, 'pool': {'min_size': 2, 'max_size': 4}}}
+
+    def use(self, settings_dict):
+        connections['default'].close()
+        connections.settings['default'] = settings_dict
+        connections['default'] = connections.create_connection('default')
+
+    def handle(self, *args, **options):
+        original = connections.settings['default']
+        client = Client()
+        counter = iter(range(1 << 24))
+        results = {}
+
+        def request():
+            # Har bir so'rov alohida IP dan yuboriladi, shuning uchun throttle natijaga ta'sir qilmaydi
+            number = next(counter)
+            close_old_connections()
+            response = client.get(options['path'], REMOTE_ADDR=f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}')
+            close_old_connections()
+
+            if response.status_code != 200:
+                raise RuntimeError(f"{options['path']} returned {response.status_code}")
+
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for name, settings_dict in self.modes(original):
+                self.use(settings_dict)
+
+                try:
+                    results[name] = measure(request, options['requests'], options['warmup'])
+                except Exception as error:
+                    results[name] = f"skipped ({error})"
+                finally:
+                    connections['default'].close()
+
+                    if 'pool' in settings_dict['OPTIONS']:
+                        connections['default'].close_pool()
+
+        self.use(original)
+
+        if original['ENGINE'] != 'django.db.backends.postgresql':
+            results['pool'] = "skipped (requires PostgreSQL with psycopg 3)"
+
+        report(self.stdout, results, options['json'])
@@ -0,0 +1,84 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.benchmark import measure, report
+from api.models import Comments, Courses, Lessons
+from api.renderers import EnvelopeJSONRenderer, EnvelopeResponse, ORJSONRenderer, orjson
+from api.serializers import CommentSerializer, LessonSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Katta dars va izoh sahifalarini render qilish vaqtini va javob hajmini (bayt) solishtiradi: avvalgi usul "
+        "(konvert Python da yig'iladi + JSONRenderer), EnvelopeJSONRenderer va ORJSONRenderer. "
+        "Test ma'lumotlari tranzaksiya oxirida bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help="Sahifadagi qatorlar soni.")
+        parser.add_argument('--iterations', type=int, default=50, help="Har bir renderer uchun takrorlar soni.")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqaradi.")
+
+    def legacy(self, data, meta):
+        # user-021 gacha: paginatsiya konvertni o'zi yig'ardi, keyin JSONRenderer ishlatilardi
+        return JSONRenderer().render({'data': data, **meta, 'error': None, 'success': True})
+
+    def pages(self, rows):
+        teacher = User.objects.create_user(username='benchmark-renderers', email='benchmark-renderers@example.com')
+        course = Courses.objects.create(name='benchmark-renderers')
+        lessons = Lessons.objects.bulk_create([
+            Lessons(title=f'Lesson {i}', description='Lorem ipsum dolor sit amet. ' * 8, course=course, teacher=teacher)
+            for i in range(rows)
+        ])
+        Comments.objects.bulk_create([
+            Comments(text=f'Comment {i} — izoh matni ' * 4, lesson=lessons[i % len(lessons)], author=teacher)
+            for i in range(rows)
+        ])
+
+        context = {'request': APIRequestFactory().get('/api/v1/')}
+
+        for name, queryset, serializer_class in (
+            ('lessons', Lessons.objects.filter(course=course), LessonSerializer),
+            ('comments', Comments.objects.filter(lesson__course=course), CommentSerializer),
+        ):
+            queryset = queryset.select_related(*serializer_class.get_select_related()).order_by('pk')
+            yield name, serializer_class(queryset, many=True, context=context).data
+
+    def handle(self, *args, **options):
+        results = {'orjson_installed': orjson() is not None}
+        meta = {'count': options['rows'], 'next': 'http://localhost:8000/api/v1/?page=2', 'previous': None}
+
+        with transaction.atomic():
+            for name, data in self.pages(options['rows']):
+                response = EnvelopeResponse(data, meta=meta)
+                context = {'response': response}
+                renderers = {
+                    'legacy': lambda: self.legacy(data, meta),
+                    'envelope': lambda: EnvelopeJSONRenderer().render(data, renderer_context=context),
+                    'orjson': lambda: ORJSONRenderer().render(data, renderer_context=context),
+                }
+                expected = json.loads(renderers['legacy']())
+
+                for renderer, render in renderers.items():
+                    content = render()
+
+                    if json.loads(content) != expected:
+                        raise AssertionError(f"{renderer} output differs from legacy output for {name}")
+
+                    results[f'{name}:{renderer}'] = {
+                        'bytes': len(content),
+                        **measure(render, options['iterations'], warmup=2),
+                    }
+
+                results[f'{name}:speedup'] = round(
+                    results[f'{name}:orjson']['per_second'] / results[f'{name}:legacy']['per_second'], 2
+                )
+
+            transaction.set_rollback(True)
+
+        report(self.stdout, results, options['json'])
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import LessonFile
+from api.storage import BLOB_RE, content_storage
+from api.uploads import PartFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Eski (digest siz nomli) LessonFile fayllarini ContentAddressedStorage bloblariga ko'chiradi, bir xil fayllarni "
+        "bitta nusxaga birlashtiradi va hech qaysi qatorda ishlatilmayotgan bloblarni o'chiradi. Bo'shatilgan baytlar soni chiqariladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Hech narsani o'zgartirmasdan faqat hisobot chiqarish.")
+
+    def digest(self, path):
+        hasher = hashlib.sha256()
+
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+    def migrate(self, name):
+        '''
+        migrate - eski faylni hard link orqali blobga ko'chiradi (nusxalamasdan), qatorlarni yangilaydi va eski nomni o'chiradi.
+        Bazani yangilashda xatolik bo'lsa eski fayl joyida qoladi.
+        '''
+
+        directory = content_storage.path('.tmp')
+        os.makedirs(directory, exist_ok=True)
+        link = os.path.join(directory, uuid.uuid4().hex)
+        os.link(content_storage.path(name), link)
+
+        with open(link, 'rb') as file:
+            new_name = content_storage.save(name, PartFile(file, name=name))
+
+        with transaction.atomic():
+            LessonFile.objects.filter(file=name).update(file=new_name)
+
+        os.remove(content_storage.path(name))
+        return new_name
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        names = (
+            LessonFile.objects.exclude(file='').order_by().values_list('file', flat=True).distinct()
+        )
+        digests = set()
+        rows = files = duplicates = missing = reclaimed = 0
+
+        for name in names.iterator():
+            if BLOB_RE.match(name):
+                continue
+
+            if not content_storage.exists(name):
+                missing += 1
+                self.stderr.write(f"{name}: file not found")
+                continue
+
+            size = content_storage.size(name)
+            blob = content_storage.blob_name(name, self.digest(content_storage.path(name)))
+
+            if blob in digests or content_storage.exists(blob):
+                duplicates += 1
+                reclaimed += size
+
+            digests.add(blob)
+            files += 1
+            rows += LessonFile.objects.filter(file=name).count()
+
+            if not dry_run:
+                self.migrate(name)
+
+        collected, collected_size = content_storage.collect_garbage(dry_run=dry_run)
+
+        self.stdout.write(f"{files} files ({rows} rows) moved to {len(digests)} blobs, {duplicates} duplicates, {missing} missing.")
+        self.stdout.write(f"{collected} unreferenced blobs collected ({collected_size} bytes).")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would reclaim' if dry_run else 'Reclaimed'} {reclaimed + collected_size} bytes."
+        ))
@@ -0,0 +1,68 @@
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import percentile, report
+
+
+class Command(BaseCommand):
+    help = (
+        "Ishlab turgan serverga parallel GET so'rovlar yuborib, sekundiga so'rovlar (RPS) va kechikishni o'lchaydi. "
+        "runserver va gunicorn (course.server) ni bir xil parametrlar bilan solishtirish uchun ishlatiladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', help="So'rov yuboriladigan URL (bir necha marta berish mumkin).")
+        parser.add_argument('--requests', type=int, default=1000, help="Har bir URL uchun so'rovlar soni.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Parallel mijozlar soni.")
+        parser.add_argument('--timeout', type=float, default=10, help="Bitta so'rov uchun kutish vaqti (soniya).")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqaradi.")
+
+    def fetch(self, url, timeout):
+        started = time.perf_counter()
+
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+        except OSError:
+            status = None
+
+        return status, time.perf_counter() - started
+
+    def run(self, url, requests, concurrency, timeout):
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda _: self.fetch(url, timeout), range(requests)))
+
+        elapsed = time.perf_counter() - started
+        timings = [timing for _, timing in results]
+        statuses = {}
+
+        for status, _ in results:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+        return {
+            'requests': requests,
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 3),
+            'per_second': round(requests / elapsed, 2),
+            'p50_ms': round(percentile(timings, 50) * 1000, 2),
+            'p99_ms': round(percentile(timings, 99) * 1000, 2),
+            'statuses': statuses,
+        }
+
+    def handle(self, *args, **options):
+        urls = options['url'] or ['http://127.0.0.1:8000/api/v1/courses/', 'http://127.0.0.1:8000/static/admin/css/base.css']
+
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        results = {url: self.run(url, options['requests'], options['concurrency'], options['timeout']) for url in urls}
+        report(self.stdout, results, options['json'])
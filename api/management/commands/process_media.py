@@ -0,0 +1,73 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+
+from api.media import pending, process
+from api.models import LessonFile
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "LessonFile fayllari uchun metadata va kichik nusxalarni (api.media) shu jarayonda yaratadi. "
+        "Standart holatda faqat hali ishlanmagan, almashtirilgan yoki xatolik bilan tugagan fayllar olinadi. "
+        "--watch bilan MEDIA_PROCESSING['MODE'] = 'worker' uchun doimiy worker sifatida ishlaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help="LessonFile ID lari (berilmasa barcha mos fayllar).")
+        parser.add_argument('--force', action='store_true', help="Allaqachon ishlangan fayllarni ham qayta ishlash.")
+        parser.add_argument('--watch', action='store_true', help="Yangi va almashtirilgan fayllarni kutib, ularni to'xtovsiz ishlash.")
+        parser.add_argument('--poll-interval', type=float, default=5, help="Navbat bo'sh bo'lganda kutish vaqti (soniya).")
+        parser.add_argument('--batch-size', type=int, default=100, help="Navbatdan bir martada olinadigan fayllar soni.")
+
+    def handle(self, *args, **options):
+        if options['watch']:
+            return self.watch(options['poll_interval'], options['batch_size'])
+
+        queryset = LessonFile.objects.exclude(file='')
+
+        if options['ids']:
+            queryset = queryset.filter(pk__in=options['ids'])
+        elif not options['force']:
+            queryset = queryset.filter(Q(pk__in=pending().values('pk')) | Q(metadata__status='failed'))
+
+        counts = {}
+
+        for pk in queryset.values_list('pk', flat=True).iterator():
+            metadata = process(pk, force=options['force']) or {}
+            status = metadata.get('status', 'skipped')
+            counts[status] = counts.get(status, 0) + 1
+
+            if status == 'failed':
+                self.stderr.write(f"LessonFile {pk}: {metadata.get('error')}")
+
+        summary = ', '.join(f'{count} {status}' for status, count in sorted(counts.items())) or 'nothing to do'
+        self.stdout.write(self.style.SUCCESS(f"Processed files: {summary}."))
+
+    def watch(self, poll_interval, batch_size):
+        '''
+        watch - pending() navbatidagi fayllarni ishlaydi, navbat bo'sh bo'lsa poll_interval kutadi. Xatolik bilan
+        tugagan fayllar (status = failed) navbatga qaytmaydi, ular process_media ni argumentsiz ishga tushirib qayta ishlanadi.
+        '''
+
+        while True:
+            ids = list(pending().values_list('pk', flat=True)[:batch_size])
+            errors = False
+
+            for pk in ids:
+                try:
+                    process(pk)
+                except Exception:
+                    logger.exception("Media processing failed for LessonFile %s", pk)
+                    errors = True
+
+            close_old_connections()
+
+            # Saqlashda xatolik bo'lsa o'sha fayllar navbatda qoladi, ularni darhol qayta olmaslik uchun kutiladi
+            if not ids or errors:
+                time.sleep(poll_interval)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.blacklist import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Muddati tugagan access tokenlarni (api.BlacklistedToken) va simplejwt outstanding/blacklisted "
+        "tokenlarini bo'laklab o'chiradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Bitta DELETE so'rovidagi qatorlar soni.")
+
+    def handle(self, *args, **options):
+        removed, elapsed = purge_expired_tokens(options['batch_size'])
+
+        for label, count in sorted(removed.items()):
+            self.stdout.write(f"{label}: {count}")
+
+        self.stdout.write(self.style.SUCCESS(f"{sum(removed.values())} rows removed in {elapsed:.3f}s."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Uzoq vaqt yangilanmagan tugallanmagan yuklashlarni (api.Upload) va ularning .part fayllarini o'chiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None, help="Soniyalarda, standart UPLOADS['EXPIRE_AFTER'].")
+
+    def handle(self, *args, **options):
+        rows, files, size = purge_stale_uploads(options['max_age'])
+        self.stdout.write(self.style.SUCCESS(f"{rows} uploads and {files} files removed, {size} bytes freed."))
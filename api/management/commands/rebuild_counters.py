@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.counters import COUNTERS, rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Courses.lesson_count, Lessons.comment_count va Lessons.file_count hisoblagichlarini haqiqiy qatorlar soni "
+        "bo'yicha qayta hisoblaydi. Har bir partiya bitta UPDATE bilan yoziladi. like/dislike uchun reconcile_reactions ishlatiladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Bitta UPDATE da tekshiriladigan ota qatorlar soni.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for model, counters in COUNTERS.items():
+            for field_name, parent, field in counters:
+                ids = list(parent.objects.order_by('pk').values_list('pk', flat=True))
+                fixed = 0
+
+                for start in range(0, len(ids), batch_size):
+                    with transaction.atomic():
+                        fixed += rebuild(parent, field, model, field_name, parent.objects.filter(pk__in=ids[start:start + batch_size]))
+
+                self.stdout.write(f"{parent._meta.label}.{field}: {len(ids)} checked, {fixed} fixed.")
+
+        self.stdout.write(self.style.SUCCESS("Counters rebuilt."))
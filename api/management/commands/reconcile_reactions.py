@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from api.cache import bump_version
+from api.models import Lessons
+
+
+class Command(BaseCommand):
+    help = "Lessons.like va Lessons.dislike hisoblagichlarini LessonReaction jadvali asosida qayta hisoblaydi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Bitta tranzaksiyada tekshiriladigan darslar soni.")
+        parser.add_argument('--dry-run', action='store_true', help="Bazaga yozmasdan faqat farqlarni hisoblaydi.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        ids = list(Lessons.objects.order_by('pk').values_list('pk', flat=True))
+        fixed = 0
+
+        for start in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                batch = ids[start:start + batch_size]
+
+                # Qulf reaksiya almashtirish (api.reactions.toggle_reaction) bilan bir xil tartibda olinadi.
+                list(Lessons.objects.select_for_update().filter(pk__in=batch).values_list('pk', flat=True))
+
+                lessons = list(
+                    Lessons.objects.filter(pk__in=batch).annotate(
+                        real_like=Count('lesson_reaction', filter=Q(lesson_reaction__reaction='like')),
+                        real_dislike=Count('lesson_reaction', filter=Q(lesson_reaction__reaction='dislike')),
+                    ).exclude(like=F('real_like'), dislike=F('real_dislike')).only('pk', 'like', 'dislike')
+                )
+
+                for lesson in lessons:
+                    self.stdout.write(
+                        f"Lesson {lesson.pk}: like {lesson.like} -> {lesson.real_like}, "
+                        f"dislike {lesson.dislike} -> {lesson.real_dislike}"
+                    )
+                    lesson.like = lesson.real_like
+                    lesson.dislike = lesson.real_dislike
+
+                if lessons and not options['dry_run']:
+                    Lessons.objects.bulk_update(lessons, ['like', 'dislike'])
+                    bump_version(Lessons)
+
+                fixed += len(lessons)
+
+        action = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{len(ids)} lessons checked, {fixed} {action}."))
@@ -0,0 +1,216 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.benchmark import report
+from api.cache import bump_version
+from api.counters import COUNTERS, rebuild
+from api.models import Comments, Courses, LessonFile, LessonReaction, Lessons
+from api.reactions import REACTIONS
+from api.search import update_search_vectors
+from api.storage import content_storage
+
+USERNAME_PREFIX = 'seed-user-'
+COURSE_PREFIX = 'Seed course '
+
+WORDS = (
+    'python django api model view query index cache lesson course module test deploy server client token '
+    'database migration signal serializer router request response async thread pool worker queue stream file'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark va yuklama testlari uchun berilgan hajmdagi realistik ma'lumotlarni yaratadi: foydalanuvchilar, kurslar, "
+        "darslar, like/dislike, ichma-ich izohlar va fayllar. Qatorlar bulk_create bilan partiyalab yoziladi, "
+        "hisoblagichlar va qidiruv vektorlari oxirida bir marta hisoblanadi. --seed bir xil bo'lsa natija ham bir xil bo'ladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help="Foydalanuvchilar soni.")
+        parser.add_argument('--teachers', type=int, default=10, help="Ulardan o'qituvchilar (is_staff) soni.")
+        parser.add_argument('--courses', type=int, default=20, help="Kurslar soni.")
+        parser.add_argument('--lessons-per-course', type=int, default=20, help="Har bir kursdagi darslar soni.")
+        parser.add_argument('--comments-per-lesson', type=int, default=10, help="Har bir darsdagi izohlar soni.")
+        parser.add_argument('--reply-ratio', type=float, default=0.5, help="Izohlarning qancha qismi boshqa izohga javob.")
+        parser.add_argument('--max-depth', type=int, default=5, help="Izohlar daraxtining eng katta chuqurligi.")
+        parser.add_argument('--files-per-lesson', type=int, default=2, help="Har bir darsdagi fayllar soni.")
+        parser.add_argument('--reactions-per-lesson', type=int, default=20, help="Har bir darsga bosilgan like/dislike soni.")
+        parser.add_argument('--seed', type=int, default=0, help="Tasodifiy sonlar generatori uchun boshlang'ich qiymat.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Bitta INSERT dagi qatorlar soni.")
+        parser.add_argument('--flush', action='store_true', help="Avval oldingi seed_data ma'lumotlarini o'chiradi.")
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqaradi.")
+
+    def text(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def flush(self):
+        # Izohlar, fayllar va reaksiyalar kurslar/darslar bilan birga CASCADE orqali o'chadi
+        Courses.objects.filter(name__startswith=COURSE_PREFIX).delete()
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    def create_users(self, count, teachers):
+        start = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        users = [
+            User(
+                username=f'{USERNAME_PREFIX}{number}',
+                email=f'{USERNAME_PREFIX}{number}@example.com',
+                first_name=self.random.choice(WORDS).title(),
+                is_staff=index < teachers,
+            )
+            for index, number in enumerate(range(start, start + count))
+        ]
+
+        for user in users:
+            # Parol xeshlash (PBKDF2) har bir foydalanuvchiga ~0.1 s ketadi, seed foydalanuvchilari login qilmaydi
+            user.set_unusable_password()
+
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def create_courses(self, count):
+        start = Courses.objects.filter(name__startswith=COURSE_PREFIX).count()
+        return Courses.objects.bulk_create(
+            [Courses(name=f'{COURSE_PREFIX}{number}') for number in range(start, start + count)],
+            batch_size=self.batch_size,
+        )
+
+    def create_lessons(self, courses, teachers, users, per_course, reactions_per_lesson):
+        lessons, reactions = [], []
+
+        for course in courses:
+            for number in range(per_course):
+                lesson = Lessons(
+                    title=f'Lesson {number}: {self.text(3)}',
+                    description=self.text(self.random.randint(10, 60)),
+                    course=course,
+                    teacher=self.random.choice(teachers),
+                    is_active=self.random.random() > 0.1,
+                )
+                voters = self.random.sample(users, min(reactions_per_lesson, len(users)))
+
+                # like/dislike hisoblagichlari reaksiyalar bilan birga yoziladi, reconcile_reactions kerak bo'lmaydi
+                for user in voters:
+                    reaction = self.random.choice(REACTIONS)
+                    setattr(lesson, reaction, getattr(lesson, reaction) + 1)
+                    reactions.append(LessonReaction(lesson=lesson, user=user, reaction=reaction))
+
+                lessons.append(lesson)
+
+        # bulk_create lesson_id ni saqlangan darsning pk sidan o'zi to'ldiradi
+        Lessons.objects.bulk_create(lessons, batch_size=self.batch_size)
+        LessonReaction.objects.bulk_create(reactions, batch_size=self.batch_size)
+
+        return lessons, reactions
+
+    def create_comments(self, lessons, users, per_lesson, reply_ratio, max_depth):
+        '''
+        create_comments - izohlarni daraja bo'yicha yaratadi: har bir daraja bitta bulk_create bilan yoziladi, shunda
+        javoblar yozilayotganda ota izohlarning pk si ma'lum bo'ladi va path/depth (assign_path) bazaga murojaatsiz hisoblanadi.
+        '''
+
+        levels = [[] for _ in range(max(max_depth, 1))]
+
+        for lesson in lessons:
+            thread = []
+
+            for _ in range(per_lesson):
+                parents = [comment for comment in thread if comment.depth + 1 < len(levels)]
+                reply = self.random.choice(parents) if parents and self.random.random() < reply_ratio else None
+                comment = Comments(
+                    text=self.text(self.random.randint(5, 40)),
+                    lesson=lesson,
+                    author=self.random.choice(users),
+                    reply=reply,
+                    depth=reply.depth + 1 if reply else 0,
+                )
+                thread.append(comment)
+                levels[comment.depth].append(comment)
+
+        for level in levels:
+            for comment in level:
+                # Ota izoh oldingi darajada saqlangan, reply_id ni uning pk si bilan yangilash kerak
+                comment.reply = comment.reply
+                comment.assign_path()
+
+            Comments.objects.bulk_create(level, batch_size=self.batch_size)
+
+        return [comment for level in levels for comment in level]
+
+    def create_files(self, lessons, per_lesson, blobs=8):
+        '''
+        create_files - bir nechta turli fayl diskka bir marta yoziladi (ContentAddressedStorage), LessonFile qatorlari ularga havola qiladi.
+        '''
+
+        if not per_lesson or not lessons:
+            return []
+
+        names = [
+            (content_storage.save(f'lessons/seed-{number}.txt', ContentFile(self.text(200).encode())), f'seed-{number}.txt')
+            for number in range(blobs)
+        ]
+        files = []
+
+        for lesson in lessons:
+            for _ in range(per_lesson):
+                name, original = self.random.choice(names)
+                files.append(LessonFile(lesson=lesson, file=name, name=original))
+
+        return LessonFile.objects.bulk_create(files, batch_size=self.batch_size)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        timings = {}
+        started = time.perf_counter()
+
+        def step(name, func, *args):
+            start = time.perf_counter()
+            result = func(*args)
+            timings[name] = round(time.perf_counter() - start, 3)
+            return result
+
+        with transaction.atomic():
+            if options['flush']:
+                step('flush', self.flush)
+
+            users = step('users', self.create_users, max(options['users'], 1), options['teachers'])
+            teachers = [user for user in users if user.is_staff] or users
+            courses = step('courses', self.create_courses, options['courses'])
+            lessons, reactions = step(
+                'lessons', self.create_lessons, courses, teachers, users,
+                options['lessons_per_course'], options['reactions_per_lesson'],
+            )
+            comments = step(
+                'comments', self.create_comments, lessons, users,
+                options['comments_per_lesson'], options['reply_ratio'], options['max_depth'],
+            )
+            files = step('files', self.create_files, lessons, options['files_per_lesson'])
+
+            def finish():
+                for model, counters in COUNTERS.items():
+                    for field_name, parent, field in counters:
+                        rebuild(parent, field, model, field_name)
+
+                for model, instances in ((Lessons, lessons), (Comments, comments)):
+                    for start in range(0, len(instances), self.batch_size):
+                        update_search_vectors(model, instances[start:start + self.batch_size])
+
+                bump_version(Courses, Lessons, LessonFile, Comments)
+
+            step('counters_and_search', finish)
+
+        results = {
+            'users': len(users),
+            'courses': len(courses),
+            'lessons': len(lessons),
+            'reactions': len(reactions),
+            'comments': len(comments),
+            'files': len(files),
+            'seconds': {**timings, 'total': round(time.perf_counter() - started, 3)},
+        }
+
+        report(self.stdout, results, options['json'])
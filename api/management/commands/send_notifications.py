@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.notifications import process_next
+
+
+class Command(BaseCommand):
+    help = "LessonNotification navbatidagi (outbox) email xabarnomalarni yuboruvchi worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Navbatni bir marta bo'shatib, to'xtaydi.")
+        parser.add_argument('--chunk-size', type=int, default=100, help="Bitta SMTP ulanish orqali yuboriladigan xabarlar soni.")
+        parser.add_argument('--poll-interval', type=float, default=5, help="Navbat bo'sh bo'lganda kutish vaqti (soniya).")
+        parser.add_argument('--lease', type=int, default=300, help="Xabarnoma bitta workerga band qilinadigan vaqt (soniya).")
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--retry-delay', type=int, default=60, help="Birinchi qayta urinishgacha kutish (soniya).")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_next(
+                chunk_size=options['chunk_size'],
+                lease=options['lease'],
+                max_attempts=options['max_attempts'],
+                retry_delay=options['retry_delay'],
+            )
+            close_old_connections()
+
+            if not processed:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
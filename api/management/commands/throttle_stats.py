@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand
+from rest_framework.settings import api_settings
+
+from api.throttling import get_store
+
+
+class Command(BaseCommand):
+    help = "Har bir throttle scope bo'yicha o'tkazilgan (hit) va rad etilgan (reject) so'rovlar sonini chiqaradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Natijani JSON ko'rinishida chiqarish.")
+
+    def handle(self, *args, **options):
+        stats = get_store().stats(sorted(api_settings.DEFAULT_THROTTLE_RATES))
+
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        for scope, counters in stats.items():
+            total = counters['hit'] + counters['reject']
+            rejected = counters['reject'] / total * 100 if total else 0
+            self.stdout.write(f"{scope}: {counters['hit']} hit, {counters['reject']} reject ({rejected:.1f}% rejected)")
@@ -0,0 +1,387 @@
+import json
+import logging
+import mimetypes
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import django
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+
+from .cache import bump_version
+from .models import LessonFile, LessonFileRendition
+
+logger = logging.getLogger(__name__)
+
+
+def get_options():
+    return {
+        'MODE': 'worker',
+        'WORKERS': 2,
+        'SIZES': [256, 640, 1280],
+        'TRANSCODE': False,
+        'TIMEOUT': 300,
+        **getattr(settings, 'MEDIA_PROCESSING', {}),
+    }
+
+
+def pillow():
+    '''
+    pillow - Pillow o'rnatilgan bo'lsa (Image, ImageOps) modullarini, aks holda (None, None) qaytaradi.
+    '''
+
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None, None
+
+    return Image, ImageOps
+
+
+def run(*args):
+    return subprocess.run(
+        args, capture_output=True, check=True, text=True, timeout=get_options()['TIMEOUT'],
+    ).stdout
+
+
+def ffprobe(path):
+    return json.loads(run('ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path))
+
+
+def video_stream(info):
+    return next((stream for stream in info.get('streams', []) if stream.get('codec_type') == 'video'), {})
+
+
+def image_info(path):
+    Image, ImageOps = pillow()
+
+    if Image is not None:
+        with Image.open(path) as image:
+            width, height = ImageOps.exif_transpose(image).size
+            return {'mime_type': Image.MIME.get(image.format), 'width': width, 'height': height}
+
+    if shutil.which('ffprobe'):
+        stream = video_stream(ffprobe(path))
+        return {'width': stream.get('width'), 'height': stream.get('height')}
+
+    return {}
+
+
+def pdf_info(path):
+    '''
+    pdf_info - pdfinfo (poppler-utils) orqali sahifalar sonini va birinchi sahifa o'lchamini (pt) o'qiydi.
+    '''
+
+    if not shutil.which('pdfinfo'):
+        return {}
+
+    info = dict(line.split(':', 1) for line in run('pdfinfo', path).splitlines() if ':' in line)
+    result = {'pages': int(info['Pages'])} if 'Pages' in info else {}
+    size = info.get('Page size', '').split()
+
+    if len(size) >= 3 and size[1] == 'x':
+        result.update(width=round(float(size[0])), height=round(float(size[2])))
+
+    return result
+
+
+def pdf_poster(path, directory, size):
+    if not shutil.which('pdftoppm'):
+        return None
+
+    output = os.path.join(directory, 'page')
+    run('pdftoppm', '-f', '1', '-l', '1', '-png', '-singlefile', '-scale-to', str(size), path, output)
+    return f'{output}.png'
+
+
+def video_info(path):
+    if not shutil.which('ffprobe'):
+        return {}
+
+    info = ffprobe(path)
+    stream = video_stream(info)
+    duration = info.get('format', {}).get('duration')
+
+    return {
+        'width': stream.get('width'),
+        'height': stream.get('height'),
+        'duration': float(duration) if duration else None,
+    }
+
+
+def video_poster(path, directory, duration):
+    if not shutil.which('ffmpeg'):
+        return None
+
+    output = os.path.join(directory, 'poster.png')
+    position = min(1.0, (duration or 0) / 2)
+    run('ffmpeg', '-v', 'error', '-y', '-ss', str(position), '-i', path, '-frames:v', '1', output)
+    return output
+
+
+def transcode(path, directory, height=480):
+    '''
+    transcode - videoning height pikselgacha kichraytirilgan, tez ochiladigan (faststart) H.264/AAC nusxasini yaratadi.
+    '''
+
+    output = os.path.join(directory, f'video-{height}.mp4')
+    run(
+        'ffmpeg', '-v', 'error', '-y', '-i', path,
+        '-vf', f"scale=-2:'min({height},ih)'", '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28',
+        '-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart', output,
+    )
+    stream = video_stream(ffprobe(output))
+
+    return {'kind': LessonFileRendition.VIDEO, 'path': output, 'mime_type': 'video/mp4',
+            'width': stream.get('width'), 'height': stream.get('height')}
+
+
+def thumbnails(source, directory, sizes):
+    '''
+    thumbnails - manba rasmdan SIZES dagi har bir o'lchamga (eng katta tomoni bo'yicha) sig'adigan JPEG nusxalarni yaratadi.
+    Manbadan katta o'lchamlar tashlab ketiladi. Pillow bo'lmasa ffmpeg ishlatiladi, ikkalasi ham bo'lmasa nusxa yaratilmaydi.
+    '''
+
+    Image, ImageOps = pillow()
+    result = []
+
+    if Image is not None:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            targets = [size for size in sorted(sizes) if size < max(image.size)] or [max(image.size)]
+
+            for size in targets:
+                copy = image.copy()
+                copy.thumbnail((size, size), Image.Resampling.LANCZOS)
+                output = os.path.join(directory, f'image-{size}.jpg')
+                copy.save(output, 'JPEG', quality=80, optimize=True, progressive=True)
+                result.append({'kind': LessonFileRendition.IMAGE, 'path': output, 'mime_type': 'image/jpeg',
+                               'width': copy.width, 'height': copy.height})
+
+        return result
+
+    if not shutil.which('ffmpeg'):
+        return result
+
+    for size in sorted(sizes):
+        output = os.path.join(directory, f'image-{size}.jpg')
+        run(
+            'ffmpeg', '-v', 'error', '-y', '-i', source, '-frames:v', '1', '-q:v', '4',
+            '-vf', f"scale='min({size},iw)':'min({size},ih)':force_original_aspect_ratio=decrease", output,
+        )
+        stream = video_stream(ffprobe(output)) if shutil.which('ffprobe') else {}
+        result.append({'kind': LessonFileRendition.IMAGE, 'path': output, 'mime_type': 'image/jpeg',
+                       'width': stream.get('width'), 'height': stream.get('height')})
+
+    return result
+
+
+def process(lesson_file_id, force=False):
+    '''
+    process - LessonFile uchun metadata (mime turi, hajmi, o'lchamlari, sahifalar soni, davomiyligi) va nusxalarni yaratadi.
+
+    Rasmlar Pillow bilan, PDF birinchi sahifasi pdftoppm bilan, videodan kadr va 480p nusxa ffmpeg bilan olinadi.
+    Faqat serverda mavjud vositalar ishlatiladi, yo'q vositaga tegishli qadam tashlab ketiladi. Fayl allaqachon
+    ishlangan bo'lsa (metadata.source fayl nomiga teng) qayta ishlanmaydi. Ishlash vaqtida fayl almashtirilgan bo'lsa
+    natija saqlanmaydi - yangi fayl uchun alohida vazifa navbatga qo'yilgan bo'ladi.
+    '''
+
+    lesson_file = LessonFile.objects.filter(pk=lesson_file_id).first()
+
+    if lesson_file is None or not lesson_file.file:
+        return None
+
+    name = lesson_file.file.name
+
+    if not force and lesson_file.metadata.get('source') == name and lesson_file.metadata.get('status') == 'done':
+        return lesson_file.metadata
+
+    options = get_options()
+    path = lesson_file.file.path
+    mime_type = mimetypes.guess_type(lesson_file.name or name)[0] or 'application/octet-stream'
+    metadata = {'source': name, 'mime_type': mime_type, 'size': lesson_file.file.size}
+
+    with tempfile.TemporaryDirectory() as directory:
+        renditions = []
+
+        try:
+            poster = None
+
+            if mime_type.startswith('image/'):
+                metadata.update({key: value for key, value in image_info(path).items() if value})
+                poster = path
+            elif mime_type == 'application/pdf':
+                metadata.update(pdf_info(path))
+                poster = pdf_poster(path, directory, max(options['SIZES']))
+            elif mime_type.startswith('video/'):
+                metadata.update(video_info(path))
+                poster = video_poster(path, directory, metadata.get('duration'))
+
+                if options['TRANSCODE'] and shutil.which('ffmpeg'):
+                    renditions.append(transcode(path, directory))
+
+            if poster is not None:
+                renditions.extend(thumbnails(poster, directory, options['SIZES']))
+
+            metadata['status'] = 'done'
+        except Exception as error:
+            logger.exception("Media processing failed for LessonFile %s", lesson_file_id)
+            metadata.update(status='failed', error=str(error))
+            renditions = []
+
+        save_renditions(lesson_file, name, metadata, renditions)
+
+    return metadata
+
+
+def pending():
+    '''
+    pending - hali ishlanmagan yoki ishlangandan keyin fayli almashtirilgan (metadata.source fayl nomiga teng emas)
+    LessonFile lar. MODE = 'worker' bo'lganda process_media --watch navbati shu so'rov bilan olinadi.
+    '''
+
+    return (
+        LessonFile.objects.exclude(file='')
+        .annotate(source=KT('metadata__source'))
+        .filter(Q(source__isnull=True) | ~Q(source=F('file')))
+        .order_by('pk')
+    )
+
+
+def save_renditions(lesson_file, name, metadata, renditions):
+    '''
+    save_renditions - nusxa fayllarini saqlaydi, so'ng bitta tranzaksiyada eski nusxalarni o'chirib yangilarini va
+    metadata ni yozadi. metadata update() orqali yoziladi, shuning uchun post_save signali qayta ishga tushmaydi.
+    '''
+
+    stored = []
+
+    for rendition in renditions:
+        extension = os.path.splitext(rendition['path'])[1]
+
+        with open(rendition['path'], 'rb') as file:
+            stored.append(default_storage.save(
+                f"renditions/{lesson_file.pk}/{rendition['kind']}-{rendition['width']}{extension}", File(file),
+            ))
+
+    try:
+        with transaction.atomic():
+            if not LessonFile.objects.select_for_update().filter(pk=lesson_file.pk, file=name).exists():
+                raise LessonFile.DoesNotExist
+            for old in lesson_file.renditions.all():
+                old.delete()
+
+            LessonFileRendition.objects.bulk_create([
+                LessonFileRendition(
+                    lesson_file=lesson_file,
+                    kind=rendition['kind'],
+                    file=file_name,
+                    mime_type=rendition['mime_type'],
+                    size=default_storage.size(file_name),
+                    width=rendition['width'],
+                    height=rendition['height'],
+                )
+                for rendition, file_name in zip(renditions, stored)
+            ])
+            LessonFile.objects.filter(pk=lesson_file.pk).update(metadata=metadata)
+            bump_version(LessonFile)
+    except BaseException as error:
+        # Fayl almashtirilgan yoki o'chirilgan bo'lsa, yoki yozishda xatolik bo'lsa saqlangan nusxalar keraksiz
+        for file_name in stored:
+            default_storage.delete(file_name)
+
+        if not isinstance(error, LessonFile.DoesNotExist):
+            raise
+
+
+class MediaProcessor:
+    '''
+    MediaProcessor - LessonFile saqlangandan keyin process vazifasini MEDIA_PROCESSING['MODE'] bo'yicha bajaradi:
+        worker - API jarayonida hech narsa qilinmaydi, fayllarni alohida process_media --watch workeri navbatdan
+            (pending()) oladi (standart, gunicorn workerlari soniga bog'liq emas)
+        process - shu jarayonning ProcessPoolExecutor hovuzida (bitta jarayonli serverlar, runserver uchun)
+        sync - shu jarayonda (testlar uchun), None - umuman bajarilmaydi
+
+    Hovuz faqat birinchi vazifada "spawn" konteksti bilan yaratiladi va har bir jarayon django.setup() bilan boshlanadi.
+    Har bir API jarayoni o'z hovuzini (WORKERS ta jarayon) ochgani uchun bir nechta gunicorn workerlarida worker rejimi ishlatiladi.
+    Jarayon kutilmaganda to'xtasa hovuz qayta yaratiladi.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pending = {}
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=get_options()['WORKERS'],
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup,
+                )
+
+            return self.executor
+
+    def submit(self, lesson_file_id, force=False):
+        mode = get_options()['MODE']
+
+        if mode not in ('process', 'sync'):
+            return None
+
+        if mode == 'sync':
+            return process(lesson_file_id, force)
+
+        with self.lock:
+            # Shu fayl uchun navbatda turgan vazifa bo'lsa, ikkinchisi qo'shilmaydi
+            if lesson_file_id in self.pending and not self.pending[lesson_file_id].running() and not force:
+                return self.pending[lesson_file_id]
+
+        try:
+            future = self.get_executor().submit(process, lesson_file_id, force)
+        except BrokenProcessPool:
+            self.shutdown(wait=False)
+            future = self.get_executor().submit(process, lesson_file_id, force)
+
+        with self.lock:
+            self.pending[lesson_file_id] = future
+
+        future.add_done_callback(partial(self.done, lesson_file_id))
+        return future
+
+    def done(self, lesson_file_id, future):
+        with self.lock:
+            if self.pending.get(lesson_file_id) is future:
+                del self.pending[lesson_file_id]
+
+        if future.cancelled():
+            return
+
+        error = future.exception()
+
+        if isinstance(error, BrokenProcessPool):
+            self.shutdown(wait=False)
+
+        if error is not None:
+            logger.error("Media processing task failed: %r", error)
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+media_processor = MediaProcessor()
@@ -2,7 +2,9 @@ from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
 from rest_framework import status
 
-from .models import BlacklistedToken
+from .blacklist import token_blacklist, token_sweeper
+from .profiling import timing
+from .renderers import envelope
 
 
 class BlackListAccessTokenMiddleware(MiddlewareMixin):
@@ -11,7 +13,15 @@ class BlackListAccessTokenMiddleware(MiddlewareMixin):
     Agar bazada foydalanuvchi access tokeni mavjud bo'lsa quyida keltirilgan amallarni bajarishiga to'sqinlik qiladi.
 
     POST, PUT, PATCH, DELETE
+
+    Tekshiruv jarayon ichidagi Bloom filter (api.blacklist.token_blacklist) orqali bajariladi,
+    bazaga faqat filter tokenni "bo'lishi mumkin" deb topganda murojaat qilinadi.
+    Middleware yuklanganda muddati tugagan tokenlarni tozalovchi token_sweeper ham ishga tushiriladi (agar yoqilgan bo'lsa).
     '''
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        token_sweeper.start()
+
     def process_request(self, request):
         if request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
             auth_header = request.META.get('HTTP_AUTHORIZATION', None)
@@ -19,14 +29,13 @@ class BlackListAccessTokenMiddleware(MiddlewareMixin):
             if auth_header:
                 token = auth_header.split(' ')[1]
 
-                if BlacklistedToken.objects.filter(token=token).exists():
-                    return JsonResponse({
-                        'data': None,
-                        'error': {
-                            'errorId': status.HTTP_401_UNAUTHORIZED,
-                            'isFriendly': True,
-                            'errorMsg': "Authentication credentials were not provided."
-                        },
-                        'success': False
-                    }, status=status.HTTP_401_UNAUTHORIZED)
+                with timing('blacklist'):
+                    blacklisted = token_blacklist.contains(token)
+
+                if blacklisted:
+                    return JsonResponse(envelope({
+                        'errorId': status.HTTP_401_UNAUTHORIZED,
+                        'isFriendly': True,
+                        'errorMsg': "Authentication credentials were not provided."
+                    }, status.HTTP_401_UNAUTHORIZED), status=status.HTTP_401_UNAUTHORIZED)
 
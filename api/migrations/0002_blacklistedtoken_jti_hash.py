@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:12
+
+import hashlib
+
+import jwt
+from django.db import migrations, models
+
+
+def hash_tokens(apps, schema_editor):
+    BlacklistedToken = apps.get_model('api', 'BlacklistedToken')
+    seen = set()
+
+    for row in BlacklistedToken.objects.only('pk', 'token').iterator():
+        try:
+            jti = jwt.decode(row.token, options={'verify_signature': False}).get('jti')
+        except jwt.InvalidTokenError:
+            jti = None
+
+        digest = hashlib.sha256(str(jti).encode()).hexdigest() if jti else None
+
+        if digest is None or digest in seen:
+            row.delete()
+            continue
+
+        seen.add(digest)
+        BlacklistedToken.objects.filter(pk=row.pk).update(jti_hash=digest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklistedtoken',
+            name='jti_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='blacklistedtoken',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='jti_hash',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='blacklisted_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_blacklistedtoken_expires_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Kutilmoqda'), ('processing', 'Yuborilmoqda'), ('sent', 'Yuborildi'), ('failed', 'Xatolik')], default='pending', max_length=10, verbose_name='Holati')),
+                ('last_user_id', models.PositiveBigIntegerField(default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Urinishlar soni')),
+                ('error', models.TextField(blank=True, verbose_name='Xatolik')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name="Qo'shilgan vaqti")),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Yuborilgan vaqti')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='api.lessons', verbose_name='Darsi')),
+            ],
+            options={
+                'verbose_name': 'Xabarnoma ',
+                'verbose_name_plural': 'Xabarnomalar',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='notification_queue_idx')],
+            },
+        ),
+    ]
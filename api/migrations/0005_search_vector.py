@@ -0,0 +1,66 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:52
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+INDEXES = {
+    'lessons': django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lesson_search_idx'),
+    'comments': django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='comment_search_idx'),
+}
+
+WEIGHTS = {
+    'lessons': {'title': 'A', 'description': 'B'},
+    'comments': {'text': 'A'},
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for model_name, index in INDEXES.items():
+        model = apps.get_model('api', model_name)
+        schema_editor.add_index(model, index)
+
+        vector = [SearchVector(field, weight=weight, config='simple') for field, weight in WEIGHTS[model_name].items()]
+        model.objects.update(search_vector=sum(vector[1:], vector[0]))
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for model_name, index in INDEXES.items():
+        schema_editor.remove_index(apps.get_model('api', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_lessonnotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comments',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lessons',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # GIN indekslar faqat PostgreSQL da yaratiladi, SQLite da qidiruv api.search dagi Python indeksi orqali ishlaydi.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='comments', index=INDEXES['comments']),
+                migrations.AddIndex(model_name='lessons', index=INDEXES['lessons']),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_indexes, drop_search_indexes),
+            ],
+        ),
+    ]
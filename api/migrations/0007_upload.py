@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:05
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_modelversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Upload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Fayl nomi')),
+                ('length', models.PositiveBigIntegerField(verbose_name='Hajmi')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Yuklangan qismi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name="Qo'shilgan vaqti")),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, verbose_name="O'zgartirilgan vaqti")),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='api.lessons', verbose_name='Darsi')),
+                ('lesson_file', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='api.lessonfile', verbose_name='Fayli')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Yuklovchi')),
+            ],
+            options={
+                'verbose_name': 'Yuklash ',
+                'verbose_name_plural': 'Yuklashlar',
+            },
+        ),
+    ]
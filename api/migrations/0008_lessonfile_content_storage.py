@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:07
+
+import os
+
+import api.storage
+from django.db import migrations, models
+
+
+def fill_names(apps, schema_editor):
+    LessonFile = apps.get_model('api', 'LessonFile')
+
+    for lesson_file in LessonFile.objects.only('pk', 'file').iterator():
+        LessonFile.objects.filter(pk=lesson_file.pk).update(name=os.path.basename(lesson_file.file.name)[:255])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lessonfile',
+            name='name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Asl nomi'),
+        ),
+        migrations.RunPython(fill_names, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='lessonfile',
+            name='file',
+            field=models.FileField(db_index=True, storage=api.storage.ContentAddressedStorage(), upload_to='lessons/', verbose_name='Fayli'),
+        ),
+    ]
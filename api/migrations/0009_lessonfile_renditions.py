@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_lessonfile_content_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lessonfile',
+            name='metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name="Ma'lumotlari"),
+        ),
+        migrations.CreateModel(
+            name='LessonFileRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('image', 'Rasm'), ('video', 'Video')], max_length=10, verbose_name='Turi')),
+                ('file', models.FileField(upload_to='renditions/', verbose_name='Fayli')),
+                ('mime_type', models.CharField(max_length=100, verbose_name='MIME turi')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Hajmi')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Kengligi')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Balandligi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name="Qo'shilgan vaqti")),
+                ('lesson_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='api.lessonfile', verbose_name='Fayli')),
+            ],
+            options={
+                'verbose_name': 'Nusxa ',
+                'verbose_name_plural': 'Nusxalar',
+                'ordering': ['kind', 'width'],
+            },
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# path ustuni (7 + 1) * MAX_DEPTH belgiga sig'adi
+MAX_DEPTH = 100
+
+
+def segment(pk):
+    digits = ''
+
+    while pk:
+        pk, remainder = divmod(pk, 36)
+        digits = DIGITS[remainder] + digits
+
+    return f"{digits.rjust(7, '0')}/"
+
+
+def fill_paths(apps, schema_editor):
+    Comments = apps.get_model('api', 'Comments')
+    parents = dict(Comments.objects.values_list('pk', 'reply_id').iterator())
+    paths = {}
+
+    def resolve(pk):
+        # Ota izohlar zanjiri bo'ylab yuqoriga chiqiladi (rekursiyasiz), so'ng pastga qarab yo'llar yig'iladi
+        chain = []
+        visited = set()
+
+        while pk is not None and pk not in paths:
+            if pk in visited:
+                # reply zanjiri siklga aylangan (izoh o'ziga yoki o'z javobiga javob): sikl shu izohda uziladi, u ildiz bo'ladi
+                parents[pk] = None
+                paths[pk] = ('', 0)
+                roots.add(pk)
+                break
+
+            visited.add(pk)
+            chain.append(pk)
+            pk = parents[pk]
+
+        for pk in reversed(chain):
+            if pk in paths:
+                continue
+
+            parent = parents[pk]
+            paths[pk] = ('', 0) if parent is None else (paths[parent][0] + segment(parent), paths[parent][1] + 1)
+
+            if paths[pk][1] > MAX_DEPTH:
+                # Zanjir path ustuniga sig'maydi: izoh ildizga aylanadi, uning avlodlari undan davom etadi
+                parents[pk] = None
+                paths[pk] = ('', 0)
+                roots.add(pk)
+
+    rows = []
+    roots = set()
+
+    for pk in parents:
+        resolve(pk)
+        rows.append(Comments(pk=pk, path=paths[pk][0], depth=paths[pk][1]))
+
+    Comments.objects.bulk_update(rows, ['path', 'depth'], batch_size=1000)
+    Comments.objects.filter(pk__in=roots).update(reply=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_lessonfile_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comments',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Darajasi'),
+        ),
+        migrations.AddField(
+            model_name='comments',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=800),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Courses = apps.get_model('api', 'Courses')
+    Lessons = apps.get_model('api', 'Lessons')
+    Comments = apps.get_model('api', 'Comments')
+    LessonFile = apps.get_model('api', 'LessonFile')
+
+    def total(model, field_name):
+        return Coalesce(Subquery(
+            model.objects.filter(**{field_name: OuterRef('pk')}).order_by().values(field_name).annotate(
+                total=Count('pk')
+            ).values('total')
+        ), 0)
+
+    Courses.objects.update(lesson_count=total(Lessons, 'course'))
+    Lessons.objects.update(comment_count=total(Comments, 'lesson'), file_count=total(LessonFile, 'lesson'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_comments_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courses',
+            name='lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Darslar soni'),
+        ),
+        migrations.AddField(
+            model_name='lessons',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Izohlar soni'),
+        ),
+        migrations.AddField(
+            model_name='lessons',
+            name='file_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Fayllar soni'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lessonnotification',
+            name='lessons',
+            field=models.ManyToManyField(blank=True, related_name='batch_notifications', to='api.lessons', verbose_name='Darslari'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_lessonnotification_lessons'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lessonnotification',
+            name='lesson',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='api.lessons', verbose_name='Darsi'),
+        ),
+    ]
@@ -0,0 +1,182 @@
+from django.db import transaction
+from rest_framework import exceptions, status
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .bulk import get_options as get_bulk_options, to_pk
+from .counters import deferred_counters
+from .fieldsets import DEFAULT_SHAPE, shape_from_request
+from .renderers import EnvelopeResponse
+from .serializers import NestedSerializerMixin
+
+
+class QueryPlanMixin:
+    '''
+    QueryPlanMixin - viewset querysetini serializer_class da e'lon qilingan nested maydonlar asosida quradi.
+
+    Serializerdagi Meta.nested bo'yicha select_related, Meta.prefetch_related bo'yicha esa prefetch_related qo'shiladi,
+    natijada list va retrieve sahifa hajmidan qat'i nazar bir xil (kichik) sondagi so'rovlar bilan ishlaydi.
+
+    ?fields= va ?expand= berilsa (api.fieldsets) faqat ochilgan nested maydonlar JOIN qilinadi, o'qish so'rovlarida
+    esa only() bilan faqat javobga kiradigan ustunlar (va tartiblash ustunlari) o'qiladi.
+
+    Namuna:
+        http://localhost:8000/comments/?fields=id,text,lesson.title
+        http://localhost:8000/lesson-files/?expand=lesson&fields=id,file,lesson.title,lesson.course
+    '''
+
+    def get_shape(self):
+        serializer_class = self.get_serializer_class()
+
+        if not issubclass(serializer_class, NestedSerializerMixin) or getattr(self, 'request', None) is None:
+            return DEFAULT_SHAPE
+
+        if getattr(self, '_shape', None) is None:
+            self._shape = shape_from_request(self.request, serializer_class)
+
+        return self._shape
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'shape': self.get_shape()}
+
+    def get_ordering_columns(self):
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        return [field.lstrip('-') for field in [*(getattr(self, 'ordering_fields', None) or ()), *ordering]]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        shape = self.get_shape()
+
+        if issubclass(serializer_class, NestedSerializerMixin):
+            related = serializer_class.get_select_related(shape=shape)
+
+            # select_related() argumentsiz barcha ForeignKey larni JOIN qiladi
+            if related:
+                queryset = queryset.select_related(*related)
+
+            if not shape.is_default and self.request.method in SAFE_METHODS:
+                columns = {field.name for field in queryset.model._meta.concrete_fields}
+                ordering = [field for field in self.get_ordering_columns() if field in columns]
+                queryset = queryset.only(*serializer_class.get_only(shape=shape), *ordering)
+
+        if hasattr(serializer_class, 'Meta'):
+            queryset = queryset.prefetch_related(*[
+                lookup for lookup in getattr(serializer_class.Meta, 'prefetch_related', [])
+                if shape.includes(lookup.split('__')[0])
+            ])
+
+        return queryset
+
+
+class RetrieveEnvelopeMixin:
+    '''
+    RetrieveEnvelopeMixin - retrieve javobini {data, error, success} ko'rinishiga o'raydi (EnvelopeResponse).
+    '''
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.envelope(super().retrieve(request, *args, **kwargs))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return self.envelope(await super().aretrieve(request, *args, **kwargs))
+
+    def envelope(self, response):
+        return EnvelopeResponse(response.data, status=response.status_code)
+
+
+class BulkMixin:
+    '''
+    BulkMixin - viewsetga bitta so'rovda ko'plab yozuvlarni yaratish, yangilash va o'chirish uchun /bulk/ endpointini qo'shadi.
+
+    Autentifikatsiya, ruxsatlar va throttle butun ro'yxat uchun bir marta tekshiriladi, elementlar birga validatsiya
+    qilinadi (api.serializers.BulkListSerializer) va bitta tranzaksiyada bulk_create/bulk_update bilan yoziladi.
+    Birorta element xato bo'lsa hech narsa yozilmaydi, 400 javobda esa har bir element uchun xatoliklar ro'yxat
+    tartibida qaytadi. Elementlar soni BULK_WRITE['MAX_ITEMS'] bilan cheklangan. perform_create va perform_update
+    bitta elementli endpointlardagi kabi ishlatiladi (masalan teacher, author shu yerda qo'yiladi).
+
+    Namuna:
+        Yaratish: POST http://localhost:8000/lessons/bulk/ [{"title": "Intro", "course": 1}, ...]
+        Yangilash: PATCH http://localhost:8000/lessons/bulk/ [{"id": 1, "title": "Basics"}, ...]
+        O'chirish: DELETE http://localhost:8000/lessons/bulk/ [1, 2, 3]
+    '''
+
+    bulk_methods = ['post', 'patch', 'delete']
+
+    @action(detail=False, methods=['POST', 'PATCH', 'DELETE'])
+    def bulk(self, request, *args, **kwargs):
+        method = request.method.lower()
+
+        if method not in self.bulk_methods:
+            raise exceptions.MethodNotAllowed(request.method)
+
+        handler = {'post': self.bulk_create, 'patch': self.bulk_update, 'delete': self.bulk_destroy}[method]
+        return handler(request, *args, **kwargs)
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        return self.get_serializer(*args, many=True, allow_empty=False, max_length=get_bulk_options()['MAX_ITEMS'], **kwargs)
+
+    def get_bulk_instances(self, ids):
+        queryset = self.filter_queryset(self.get_queryset())
+        instances = queryset.in_bulk({to_pk(queryset.model, pk) for pk in ids} - {None})
+
+        for instance in instances.values():
+            self.check_object_permissions(self.request, instance)
+
+        return instances
+
+    def get_bulk_data(self, instances):
+        # Javob uchun yozilgan qatorlar nested maydonlari bilan birga bitta so'rovda qayta o'qiladi
+        fetched = self.get_queryset().in_bulk([instance.pk for instance in instances])
+        return self.get_serializer([fetched[instance.pk] for instance in instances], many=True).data
+
+    def bulk_create(self, request, *args, **kwargs):
+        serializer = self.get_bulk_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+
+        return Response(self.get_bulk_data(serializer.instance), status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, *args, **kwargs):
+        items = request.data if isinstance(request.data, list) else []
+        instances = self.get_bulk_instances([item.get('id') for item in items if isinstance(item, dict)])
+
+        serializer = self.get_bulk_serializer(instances, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+
+        return Response(self.get_bulk_data(serializer.instance), status=status.HTTP_200_OK)
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        ids = request.data
+        max_items = get_bulk_options()['MAX_ITEMS']
+
+        if not isinstance(ids, list) or not ids:
+            raise exceptions.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ["Expected a non-empty list of ids."]})
+
+        if len(ids) > max_items:
+            raise exceptions.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [f"Ensure this field has no more than {max_items} elements."]
+            })
+
+        instances = self.get_bulk_instances(ids)
+        model = self.get_queryset().model
+        errors = [{} if to_pk(model, pk) in instances else {'id': ["Object with this id does not exist."]} for pk in ids]
+
+        if any(errors):
+            raise exceptions.ValidationError(errors)
+
+        self.perform_bulk_destroy(model, list(instances.values()))
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_bulk_destroy(self, model, instances):
+        # post_delete signallari (fayllar, qidiruv indeksi) har bir qator uchun ishlaydi, hisoblagichlar esa ota qatorlar
+        # bo'yicha yig'ilib (deferred_counters) va kesh versiyalari tranzaksiyada bir marta (bump_version) yoziladi
+        with transaction.atomic(), deferred_counters():
+            model.objects.filter(pk__in=[instance.pk for instance in instances]).delete()
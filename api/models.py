@@ -1,6 +1,39 @@
+import os
+import uuid
+
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F, Max, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
+
+from .storage import content_storage
+
+
+class CountedMixin:
+    '''
+    CountedMixin - ota modeldagi hisoblagichlarga (api.counters) ta'sir qiladigan modellar uchun.
+
+    save() tranzaksiya ichida bajariladi, shuning uchun post_save signalidagi hisoblagich yangilanishi qator bilan
+    birga commit yoki rollback qilinadi. Bazadan o'qilgan qiymatlar _loaded_values da saqlanadi - ForeignKey
+    o'zgarganini (masalan dars boshqa kursga ko'chirilganini) qo'shimcha so'rovsiz aniqlash uchun.
+    '''
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
 
 
 class Courses(models.Model):
@@ -11,6 +44,8 @@ class Courses(models.Model):
     name = models.CharField(max_length=150, unique=True, verbose_name='Nomi')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Qo\'shilgan vaqti')
 
+    lesson_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Darslar soni')
+
     def __str__(self):
         return self.name
 
@@ -19,9 +54,11 @@ class Courses(models.Model):
         verbose_name_plural = 'Kurslar'
 
 
-class Lessons(models.Model):
+class Lessons(CountedMixin, models.Model):
     '''
     Darsliklar, berilgan uyga vazifalarni saqlash uchun maxsus model
+
+    comment_count, file_count (va like, dislike) - hisoblagichlar, api.counters tomonidan yangilanadi.
     '''
 
     title = models.CharField(max_length=150, verbose_name='Sarlavhasi')
@@ -35,6 +72,10 @@ class Lessons(models.Model):
 
     like = models.PositiveIntegerField(default=0, validators=[MinValueValidator(0)], verbose_name='Yoqtirishlar soni')
     dislike = models.PositiveIntegerField(default=0, validators=[MinValueValidator(0)], verbose_name='Yoqtirmasliklar soni')
+    comment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Izohlar soni')
+    file_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Fayllar soni')
+
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -48,6 +89,9 @@ class Lessons(models.Model):
                 name="unique_lesson_title_per_course"
             )
         ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='lesson_search_idx'),
+        ]
 
 
 class LessonReaction(models.Model):
@@ -68,27 +112,95 @@ class LessonReaction(models.Model):
         ]
 
 
-class LessonFile(models.Model):
+class LessonFile(CountedMixin, models.Model):
     '''
     Lessons modelidagi darsliklar uchun media fayllarni qo'shish uchun maxsus model
+
+    Fayllar ContentAddressedStorage orqali saqlanadi: bir xil fayl bir necha darsga yuklansa ham diskda bitta nusxa bo'ladi.
     '''
 
     lesson = models.ForeignKey(Lessons, on_delete=models.CASCADE, related_name='lesson_files', verbose_name='Darsi')
-    file = models.FileField(upload_to='lessons/', verbose_name='Fayli')
+    file = models.FileField(upload_to='lessons/', storage=content_storage, db_index=True, verbose_name='Fayli')
+    name = models.CharField(max_length=255, blank=True, verbose_name='Asl nomi')
+    metadata = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Ma'lumotlari")
 
     def __str__(self):
-        return f"{self.lesson.title} - {self.file.name}"
+        return f"{self.lesson.title} - {self.name or self.file.name}"
+
+    def save(self, *args, **kwargs):
+        # Fayl digest nomi bilan saqlanadi, shuning uchun asl nomi alohida yoziladi
+        if self.file and not self.file._committed:
+            self.name = os.path.basename(self.file.name)[:255]
+
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'name'}
+
+        super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = 'Fayl '
         verbose_name_plural = 'Fayllar'
 
 
-class Comments(models.Model):
+class LessonFileRendition(models.Model):
+    '''
+    LessonFile uchun fon jarayonida (api.media) yaratilgan kichik nusxalar: rasm, PDF birinchi sahifasi yoki videodan
+    olingan kadrning turli kenglikdagi rasmlari va past sifatli video. Mijoz o'ziga mos eng kichik nusxani tanlaydi.
+    '''
+
+    IMAGE = 'image'
+    VIDEO = 'video'
+    KIND_CHOICES = [
+        (IMAGE, 'Rasm'),
+        (VIDEO, 'Video'),
+    ]
+
+    lesson_file = models.ForeignKey(LessonFile, on_delete=models.CASCADE, related_name='renditions', verbose_name='Fayli')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name='Turi')
+    file = models.FileField(upload_to='renditions/', verbose_name='Fayli')
+    mime_type = models.CharField(max_length=100, verbose_name='MIME turi')
+    size = models.PositiveBigIntegerField(default=0, verbose_name='Hajmi')
+    width = models.PositiveIntegerField(blank=True, null=True, verbose_name='Kengligi')
+    height = models.PositiveIntegerField(blank=True, null=True, verbose_name='Balandligi')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Qo\'shilgan vaqti')
+
+    def __str__(self):
+        return f"{self.lesson_file_id} - {self.kind} {self.width}x{self.height}"
+
+    class Meta:
+        verbose_name = 'Nusxa '
+        verbose_name_plural = 'Nusxalar'
+        ordering = ['kind', 'width']
+
+
+def path_segment(pk):
+    '''
+    path_segment - ID ni belgilangan uzunlikdagi base36 satrga aylantiradi ("000002s/"). Uzunlik bir xil bo'lgani
+    uchun satrlar tartibi ID lar tartibiga mos keladi va yo'l bo'yicha oraliq (range) so'rovlar indeksdan foydalanadi.
+    '''
+
+    digits = ''
+
+    while pk:
+        pk, remainder = divmod(pk, 36)
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'[remainder] + digits
+
+    return f"{digits.rjust(Comments.SEGMENT_WIDTH, '0')}/"
+
+
+class Comments(CountedMixin, models.Model):
     '''
     Lessons modelidagi darsliklarga izohlar qoldirish uchun maxsus model
+
+    path - barcha ota izohlar ID laridan tuzilgan yo'l (ildiz izoh uchun bo'sh), depth - ichma-ichlik darajasi.
+    Ikkalasi ham saqlashdan oldin ota izohdan hisoblanadi, shuning uchun butun ichki daraxt bitta
+    "path LIKE 'prefiks%'" so'rovi bilan olinadi. reply o'zgarsa barcha avlodlar yo'li bitta UPDATE bilan yangilanadi.
     '''
 
+    SEGMENT_WIDTH = 7
+    MAX_DEPTH = 100
+
     text = models.TextField(verbose_name='Matni')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Qo\'shilgan vaqti')
 
@@ -96,21 +208,184 @@ class Comments(models.Model):
     lesson = models.ForeignKey(Lessons, on_delete=models.CASCADE, related_name='comments', verbose_name='Darsi')
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='comments', verbose_name='Muallifi')
 
+    path = models.CharField(max_length=(SEGMENT_WIDTH + 1) * MAX_DEPTH, blank=True, default='', db_index=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Darajasi')
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
     def __str__(self):
         return self.text[:20]
 
+    @property
+    def subtree_path(self):
+        '''
+        subtree_path - ushbu izohning barcha avlodlari yo'li shu prefiks bilan boshlanadi.
+        '''
+
+        return self.path + path_segment(self.pk)
+
+    def assign_path(self):
+        '''
+        assign_path - path va depth ni ota izohdan hisoblaydi. Yo'lning oxirgi bo'lagi ota izoh ID si, u reply bilan
+        mos bo'lsa ota izoh bazadan o'qilmaydi va False qaytariladi. bulk_create/bulk_update dan oldin ham chaqiriladi.
+
+        Izoh (yoki boshqa joyga ko'chirilayotgan izohning eng chuqur avlodi) MAX_DEPTH dan chuqur bo'lsa, yo'l path
+        ustuniga sig'maydi va ValidationError ko'tariladi. Shu sababli cheklov admin, shell va bulk yozuvlarda ham ishlaydi.
+        '''
+
+        parent_id = int(self.path[-Comments.SEGMENT_WIDTH - 1:-1], 36) if self.path else None
+
+        if parent_id == self.reply_id:
+            return False
+
+        path = self.reply.subtree_path if self.reply_id else ''
+        depth = self.reply.depth + 1 if self.reply_id else 0
+        deepest = depth
+
+        if self.pk and depth > self.depth:
+            # Ko'chirilayotgan izoh avlodlari ham shuncha chuqurlashadi
+            descendants = Comments.objects.filter(path__startswith=self.subtree_path).aggregate(deepest=Max('depth'))
+            deepest = max(depth, (descendants['deepest'] or 0) + depth - self.depth)
+
+        if deepest > Comments.MAX_DEPTH:
+            raise ValidationError({'reply': "Reply nesting is too deep."})
+
+        self.path = path
+        self.depth = depth
+
+        return True
+
+    def move_descendants(self, old_subtree, old_depth):
+        '''
+        move_descendants - izoh boshqa joyga ko'chirilganda barcha avlodlari yo'lini bitta UPDATE bilan yangilaydi.
+        '''
+
+        if old_subtree != self.subtree_path:
+            Comments.objects.filter(path__startswith=old_subtree).update(
+                path=Concat(Value(self.subtree_path), Substr('path', len(old_subtree) + 1)),
+                depth=F('depth') + (self.depth - old_depth),
+            )
+
+    def save(self, *args, **kwargs):
+        old_subtree, old_depth = (self.subtree_path, self.depth) if self.pk else (None, None)
+
+        if not self.assign_path():
+            return super().save(*args, **kwargs)
+
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'path', 'depth'}
+
+        super().save(*args, **kwargs)
+
+        if old_subtree is not None:
+            self.move_descendants(old_subtree, old_depth)
+
     class Meta:
         verbose_name = 'Izoh '
         verbose_name_plural = 'Izohlar'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='comment_search_idx'),
+        ]
+
+
+class LessonNotification(models.Model):
+    '''
+    Yangi darslar haqida foydalanuvchilarga yuboriladigan email xabarnomalar navbati (outbox).
+
+    Qator dars bilan bitta tranzaksiyada yaratiladi, xabarlarni esa send_notifications workeri yuboradi.
+    lessons - bulk endpoint orqali bir martada qo'shilgan darslar (lesson - ulardan birinchisi), ular bitta xabarda yuboriladi.
+    Partiyadagi dars o'chirilsa xabarnoma o'chmaydi (lesson SET_NULL), faqat o'sha dars xatdan tushib qoladi.
+    last_user_id - oxirgi muvaffaqiyatli yuborilgan qabul qiluvchi ID si, xatolikdan keyin yuborish shu joydan davom etadi.
+    next_attempt_at - keyingi urinish vaqti (ishlov berilayotgan qator uchun esa ijara/lease tugash vaqti).
+    '''
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Kutilmoqda'),
+        (PROCESSING, 'Yuborilmoqda'),
+        (SENT, 'Yuborildi'),
+        (FAILED, 'Xatolik'),
+    ]
+
+    lesson = models.ForeignKey(
+        Lessons, on_delete=models.SET_NULL, blank=True, null=True, related_name='notifications', verbose_name='Darsi',
+    )
+    lessons = models.ManyToManyField(Lessons, blank=True, related_name='batch_notifications', verbose_name='Darslari')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name='Holati')
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Urinishlar soni')
+    error = models.TextField(blank=True, verbose_name='Xatolik')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Qo\'shilgan vaqti')
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name='Yuborilgan vaqti')
+
+    def __str__(self):
+        return f"{self.lesson_id} - {self.status}"
+
+    class Meta:
+        verbose_name = 'Xabarnoma '
+        verbose_name_plural = 'Xabarnomalar'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_queue_idx'),
+        ]
+
+
+class Upload(models.Model):
+    '''
+    Bo'laklab (tus uslubida) yuklanayotgan fayl. Bo'laklar MEDIA_ROOT/uploads/<id>.part fayliga ketma-ket yoziladi,
+    offset - shu paytgacha qabul qilingan baytlar soni. Yuklash tugaganda LessonFile yaratiladi va lesson_file ga yoziladi.
+    '''
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    lesson = models.ForeignKey(Lessons, on_delete=models.CASCADE, related_name='uploads', verbose_name='Darsi')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, verbose_name='Yuklovchi')
+    filename = models.CharField(max_length=255, verbose_name='Fayl nomi')
+    length = models.PositiveBigIntegerField(verbose_name='Hajmi')
+    offset = models.PositiveBigIntegerField(default=0, verbose_name='Yuklangan qismi')
+    lesson_file = models.OneToOneField(
+        LessonFile, on_delete=models.SET_NULL, blank=True, null=True, related_name='upload', verbose_name='Fayli'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Qo\'shilgan vaqti')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name='O\'zgartirilgan vaqti')
+
+    def __str__(self):
+        return f"{self.filename} - {self.offset}/{self.length}"
+
+    class Meta:
+        verbose_name = 'Yuklash '
+        verbose_name_plural = 'Yuklashlar'
+
+
+class ModelVersion(models.Model):
+    '''
+    API javoblari keshi uchun modellar versiyasi. Model ma'lumotlari o'zgarganda version bittaga oshiriladi,
+    updated_at esa Last-Modified sarlavhasi uchun ishlatiladi.
+    '''
+
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} - {self.version}"
 
 
 class BlacklistedToken(models.Model):
     '''
-    Logout qilgan foydalanuvchilarni access tokenlari saqlanadigan qora ro'yxat modeli
+    Logout qilgan foydalanuvchilarni access tokenlari saqlanadigan qora ro'yxat modeli.
+
+    Tokenning o'zi emas, balki uning jti qiymatidan olingan SHA-256 hash (64 belgi) indekslangan holda saqlanadi.
+    expires_at - token muddati tugaydigan vaqt, shu vaqtdan keyin qator purge_expired_tokens orqali o'chiriladi.
     '''
 
-    token = models.CharField(max_length=500)
-    blacklisted_at = models.DateTimeField(auto_now_add=True)
+    jti_hash = models.CharField(max_length=64, unique=True)
+    blacklisted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
-        return self.token
+        return self.jti_hash
@@ -0,0 +1,138 @@
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import LessonNotification
+
+logger = logging.getLogger(__name__)
+
+SUBJECT = "You have been assigned a house."
+
+
+def claim_notification(lease):
+    '''
+    claim_notification - navbatdan yuborish vaqti kelgan bitta xabarnomani oladi va uni lease soniyaga band qiladi.
+
+    Bir nechta worker bir vaqtda ishlashi mumkin: qatorlar select_for_update(skip_locked=True) bilan olinadi,
+    worker to'xtab qolsa esa lease tugagach xabarnoma boshqa worker tomonidan davom ettiriladi.
+    '''
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        notification = (
+            LessonNotification.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=[LessonNotification.PENDING, LessonNotification.PROCESSING], next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .first()
+        )
+
+        if notification is None:
+            return None
+
+        notification.status = LessonNotification.PROCESSING
+        notification.next_attempt_at = now + timedelta(seconds=lease)
+        notification.save(update_fields=['status', 'next_attempt_at'])
+
+    return notification
+
+
+def recipients(after, chunk_size):
+    '''
+    recipients - email manzili bor foydalanuvchilarni ID bo'yicha tartibda, chunk_size tadan bo'laklab qaytaradi.
+    '''
+
+    rows = (
+        User.objects.filter(pk__gt=after, email__isnull=False)
+        .exclude(email='')
+        .order_by('pk')
+        .values_list('pk', 'email')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def send_notification(notification, chunk_size=100, lease=300):
+    '''
+    send_notification - dars (yoki bir martada qo'shilgan darslar) haqidagi xabarni barcha foydalanuvchilarga yuboradi.
+
+    Shablon bir marta render qilinadi, har bir qabul qiluvchiga alohida xabar (boshqalarning manzillari ko'rinmaydi)
+    tuziladi va har bir bo'lak bitta SMTP ulanish orqali get_connection().send_messages bilan yuboriladi.
+    Har bir bo'lakdan keyin last_user_id saqlanadi va lease uzaytiriladi.
+
+    O'chirilgan darslar xatga kirmaydi. Xabarnomadagi barcha darslar o'chirilgan bo'lsa, xabarnomaning o'zi o'chiriladi.
+    '''
+
+    lessons = list(notification.lessons.all()) or ([notification.lesson] if notification.lesson_id else [])
+
+    if not lessons:
+        notification.delete()
+        return
+    html_content = render_to_string('emails/index.html', {
+        'lessons': [{
+            'title': lesson.title,
+            'description': lesson.description or "Ma'lumot qo'shilmadi.",
+            'is_active': lesson.is_active,
+        } for lesson in lessons],
+    })
+
+    for chunk in recipients(notification.last_user_id, chunk_size):
+        messages = []
+
+        for _, address in chunk:
+            email = EmailMultiAlternatives(subject=SUBJECT, from_email=settings.DEFAULT_FROM_EMAIL, to=[address])
+            email.attach_alternative(html_content, 'text/html')
+            messages.append(email)
+
+        with get_connection() as connection:
+            connection.send_messages(messages)
+
+        notification.last_user_id = chunk[-1][0]
+        notification.next_attempt_at = timezone.now() + timedelta(seconds=lease)
+        notification.save(update_fields=['last_user_id', 'next_attempt_at'])
+
+    notification.status = LessonNotification.SENT
+    notification.sent_at = timezone.now()
+    notification.error = ''
+    notification.save(update_fields=['status', 'sent_at', 'error'])
+
+
+def process_next(chunk_size=100, lease=300, max_attempts=5, retry_delay=60):
+    '''
+    process_next - navbatdagi bitta xabarnomani yuboradi. Xatolik bo'lsa urinishlar soni oshiriladi va
+    retry_delay * 2^(urinish - 1) soniyadan keyin qayta uriniladi, max_attempts dan keyin esa FAILED holatiga o'tadi.
+    Navbat bo'sh bo'lsa False qaytaradi.
+    '''
+
+    notification = claim_notification(lease)
+
+    if notification is None:
+        return False
+
+    try:
+        send_notification(notification, chunk_size, lease)
+    except Exception as exc:
+        logger.exception("Lesson notification %s failed.", notification.pk)
+
+        notification.attempts += 1
+        notification.error = str(exc)
+
+        if notification.attempts >= max_attempts:
+            notification.status = LessonNotification.FAILED
+        else:
+            notification.status = LessonNotification.PENDING
+            notification.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay * 2 ** (notification.attempts - 1))
+
+        notification.save(update_fields=['attempts', 'error', 'status', 'next_attempt_at'])
+
+    return True
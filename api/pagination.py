@@ -1,6 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.response import Response
-from rest_framework import status
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.db import connections
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .renderers import EnvelopeResponse
 
 
 class CustomPagination(PageNumberPagination):
@@ -8,12 +14,139 @@ class CustomPagination(PageNumberPagination):
     Paginatsiya JSON ma'lumotlarini qayta ishlash uchun.
     '''
 
+    async def apaginate_queryset(self, queryset, request, view=None):
+        '''
+        apaginate_queryset - paginate_queryset ning async varianti: COUNT acount() bilan, sahifa esa async iteratsiya bilan o'qiladi.
+        '''
+
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        return list(self.page)
+
     def get_paginated_response(self, data):
-        return Response({
-            'data': data,
+        return EnvelopeResponse(data, meta={
             'count': self.page.paginator.count,
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
-            'error': None,
-            'success': True
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        })
+
+
+def estimate_count(queryset):
+    '''
+    estimate_count - PostgreSQL da qatorlar sonini COUNT(*) o'rniga rejalashtiruvchi (planner) statistikasidan oladi.
+    Boshqa bazalarda aniq COUNT(*) qaytariladi.
+    '''
+
+    connection = connections[queryset.db]
+
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return plan[0]['Plan']['Plan Rows']
+
+
+class CustomCursorPagination(CursorPagination):
+    '''
+    CustomCursorPagination - OFFSET va COUNT(*) siz ishlaydigan keyset (cursor) paginatsiya.
+    Javob CustomPagination bilan bir xil {data, count, next, previous, error, success} ko'rinishida qaytadi.
+
+    Tartib ordering query parametri (view dagi OrderingFilter) orqali tanlanadi, bir xil qiymatlar
+    aralashib ketmasligi uchun oxiriga id qo'shiladi. count qiymati count_mode ga bog'liq:
+        estimate - PostgreSQL planner statistikasidan taxminiy son (standart)
+        exact - aniq COUNT(*)
+        none - hisoblanmaydi (count: null)
+
+    Namuna:
+        http://localhost:8000/comments/?lesson=1&ordering=-created_at
+        http://localhost:8000/comments/?cursor=cD0yMDI1...&count=exact
+    '''
+
+    ordering = '-created_at'
+    count_mode = 'estimate'
+    count_query_param = 'count'
+    count_modes = ('estimate', 'exact', 'none')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+
+        return ordering
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, self.count_mode)
+        return mode if mode in self.count_modes else self.count_mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = self.get_count_mode(request)
+
+        if mode == 'exact':
+            self.count = queryset.count()
+        elif mode == 'estimate':
+            self.count = estimate_count(queryset)
+        else:
+            self.count = None
+
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Cursor hisoblash mantiqi sinxron, shuning uchun u alohida oqimda bajariladi
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return EnvelopeResponse(data, meta={
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        })
+
+
+class ThreadPagination(CustomCursorPagination):
+    '''
+    ThreadPagination - izohlar daraxtining yuqori darajasini (dars izohlari yoki bitta izohning javoblari) sahifalaydi.
+    Har bir izoh bilan birga uning depth darajagacha bo'lgan javoblari ham chiqadi, chuqurroq javoblar alohida so'raladi.
+
+    Namuna:
+        http://localhost:8000/lessons/1/thread/?depth=5
+        http://localhost:8000/comments/10/thread/?cursor=cD0yMDI1...
+    '''
+
+    depth_query_param = 'depth'
+    default_depth = 3
+    max_depth = 10
+
+    def get_depth(self, request):
+        try:
+            depth = int(request.query_params[self.depth_query_param])
+        except (KeyError, ValueError):
+            return self.default_depth
+
+        return min(max(depth, 1), self.max_depth)
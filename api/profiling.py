@@ -0,0 +1,275 @@
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Joriy so'rovning profili, so'rov profillanmayotgan bo'lsa None
+current_profile = ContextVar('current_profile', default=None)
+
+NOT_PROFILED = nullcontext()
+
+
+def get_options():
+    return {
+        'ENABLED': False,
+        'SAMPLE_RATE': 0.01,
+        'SERVER_TIMING': True,
+        'SLOW_REQUEST_MS': 500,
+        'SLOW_QUERY_COUNT': 50,
+        'DUPLICATE_QUERIES': 5,
+        'MAX_LOGGED_QUERIES': 20,
+        **getattr(settings, 'PROFILING', {}),
+    }
+
+
+class Phase:
+    '''
+    Phase - bosqich vaqtini o'lchaydi. Bir xil nomli ichma-ich bosqichlar (nested serializerlar) faqat eng tashqisi
+    bo'yicha hisoblanadi, ketma-ket bosqichlar (ro'yxatdagi har bir element) esa qo'shib boriladi.
+    '''
+
+    __slots__ = ('profile', 'name', 'started')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        if not self.profile.depth[self.name]:
+            self.started = time.perf_counter()
+
+        self.profile.depth[self.name] += 1
+
+    def __exit__(self, *exc_info):
+        self.profile.depth[self.name] -= 1
+
+        if not self.profile.depth[self.name]:
+            self.profile.phases[self.name] += time.perf_counter() - self.started
+
+
+class Profile:
+    '''
+    Profile - bitta so'rovning umumiy vaqti, bosqichlari (auth, throttle, serialize, render, ...) va SQL so'rovlari.
+    Obyektning o'zi connection.execute_wrapper sifatida ulanadi va har bir so'rovni vaqti bilan yozib boradi.
+    sampled=False bo'lsa faqat umumiy vaqt o'lchanadi, bosqichlar va SQL yozilmaydi.
+    '''
+
+    def __init__(self, sampled=True):
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.finished = None
+        self.phases = defaultdict(float)
+        self.depth = defaultdict(int)
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, time.perf_counter() - started))
+
+    def phase(self, name):
+        return Phase(self, name)
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def sql_time(self):
+        return sum(duration for _, _, duration in self.queries)
+
+    def repeated_queries(self):
+        '''
+        repeated_queries - bir necha marta bajarilgan SQL lar (N+1 belgisi), ko'p bajarilgani birinchi.
+        duplicates - shundan parametrlari ham bir xil bo'lgan (keraksiz takrorlangan) so'rovlar soni.
+        '''
+
+        groups = defaultdict(lambda: {'count': 0, 'params': set(), 'seconds': 0.0})
+
+        for sql, params, duration in self.queries:
+            group = groups[sql]
+            group['count'] += 1
+            group['params'].add(repr(params))
+            group['seconds'] += duration
+
+        return sorted((
+            {
+                'sql': sql,
+                'count': group['count'],
+                'duplicates': group['count'] - len(group['params']),
+                'ms': round(group['seconds'] * 1000, 3),
+            }
+            for sql, group in groups.items() if group['count'] > 1
+        ), key=lambda group: -group['count'])
+
+    def server_timing(self):
+        '''
+        server_timing - Server-Timing sarlavhasi qiymati. Bosqichlar bir-birining ichida bo'lishi mumkin
+        (masalan auth ichidagi SQL db ga ham kiradi), shuning uchun ularning yig'indisi total ga teng bo'lmaydi.
+        '''
+
+        duplicates = sum(group['duplicates'] for group in self.repeated_queries())
+        metrics = [
+            f'total;dur={self.duration * 1000:.2f}',
+            f'db;dur={self.sql_time * 1000:.2f};desc="{len(self.queries)} queries, {duplicates} duplicates"',
+        ]
+        metrics += [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.phases.items()]
+
+        return ', '.join(metrics)
+
+    def record(self, request, response, max_queries):
+        record = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(self.duration * 1000, 3),
+            'sampled': self.sampled,
+        }
+
+        if not self.sampled:
+            return record
+
+        slowest = sorted(self.queries, key=lambda query: -query[2])[:max_queries]
+
+        return {
+            **record,
+            'phases': {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            'queries': len(self.queries),
+            'sql_ms': round(self.sql_time * 1000, 3),
+            'repeated': self.repeated_queries()[:max_queries],
+            'slowest': [{'sql': sql, 'params': repr(params), 'ms': round(duration * 1000, 3)} for sql, params, duration in slowest],
+        }
+
+
+def timing(name):
+    '''
+    timing - joriy so'rov profillanayotgan bo'lsa name bosqichi vaqtini o'lchaydigan context manager, aks holda
+    hech narsa qilmaydigan umumiy nullcontext (profillanmagan so'rovlarda qo'shimcha xarajat deyarli yo'q).
+
+    Namuna:
+        with timing('render'):
+            ...
+    '''
+
+    profile = current_profile.get()
+    return NOT_PROFILED if profile is None else profile.phase(name)
+
+
+class ProfilingMiddleware:
+    '''
+    ProfilingMiddleware - PROFILING['ENABLED'] bo'lsa har bir so'rovning umumiy vaqtini o'lchaydi. PROFILING['SAMPLE_RATE']
+    ulushidagi so'rovlar esa to'liq profillanadi: SQL so'rovlar soni va vaqti (takrorlangan so'rovlar bilan), hamda timing()
+    bilan belgilangan bosqichlar (blacklist, auth, throttle, serialize, render, notify). Ularning natijasi Server-Timing
+    sarlavhasida qaytadi (brauzer DevTools Timing bo'limida ko'rinadi).
+
+    SLOW_REQUEST_MS dan uzoq davom etgan har qanday so'rov api.profiling loggeriga JSON bilan yoziladi. Tanlangan so'rov
+    SLOW_QUERY_COUNT dan ko'p SQL bajarsa yoki bitta SQL DUPLICATE_QUERIES martadan ko'p takrorlansa ham yoziladi, unga eng
+    sekin va takrorlangan SQL lar qo'shiladi. current_profile so'rov tugagach reset() bilan oldingi qiymatiga qaytariladi.
+    MIDDLEWARE ro'yxatida birinchi turishi kerak.
+    '''
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        profile = self.start()
+
+        if profile is None:
+            return self.get_response(request)
+
+        if not profile.sampled:
+            return self.finish(request, self.get_response(request), profile)
+
+        token = current_profile.set(profile)
+        self.attach(profile)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            self.detach(profile)
+            current_profile.reset(token)
+
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile = self.start()
+
+        if profile is None:
+            return await self.get_response(request)
+
+        if not profile.sampled:
+            return self.finish(request, await self.get_response(request), profile)
+
+        # Baza ulanishlari sinxron oqimda ishlatiladi, execute_wrappers ham o'sha oqimda ulanadi
+        token = current_profile.set(profile)
+        await sync_to_async(self.attach, thread_sensitive=True)(profile)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self.detach, thread_sensitive=True)(profile)
+            current_profile.reset(token)
+
+        return self.finish(request, response, profile)
+
+    def start(self):
+        options = get_options()
+
+        if not options['ENABLED']:
+            return None
+
+        # Tanlanmagan so'rovlarda faqat vaqt o'lchanadi va bitta tasodifiy son olinadi
+        return Profile(sampled=random.random() < options['SAMPLE_RATE'])
+
+    def attach(self, profile):
+        for connection in connections.all():
+            connection.execute_wrappers.append(profile)
+
+    def detach(self, profile):
+        for connection in connections.all():
+            if profile in connection.execute_wrappers:
+                connection.execute_wrappers.remove(profile)
+
+    def finish(self, request, response, profile):
+        profile.finished = time.perf_counter()
+        options = get_options()
+
+        if profile.sampled and options['SERVER_TIMING']:
+            response['Server-Timing'] = profile.server_timing()
+
+        repeated = profile.repeated_queries()
+        reasons = [
+            reason for reason, exceeded in (
+                ('duration', profile.duration * 1000 > options['SLOW_REQUEST_MS']),
+                ('queries', len(profile.queries) > options['SLOW_QUERY_COUNT']),
+                ('repeated', bool(repeated) and repeated[0]['count'] > options['DUPLICATE_QUERIES']),
+            ) if exceeded
+        ]
+
+        if reasons:
+            record = {'reasons': reasons, **profile.record(request, response, options['MAX_LOGGED_QUERIES'])}
+            logger.warning("Slow request: %s", json.dumps(record, default=str), extra={'profile': record})
+
+        return response
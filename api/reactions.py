@@ -0,0 +1,249 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+
+from .cache import bump_version
+from .models import Lessons, LessonReaction
+
+logger = logging.getLogger(__name__)
+
+REACTIONS = ('like', 'dislike')
+
+
+def toggle_reaction(lesson_id, user, reaction):
+    '''
+    toggle_reaction - foydalanuvchining darsga bosgan like/dislike ini bitta tranzaksiya ichida almashtiradi.
+
+    Dars qatori boshida qulflanadi (select_for_update), so'ng LessonReaction ustida shartli
+    DELETE/UPDATE/INSERT bajariladi va hisoblagichlar bazaning o'zida F() orqali o'zgartiriladi.
+    Faqat like, dislike ustunlari yoziladi. Natijada (like, dislike) qaytariladi.
+    '''
+
+    if reaction not in REACTIONS:
+        raise ValueError(f"Unknown reaction: {reaction}")
+
+    other = 'dislike' if reaction == 'like' else 'like'
+    delta = {'like': 0, 'dislike': 0}
+
+    with transaction.atomic():
+        counters = dict(zip(REACTIONS, Lessons.objects.select_for_update().values_list(*REACTIONS).get(pk=lesson_id)))
+        reactions = LessonReaction.objects.filter(lesson_id=lesson_id, user=user)
+
+        if reactions.filter(reaction=reaction).delete()[0]:
+            delta[reaction] -= 1
+        elif reactions.filter(reaction=other).update(reaction=reaction):
+            delta[other] -= 1
+            delta[reaction] += 1
+        else:
+            LessonReaction.objects.create(lesson_id=lesson_id, user=user, reaction=reaction)
+            delta[reaction] += 1
+
+        Lessons.objects.filter(pk=lesson_id).update(**{
+            field: Greatest(F(field) + value, Value(0)) for field, value in delta.items() if value
+        })
+        bump_version(Lessons)
+
+    return tuple(max(counters[field] + delta[field], 0) for field in REACTIONS)
+
+
+class _Batch:
+    def __init__(self):
+        self.states = {}
+        self.deltas = defaultdict(lambda: dict.fromkeys(REACTIONS, 0))
+
+
+class ReactionBuffer:
+    '''
+    ReactionBuffer - like/dislike larni jarayon (process) xotirasida yig'ib, vaqti-vaqti bilan bazaga yozadi (write-behind).
+
+    Har bir (dars, foydalanuvchi) juftligi uchun bazadagi boshlang'ich va hozirgi holat saqlanadi, darslar uchun esa
+    sof o'zgarishlar (delta) yig'iladi. Fon oqimi (thread) har FLUSH_INTERVAL soniyada ularni bulk_create (upsert)
+    va bulk_update orqali bitta tranzaksiyada yozadi. Yozish muvaffaqiyatsiz bo'lsa, partiya keyingi safar qayta yoziladi.
+
+    Jarayon tugaganda (atexit) stop() fon oqimini to'xtatib, qolgan reaksiyalarni yozadi.
+
+    Eslatma: bufer har bir worker uchun alohida. Bitta foydalanuvchi bir vaqtda turli workerlarga so'rov yuborsa,
+    hisoblagichlar biroz farq qilishi mumkin, ular reconcile_reactions buyrug'i bilan tuzatiladi.
+    Jarayon to'satdan to'xtasa, oxirgi yozilmagan reaksiyalar yo'qoladi.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.batch = _Batch()
+        self.flushing = None
+        self.thread = None
+        self.stopped = threading.Event()
+        self.exit_hook = False
+
+    @property
+    def flush_interval(self):
+        return settings.REACTION_BUFFER.get('FLUSH_INTERVAL', 2)
+
+    def toggle(self, lesson, user, reaction):
+        key = (lesson.pk, user.pk)
+
+        with self.lock:
+            known = self._current(key)
+
+        if known is None:
+            original = LessonReaction.objects.filter(lesson_id=lesson.pk, user=user).values_list('reaction', flat=True).first()
+        else:
+            original = known[0]
+
+        with self.lock:
+            current = self._current(key)
+            current = original if current is None else current[0]
+
+            state = self.batch.states.setdefault(key, [current, current])
+            new = None if state[1] == reaction else reaction
+            delta = self.batch.deltas[lesson.pk]
+
+            if state[1]:
+                delta[state[1]] -= 1
+            if new:
+                delta[new] += 1
+
+            state[1] = new
+
+            # Bazadagi qiymat buferdagi delta bilan bitta qulf ostida o'qiladi: flush tranzaksiyasi shu qulfni olib
+            # commit qiladi, shuning uchun har bir delta yoki bazada, yoki buferda aynan bir marta hisoblanadi
+            counters = self._pending(lesson.pk)
+            base = Lessons.objects.filter(pk=lesson.pk).values_list(*REACTIONS).first() or (0, 0)
+
+        self.start()
+
+        return tuple(max(value + counters[field], 0) for field, value in zip(REACTIONS, base))
+
+    def _current(self, key):
+        for batch in (self.batch, self.flushing):
+            if batch is not None and key in batch.states:
+                return (batch.states[key][1],)
+        return None
+
+    def _pending(self, lesson_id):
+        counters = dict.fromkeys(REACTIONS, 0)
+
+        for batch in (self.batch, self.flushing):
+            if batch is not None and lesson_id in batch.deltas:
+                for field in REACTIONS:
+                    counters[field] += batch.deltas[lesson_id][field]
+
+        return counters
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                if self.thread is None or not self.thread.is_alive():
+                    self.stopped.clear()
+                    self.thread = threading.Thread(target=self._run, name='reaction-buffer', daemon=True)
+                    self.thread.start()
+
+                    # Oqim qayta ishga tushganda ham hook bir marta ro'yxatdan o'tadi
+                    if not self.exit_hook:
+                        atexit.register(self.stop)
+                        self.exit_hook = True
+
+    def stop(self):
+        '''
+        stop - fon oqimini to'xtatadi va buferda qolgan reaksiyalarni yozadi.
+        '''
+
+        self.stopped.set()
+
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+        return self.flush()
+
+    def _run(self):
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Reaction buffer flush failed, it will be retried.")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                if self.flushing is None:
+                    if not self.batch.states:
+                        return 0
+                    self.flushing, self.batch = self.batch, _Batch()
+                batch = self.flushing
+
+            acquired = False
+
+            try:
+                with transaction.atomic():
+                    self._apply(batch)
+
+                    # Commit va flushing ni tozalash bitta qulf ostida: o'quvchilar bitta deltani ham bazadagi
+                    # qiymatda, ham buferda (ikki marta) ko'rmaydi
+                    self.lock.acquire()
+                    acquired = True
+
+                self.flushing = None
+            finally:
+                if acquired:
+                    self.lock.release()
+
+        return len(batch.states)
+
+    def _apply(self, batch):
+        # flush ochgan tranzaksiya ichida chaqiriladi
+        lesson_ids = set(Lessons.objects.filter(pk__in={lesson_id for lesson_id, _ in batch.states}).values_list('pk', flat=True))
+        user_ids = set(User.objects.filter(pk__in={user_id for _, user_id in batch.states}).values_list('pk', flat=True))
+
+        deletes = defaultdict(list)
+        upserts = []
+
+        for (lesson_id, user_id), (original, current) in batch.states.items():
+            if lesson_id not in lesson_ids or user_id not in user_ids or original == current:
+                continue
+
+            if current is None:
+                deletes[lesson_id].append(user_id)
+            else:
+                upserts.append(LessonReaction(lesson_id=lesson_id, user_id=user_id, reaction=current))
+
+        lessons = [
+            Lessons(pk=lesson_id, **{field: Greatest(F(field) + delta[field], Value(0)) for field in REACTIONS})
+            for lesson_id, delta in batch.deltas.items() if lesson_id in lesson_ids and any(delta.values())
+        ]
+
+        if deletes:
+            LessonReaction.objects.filter(
+                reduce(or_, (Q(lesson_id=lesson_id, user_id__in=users) for lesson_id, users in deletes.items()))
+            ).delete()
+
+        LessonReaction.objects.bulk_create(
+            upserts, update_conflicts=True, unique_fields=['lesson', 'user'], update_fields=['reaction']
+        )
+        Lessons.objects.bulk_update(lessons, REACTIONS, batch_size=500)
+        bump_version(Lessons)
+
+
+reaction_buffer = ReactionBuffer()
+
+
+def react(lesson, user, reaction):
+    '''
+    react - settings.REACTION_BUFFER['ENABLED'] bo'yicha reaksiyani bufer orqali yoki to'g'ridan-to'g'ri bazaga yozadi.
+    '''
+
+    if settings.REACTION_BUFFER.get('ENABLED'):
+        return reaction_buffer.toggle(lesson, user, reaction)
+
+    return toggle_reaction(lesson.pk, user, reaction)
@@ -0,0 +1,89 @@
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+from .profiling import timing
+
+EMPTY_STATUSES = (status.HTTP_204_NO_CONTENT, status.HTTP_304_NOT_MODIFIED)
+
+
+def envelope(data, status_code=status.HTTP_200_OK, meta=None):
+    '''
+    envelope - javob ma'lumotini {data, ..., error, success} konvertiga o'raydi. 4xx/5xx javoblarda data xatolik sifatida
+    error ga yoziladi. meta dagi maydonlar (paginatsiyadagi count, next, previous) data dan keyin qo'shiladi.
+    '''
+
+    if status_code >= status.HTTP_400_BAD_REQUEST:
+        return {'data': None, 'error': data, 'success': False}
+
+    return {'data': data, **(meta or {}), 'error': None, 'success': True}
+
+
+def orjson():
+    '''
+    orjson - orjson o'rnatilgan bo'lsa modulni, aks holda None qaytaradi.
+    '''
+
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    return orjson
+
+
+class EnvelopeResponse(Response):
+    '''
+    EnvelopeResponse - {data, error, success} konvertiga o'raladigan Response (list, retrieve, like/dislike, register).
+    meta - konvertning yuqori darajasiga data dan tashqari qo'shiladigan maydonlar (paginatsiyadagi count, next, previous).
+    '''
+
+    def __init__(self, data=None, meta=None, **kwargs):
+        super().__init__(data, **kwargs)
+        self.meta = meta or {}
+
+
+class EnvelopeJSONRenderer(JSONRenderer):
+    '''
+    EnvelopeJSONRenderer - EnvelopeResponse javoblarini va barcha xatoliklarni (4xx/5xx) render paytida bir marta
+    konvertga o'raydi, shuning uchun viewlar, paginatsiya va exception handler faqat ma'lumotning o'zini qaytaradi.
+    Qolgan javoblar (create/update, bulk, JWT token endpointlari) o'zgarishsiz chiqadi. 204 va 304 javoblar bo'sh qoladi.
+    '''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        status_code = getattr(response, 'status_code', status.HTTP_200_OK)
+
+        if status_code in EMPTY_STATUSES:
+            return b''
+
+        if isinstance(response, EnvelopeResponse) or status_code >= status.HTTP_400_BAD_REQUEST:
+            data = envelope(data, status_code, getattr(response, 'meta', None))
+
+        with timing('render'):
+            return self.encode(data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class ORJSONRenderer(EnvelopeJSONRenderer):
+    '''
+    ORJSONRenderer - konvertni orjson bilan kodlaydi: datetime, UUID, dict/list/str vorislari (ReturnDict, ErrorDetail)
+    to'g'ridan-to'g'ri C kodida, qolgan turlar (Decimal, lazy matnlar, QuerySet) DRF ning JSONEncoder.default i bilan.
+
+    orjson o'rnatilmagan bo'lsa yoki chiroyli chiqarish (Accept: application/json; indent=4) so'ralsa
+    standart json moduliga qaytadi. Natija JSONRenderer natijasi bilan bir xil (U+2028/U+2029 ham escape qilinadi).
+    '''
+
+    default = encoders.JSONEncoder().default
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        module = orjson()
+
+        if module is None or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().encode(data, accepted_media_type, renderer_context)
+
+        content = module.dumps(data, default=self.default, option=module.OPT_NON_STR_KEYS | module.OPT_UTC_Z)
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,220 @@
+import re
+import threading
+from bisect import bisect_left
+from functools import reduce
+from operator import and_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import Case, F, FloatField, Q, Value, When
+from rest_framework import filters
+
+from .models import Comments, Lessons
+
+SEARCH_CONFIG = 'simple'
+
+SEARCH_WEIGHTS = {
+    Lessons: {'title': 'A', 'description': 'B'},
+    Comments: {'text': 'A'},
+}
+
+# PostgreSQL ts_rank dagi standart og'irliklar: {D, C, B, A} = {0.1, 0.2, 0.4, 1.0}
+WEIGHT_SCORES = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def is_postgresql(model):
+    return connections[router.db_for_read(model)].vendor == 'postgresql'
+
+
+def as_id(term):
+    return int(term) if term.isdecimal() and len(term) < 19 else None
+
+
+def search_vector(model):
+    '''
+    search_vector - SEARCH_WEIGHTS dagi maydonlardan og'irlikli (A, B, ...) SearchVector ifodasini tuzadi.
+    '''
+
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in SEARCH_WEIGHTS[model].items()]
+    return reduce(lambda left, right: left + right, vectors)
+
+
+class InvertedIndex:
+    '''
+    InvertedIndex - PostgreSQL bo'lmagan bazalar (SQLite, testlar) uchun jarayon ichidagi teskari indeks.
+
+    Indeks birinchi qidiruvda bazadan quriladi, keyin esa save/delete signallari orqali yangilanadi.
+    So'zlar prefiks bo'yicha qidiriladi (PostgreSQL dagi "so'z:*" bilan bir xil) va natija og'irliklar yig'indisi bo'yicha baholanadi.
+    '''
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.postings = None
+        self.documents = {}
+        self.vocabulary = []
+        self.dirty = False
+
+    def _tokens(self, values):
+        tokens = {}
+
+        for field, weight in SEARCH_WEIGHTS[self.model].items():
+            for token in tokenize(values.get(field)):
+                tokens[token] = max(tokens.get(token, 0), WEIGHT_SCORES[weight])
+
+        return tokens
+
+    def _add(self, pk, values):
+        tokens = self._tokens(values)
+        self.documents[pk] = tokens
+
+        for token, score in tokens.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self.dirty = True
+            self.postings[token][pk] = score
+
+    def _remove(self, pk):
+        for token in self.documents.pop(pk, {}):
+            self.postings[token].pop(pk, None)
+
+    def _build(self):
+        self.postings = {}
+        self.documents = {}
+        fields = list(SEARCH_WEIGHTS[self.model])
+
+        for row in self.model.objects.values('pk', *fields).iterator():
+            self._add(row['pk'], row)
+
+    def update(self, instance):
+        with self.lock:
+            if self.postings is not None:
+                self._remove(instance.pk)
+                self._add(instance.pk, {field: getattr(instance, field) for field in SEARCH_WEIGHTS[self.model]})
+
+    def remove(self, pk):
+        with self.lock:
+            if self.postings is not None:
+                self._remove(pk)
+
+    def search(self, terms):
+        '''
+        search - barcha so'zlarga mos keladigan hujjatlarni {pk: ball} ko'rinishida qaytaradi.
+        '''
+
+        with self.lock:
+            if self.postings is None:
+                self._build()
+                self.dirty = True
+
+            if self.dirty:
+                self.vocabulary = sorted(self.postings)
+                self.dirty = False
+
+            result = None
+
+            for term in terms:
+                scores = {}
+                position = bisect_left(self.vocabulary, term)
+
+                while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+                    for pk, score in self.postings[self.vocabulary[position]].items():
+                        scores[pk] = max(scores.get(pk, 0), score)
+                    position += 1
+
+                if as_id(term) is not None:
+                    scores.setdefault(as_id(term), 0)
+
+                result = scores if result is None else {pk: result[pk] + score for pk, score in scores.items() if pk in result}
+
+            return result or {}
+
+
+indexes = {model: InvertedIndex(model) for model in SEARCH_WEIGHTS}
+
+
+def update_search_vector(instance, update_fields=None):
+    '''
+    update_search_vector - saqlangan obyektning qidiruv vektorini (PostgreSQL) yoki Python indeksini yangilaydi.
+    update_fields da qidiriladigan maydonlar bo'lmasa hech narsa qilinmaydi.
+    '''
+
+    update_search_vectors(type(instance), [instance], update_fields)
+
+
+def update_search_vectors(model, instances, update_fields=None):
+    '''
+    update_search_vectors - bir nechta obyektning qidiruv vektorlarini PostgreSQL da bitta UPDATE bilan yangilaydi.
+    '''
+
+    fields = SEARCH_WEIGHTS[model]
+
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+
+    if is_postgresql(model):
+        model.objects.filter(pk__in=[instance.pk for instance in instances]).update(search_vector=search_vector(model))
+    else:
+        for instance in instances:
+            indexes[model].update(instance)
+
+
+def search(queryset, terms):
+    '''
+    search - querysetni so'zlar bo'yicha filtrlaydi va search_rank bo'yicha kamayish tartibida saralaydi.
+
+    Har bir so'z prefiks bo'yicha qidiriladi va barcha so'zlar mos kelishi kerak (AND). Raqamli so'zlar avvalgidek
+    ID ga ham mos keladi. PostgreSQL da GIN indeksli search_vector, boshqa bazalarda InvertedIndex ishlatiladi.
+    '''
+
+    model = queryset.model
+
+    if is_postgresql(model):
+        conditions = []
+
+        for term in terms:
+            condition = Q(search_vector=SearchQuery(f'{term}:*', search_type='raw', config=SEARCH_CONFIG))
+            if as_id(term) is not None:
+                condition |= Q(pk=as_id(term))
+            conditions.append(condition)
+
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+        return queryset.filter(reduce(and_, conditions)).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', '-pk')
+
+    scores = indexes[model].search(terms)
+
+    if not scores:
+        return queryset.none()
+
+    return queryset.filter(pk__in=scores).annotate(
+        search_rank=Case(*[When(pk=pk, then=Value(score)) for pk, score in scores.items()], output_field=FloatField())
+    ).order_by('-search_rank', '-pk')
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    '''
+    FullTextSearchFilter - SearchFilter o'rnida ishlaydi, ?search= parametri o'zgarmaydi.
+
+    SEARCH_WEIGHTS da ro'yxatdan o'tgan modellar uchun ILIKE '%so'z%' o'rniga to'liq matnli qidiruv (api.search.search)
+    ishlatiladi, qolgan modellar uchun esa odatiy SearchFilter ishlaydi.
+    '''
+
+    def filter_queryset(self, request, queryset, view):
+        if queryset.model not in SEARCH_WEIGHTS:
+            return super().filter_queryset(request, queryset, view)
+
+        terms = tokenize(' '.join(self.get_search_terms(request)))
+
+        if not terms:
+            return queryset
+
+        return search(queryset, terms)
@@ -1,11 +1,242 @@
 import re
+from functools import reduce
+from operator import or_
 
+from django.db.models import Q
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from rest_framework.settings import api_settings as drf_settings
+from rest_framework.validators import UniqueTogetherValidator
 
+from .bulk import bulk_save, to_pk
+from .fieldsets import DEFAULT_SHAPE, readable_fields
 from .models import *
+from .profiling import timing
 
 
-class UserSerializer(serializers.ModelSerializer):
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    '''
+    PrefetchedPrimaryKeyRelatedField - PrimaryKeyRelatedField bilan bir xil, lekin BulkListSerializer oldindan o'qib
+    qo'ygan obyektlar (prefetched) bo'lsa, har bir element uchun alohida SELECT yubormaydi.
+    '''
+
+    prefetched = None
+
+    def to_internal_value(self, data):
+        if self.prefetched is not None and self.pk_field is None:
+            instance = self.prefetched.get(to_pk(self.get_queryset().model, data))
+
+            if instance is not None:
+                return instance
+
+        return super().to_internal_value(data)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    '''
+    BulkListSerializer - bulk endpointlar (api.mixins.BulkMixin) uchun ListSerializer.
+
+    Ro'yxatdagi barcha elementlar bir martada tekshiriladi, xatoliklar har bir element uchun ro'yxat tartibida qaytadi
+    (to'g'ri elementlar uchun {}). ForeignKey ID lari elementlardan yig'ilib har bir maydon uchun bitta so'rov bilan
+    o'qiladi. Yozish api.bulk.bulk_save orqali bitta bulk_create yoki bulk_update bilan bajariladi.
+
+    Yangilashda instance {id: obyekt} ko'rinishida beriladi va har bir element o'zidagi id bo'yicha obyektga bog'lanadi.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.targets = []
+        self.target_pks = set()
+
+    def prefetch_related_fields(self, data):
+        for field in self.child.fields.values():
+            if not isinstance(field, PrefetchedPrimaryKeyRelatedField) or field.read_only:
+                continue
+
+            model = field.get_queryset().model
+            pks = {to_pk(model, item.get(field.field_name)) for item in data if isinstance(item, dict)} - {None}
+            field.prefetched = field.get_queryset().in_bulk(pks)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.prefetch_related_fields(data)
+
+        validators = self.child.validators
+        self.unique_validators = [validator for validator in validators if isinstance(validator, UniqueTogetherValidator)]
+        self.child.validators = [validator for validator in validators if validator not in self.unique_validators]
+
+        self.targets = []
+        self.target_pks = set()
+        validated_data = super().to_internal_value(data)
+        self.validate_unique_together(validated_data)
+
+        return validated_data
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        pk = to_pk(self.child.Meta.model, data.get('id') if isinstance(data, dict) else None)
+        target = self.instance.get(pk)
+
+        if target is None:
+            raise serializers.ValidationError({'id': ["Object with this id does not exist."]})
+
+        if target.pk in self.target_pks:
+            raise serializers.ValidationError({'id': ["Duplicate id."]})
+
+        self.targets.append(target)
+        self.target_pks.add(target.pk)
+        self.child.instance = target
+        self.child.initial_data = data
+
+        return super().run_child_validation(data)
+
+    def validate_unique_together(self, validated_data):
+        '''
+        validate_unique_together - UniqueTogetherValidator har bir element uchun alohida SELECT yuboradi va bir so'rov
+        ichidagi takrorlarni ko'rmaydi. Shuning uchun u elementlardan olib tashlanadi va bu yerda butun ro'yxat uchun
+        bitta so'rov bilan tekshiriladi.
+        '''
+
+        errors = [{} for _ in validated_data]
+        targets = self.targets or [None] * len(validated_data)
+
+        for validator in self.unique_validators:
+            keys = {}
+
+            for index, (attrs, target) in enumerate(zip(validated_data, targets)):
+                if target is not None and not set(validator.fields) & set(attrs):
+                    continue
+
+                key = tuple(getattr(value, 'pk', value) for value in (
+                    attrs.get(field, getattr(target, field, None)) for field in validator.fields
+                ))
+
+                if None not in key:
+                    keys.setdefault(key, []).append(index)
+
+            if not keys:
+                continue
+
+            existing = set(validator.queryset.filter(
+                reduce(or_, (Q(**dict(zip(validator.fields, key))) for key in keys))
+            ).exclude(pk__in=self.target_pks).values_list(*validator.fields))
+
+            for key, indexes in keys.items():
+                for index in (indexes if key in existing else indexes[1:]):
+                    errors[index].setdefault(drf_settings.NON_FIELD_ERRORS_KEY, []).append(
+                        validator.message.format(field_names=', '.join(validator.fields))
+                    )
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return bulk_save(model, [model(**attrs) for attrs in validated_data])
+
+    def update(self, instance, validated_data):
+        fields = set()
+
+        for target, attrs in zip(self.targets, validated_data):
+            for attr, value in attrs.items():
+                setattr(target, attr, value)
+
+            fields.update(attrs)
+
+        return bulk_save(self.child.Meta.model, self.targets, fields)
+
+
+class NestedSerializerMixin:
+    '''
+    NestedSerializerMixin - serializerdagi ichma-ich (nested) ma'lumotlarni bitta joyda e'lon qilish uchun ishlatiladi.
+
+    Meta.nested - {maydon nomi: serializer klassi} ko'rinishida beriladi. to_representation shu maydonlarning
+    to'liq ma'lumotlarini chiqaradi, viewsetlar esa get_select_related orqali kerakli JOIN larni oldindan biladi.
+    Shu sababli har bir qator uchun alohida so'rov (N+1) yuborilmaydi.
+
+    shape - javob ko'rinishi (api.fieldsets.Shape, ?fields= va ?expand= dan): faqat so'ralgan maydonlar chiqadi,
+    ochilmagan nested maydonlar ID bo'lib qoladi. get_select_related va get_only querysetni shu ko'rinishga moslaydi.
+    '''
+
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
+    def __init__(self, *args, shape=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shape = shape or self.context.get('shape') or DEFAULT_SHAPE
+
+    @classmethod
+    def get_nested(cls):
+        return getattr(cls.Meta, 'nested', {})
+
+    @classmethod
+    def get_select_related(cls, prefix='', shape=DEFAULT_SHAPE):
+        related = []
+
+        for field, serializer_class in cls.get_nested().items():
+            if not shape.expands(field):
+                continue
+
+            related.append(prefix + field)
+
+            if issubclass(serializer_class, NestedSerializerMixin):
+                related.extend(serializer_class.get_select_related(f'{prefix}{field}__', shape.child(field)))
+
+        return related
+
+    @classmethod
+    def get_only(cls, prefix='', shape=DEFAULT_SHAPE):
+        '''
+        get_only - queryset.only() uchun ustunlar: shape bo'yicha chiqadigan maydonlar va ochilgan nested maydonlarning ustunlari.
+        '''
+
+        model = cls.Meta.model
+        columns = {field.name for field in model._meta.concrete_fields}
+        nested = cls.get_nested()
+        only = [prefix + model._meta.pk.name]
+
+        for name, source in readable_fields(cls).items():
+            if not shape.includes(name) or source not in columns:
+                continue
+
+            only.append(prefix + source)
+
+            if name in nested and shape.expands(name):
+                only.extend(nested[name].get_only(f'{prefix}{name}__', shape.child(name)))
+
+        return only
+
+    @property
+    def _readable_fields(self):
+        for field in super()._readable_fields:
+            if self.shape.includes(field.field_name):
+                yield field
+
+    @cached_property
+    def nested_serializers(self):
+        return {
+            field: serializer_class(context=self.context, shape=self.shape.child(field))
+            for field, serializer_class in self.get_nested().items()
+            if self.shape.expands(field)
+        }
+
+    def to_representation(self, instance):
+        with timing('serialize'):
+            data = super().to_representation(instance)
+
+            for field, serializer in self.nested_serializers.items():
+                value = getattr(instance, field)
+
+                if value is None:
+                    data[field] = type(serializer)(None, shape=serializer.shape).data
+                else:
+                    data[field] = serializer.to_representation(value)
+
+        return data
+
+
+class UserSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     '''
     UserSerializer - User modelidan foydalanuvchilarni ma'lumotlarini JSON shaklida olib berish uchun ishlatiladi.
     '''
@@ -16,7 +247,7 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'username', 'is_active']
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     '''
     CourseSerializer - Courses modelidan ma'lumotlarni JSON shaklida olib berish uchun ishlatiladi.
     '''
@@ -24,10 +255,10 @@ class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Courses
         fields = '__all__'
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'lesson_count']
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     '''
     LessonSerializer - Lessons modelidan ma'lumotlarni JSON shaklida olib berish uchun ishlatiladi.
 
@@ -40,19 +271,27 @@ class LessonSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Lessons
-        fields = '__all__'
-        read_only_fields = ['id', 'teacher', 'like', 'dislike', 'deadline']
+        exclude = ['search_vector']
+        read_only_fields = ['id', 'teacher', 'like', 'dislike', 'comment_count', 'file_count', 'deadline']
+        list_serializer_class = BulkListSerializer
+        nested = {
+            'course': CourseSerializer,
+            'teacher': UserSerializer,
+        }
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
 
-        data['course'] = CourseSerializer(instance.course).data
-        data['teacher'] = UserSerializer(instance.teacher).data
+class LessonFileRenditionSerializer(serializers.ModelSerializer):
+    '''
+    LessonFileRenditionSerializer - faylning kichik nusxasi (URL, turi, hajmi, o'lchamlari).
+    '''
 
-        return data
+    class Meta:
+        model = LessonFileRendition
+        fields = ['id', 'kind', 'file', 'mime_type', 'size', 'width', 'height']
+        read_only_fields = fields
 
 
-class LessonFileSerializer(serializers.ModelSerializer):
+class LessonFileSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     '''
         LessonFileSerializer - LessonFile modelidan ma'lumotlarni JSON shaklida olib berish uchun ishlatiladi.
 
@@ -61,22 +300,24 @@ class LessonFileSerializer(serializers.ModelSerializer):
 
         Eslatma: POST, PUT, PATCH orqali ishlayotganingizda to_representation funksiaysida berilgan keylardagi to'liq ma'lumotini kiritmang! Aks holda xatolik kelib chiqadi.
         Faqat kerakli maydon ID si bilan murojaat qiling! To'liq ma'lumotlar faqat GET orqali murojaat qilinganida chiqadi.
+
+        renditions - fon jarayonida yaratilgan kichik nusxalar (kichigidan kattasiga), metadata - fayl haqidagi ma'lumotlar.
         '''
 
+    renditions = LessonFileRenditionSerializer(many=True, read_only=True)
+
     class Meta:
         model = LessonFile
         fields = '__all__'
         read_only_fields = ['id']
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-
-        data['lesson'] = LessonSerializer(instance.lesson).data
-
-        return data
+        prefetch_related = ['renditions']
+        list_serializer_class = BulkListSerializer
+        nested = {
+            'lesson': LessonSerializer,
+        }
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(NestedSerializerMixin, serializers.ModelSerializer):
     '''
         CommentSerializer - Comments modelidan ma'lumotlarni JSON shaklida olib berish uchun ishlatiladi.
 
@@ -89,16 +330,57 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comments
-        fields = '__all__'
+        exclude = ['search_vector', 'path']
         read_only_fields = ['id', 'author']
+        list_serializer_class = BulkListSerializer
+        nested = {
+            'lesson': LessonSerializer,
+            'author': UserSerializer,
+        }
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        reply = attrs.get('reply', getattr(self.instance, 'reply', None))
+        lesson = attrs.get('lesson', getattr(self.instance, 'lesson', None))
 
-        data['lesson'] = LessonSerializer(instance.lesson).data
-        data['author'] = UserSerializer(instance.author).data
+        if reply is None:
+            return attrs
 
-        return data
+        if reply.lesson_id != getattr(lesson, 'pk', None):
+            raise serializers.ValidationError({'reply': "Reply must belong to the same lesson."})
+
+        if self.instance is not None and (reply.pk == self.instance.pk or reply.path.startswith(self.instance.subtree_path)):
+            raise serializers.ValidationError({'reply': "A comment cannot reply to itself or to its own replies."})
+
+        if reply.depth + 1 >= Comments.MAX_DEPTH:
+            raise serializers.ValidationError({'reply': "Reply nesting is too deep."})
+
+        return attrs
+
+
+class CommentThreadSerializer(serializers.ModelSerializer):
+    '''
+    CommentThreadSerializer - izohlar daraxtidagi bitta tugun. replies - javoblar (eskisidan yangisiga),
+    has_more_replies - daraxt depth chegarasida kesilgan bo'lsa True, qolgan javoblar /comments/<id>/thread/ orqali olinadi.
+    '''
+
+    author = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Comments
+        fields = ['id', 'text', 'created_at', 'author', 'reply', 'depth']
+        read_only_fields = fields
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    '''
+    UploadSerializer - bo'laklab yuklanayotgan fayl holatini (offset, length, tayyor bo'lgan lesson_file) qaytaradi.
+    '''
+
+    class Meta:
+        model = Upload
+        fields = ['id', 'lesson', 'filename', 'length', 'offset', 'lesson_file', 'created_at', 'updated_at']
+        read_only_fields = fields
 
 
 class RegisterSerializer(serializers.ModelSerializer):
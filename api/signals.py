@@ -1,39 +1,151 @@
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.db.models.signals import post_save
+from functools import partial
+
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.conf import settings
 
-from .models import Lessons
+from .authentication import user_cache
+from .bulk import post_bulk_save, pre_bulk_save
+from .cache import bump_version
+from .counters import bulk_update_counters, release_counters, update_counters
+from .media import media_processor
+from .models import Comments, Courses, LessonFile, Lessons, LessonNotification
+from .profiling import timing
+from .search import indexes, update_search_vector, update_search_vectors
 
 
 @receiver(post_save, sender=Lessons)
-def send_mail(sender, instance, created, **kwargs):
+def queue_lesson_notification(sender, instance, created, **kwargs):
     '''
-    send_mail - Lessons modeliga yangi ma'lumot qo'shilganida foydalanuvchilarni email manziliga xabar yuboriladi.
+    queue_lesson_notification - Lessons modeliga yangi ma'lumot qo'shilganida foydalanuvchilarga yuboriladigan
+    xabarnomani navbatga (LessonNotification) qo'shadi. Emaillarni send_notifications workeri yuboradi.
     '''
 
     if created:
-        subject = "You have been assigned a house."
-        from_email = settings.DEFAULT_FROM_EMAIL
+        with timing('notify'):
+            LessonNotification.objects.create(lesson=instance)
+
+
+@receiver(post_bulk_save, sender=Lessons)
+def queue_batch_notification(sender, instances, created, **kwargs):
+    '''
+    queue_batch_notification - bulk endpoint orqali qo'shilgan darslar uchun bitta xabarnoma yaratadi,
+    foydalanuvchilar har bir dars uchun alohida emas, partiyadagi barcha darslar haqida bitta xat oladi.
+    '''
+
+    if created and instances:
+        with timing('notify'):
+            notification = LessonNotification.objects.create(lesson=instances[0])
+
+            if len(instances) > 1:
+                notification.lessons.set(instances)
+
+
+@receiver(post_save, sender=Lessons)
+@receiver(post_save, sender=Comments)
+@receiver(post_save, sender=LessonFile)
+def save_counters(sender, instance, created, raw=False, **kwargs):
+    '''
+    save_counters - kurs va dars hisoblagichlarini (lesson_count, comment_count, file_count) yangilaydi.
+    CountedMixin.save tranzaksiyasi ichida ishlaydi.
+    '''
+
+    if not raw:
+        update_counters(instance, created)
+
+
+@receiver(post_bulk_save, sender=Lessons)
+@receiver(post_bulk_save, sender=Comments)
+@receiver(post_bulk_save, sender=LessonFile)
+def save_bulk_counters(sender, instances, created, **kwargs):
+    bulk_update_counters(instances, created)
+
+
+@receiver(post_delete, sender=Lessons)
+@receiver(post_delete, sender=Comments)
+@receiver(post_delete, sender=LessonFile)
+def delete_counters(sender, instance, origin=None, **kwargs):
+    release_counters(instance, origin)
+
+
+@receiver(pre_bulk_save, sender=Comments)
+def assign_comment_paths(sender, instances, update_fields=None, **kwargs):
+    '''
+    assign_comment_paths - bulk_create/bulk_update dan oldin izohlar yo'lini (Comments.save dagidek) hisoblaydi,
+    boshqa izohga ko'chirilgan izohlarning avlodlarini ham ko'chiradi.
+    '''
+
+    for comment in instances:
+        old_subtree, old_depth = (comment.subtree_path, comment.depth) if comment.pk else (None, None)
+
+        if not comment.assign_path():
+            continue
 
-        recipient_list = list(User.objects.filter(email__isnull=False).values_list('email', flat=True))
+        if update_fields is not None:
+            update_fields.update(['path', 'depth'])
 
-        if recipient_list:
-            html_content = render_to_string('emails/index.html', {
-                'title': instance.title,
-                'description': instance.description or "Ma'lumot qo'shilmadi.",
-                'is_active': instance.is_active,
-            })
+        if old_subtree is not None:
+            comment.move_descendants(old_subtree, old_depth)
 
-            email = EmailMultiAlternatives(
-                subject=subject,
-                from_email=from_email,
-                to=recipient_list
-            )
 
-            email.attach_alternative(html_content, 'text/html')
-            email.send(fail_silently=True)
+@receiver(post_save, sender=LessonFile)
+def process_lesson_file(sender, instance, **kwargs):
+    '''
+    process_lesson_file - yangi yoki almashtirilgan fayl uchun nusxalar yaratish vazifasini tranzaksiya commit
+    qilingandan keyin api.media ga yuboradi (worker rejimida faylni process_media --watch workeri o'zi topadi).
+    '''
+
+    if instance.file and instance.metadata.get('source') != instance.file.name:
+        transaction.on_commit(partial(media_processor.submit, instance.pk))
+
+
+@receiver(post_bulk_save, sender=LessonFile)
+def process_lesson_files(sender, instances, **kwargs):
+    for instance in instances:
+        process_lesson_file(sender, instance)
+
+
+@receiver(post_save, sender=Lessons)
+@receiver(post_save, sender=Comments)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    '''
+    update_search_index - dars yoki izoh saqlanganda uning qidiruv vektorini yangilaydi.
+    '''
+
+    update_search_vector(instance, update_fields)
+
 
+@receiver(post_bulk_save, sender=Lessons)
+@receiver(post_bulk_save, sender=Comments)
+def update_bulk_search_index(sender, instances, update_fields=None, **kwargs):
+    update_search_vectors(sender, instances, update_fields)
+
+
+@receiver(post_delete, sender=Lessons)
+@receiver(post_delete, sender=Comments)
+def remove_from_search_index(sender, instance, **kwargs):
+    indexes[sender].remove(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    '''
+    invalidate_user_cache - foydalanuvchi saqlanganda (is_active, is_staff, parol o'zgarishi) yoki o'chirilganda
+    uni CachedJWTAuthentication keshidan olib tashlaydi.
+    '''
+
+    user_cache.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Courses)
+@receiver([post_save, post_delete, post_bulk_save], sender=Lessons)
+@receiver([post_save, post_delete, post_bulk_save], sender=LessonFile)
+@receiver([post_save, post_delete, post_bulk_save], sender=Comments)
+@receiver([post_save, post_delete], sender=User)
+def invalidate_api_cache(sender, **kwargs):
+    '''
+    invalidate_api_cache - model o'zgarganda uning versiyasini oshiradi, shu model chiqadigan API keshlari eskiradi.
+    '''
 
+    bump_version(sender)
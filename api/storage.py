@@ -0,0 +1,171 @@
+import fcntl
+import hashlib
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_RE = re.compile(r'^(?P<prefix>.*/)?[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})$')
+
+
+def get_options():
+    return {
+        'GRACE_PERIOD': 3600,
+        'CHUNK_SIZE': 1024 * 1024,
+        **getattr(settings, 'CONTENT_STORAGE', {}),
+    }
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    '''
+    ContentAddressedStorage - fayllarni SHA-256 digest bo'yicha saqlaydigan (deduplikatsiya qiluvchi) storage.
+
+    Fayl yozilayotganda hash hisoblanadi va u <upload_to>/ab/cd/<digest> nomi bilan bir marta saqlanadi. Bir xil fayl
+    qayta yuklansa, yangi nusxa yaratilmaydi, mavjud blob ishlatiladi. Blob ga havolalar soni LessonFile qatorlari
+    bo'yicha (file maydoni indekslangan) hisoblanadi: delete faqat blob hech qaysi qatorda ishlatilmasa va oxirgi
+    GRACE_PERIOD soniya ichida qayta saqlanmagan bo'lsa faylni o'chiradi. Saqlash va o'chirish bir xil blob uchun
+    flock orqali navbat bilan bajariladi, shuning uchun parallel yuklash bilan o'chirish to'qnashmaydi.
+
+    Oxirgi saqlash vaqti blobning o'zida emas, .leases/<digest> faylining mtime ida saqlanadi: blob yozilgandan keyin
+    o'zgarmaydi, shuning uchun uning Last-Modified va ETag qiymatlari (api.delivery) qayta yuklashda eskirmaydi.
+    '''
+
+    def get_available_name(self, name, max_length=None):
+        # Yakuniy nom fayl mazmunidan (_save) olinadi
+        return name
+
+    @contextmanager
+    def lock(self, name):
+        '''
+        lock - blob uchun jarayonlar orasidagi eksklyuziv qulf (256 ta lock fayl digest ning birinchi baytiga qarab).
+        '''
+
+        match = BLOB_RE.match(name)
+        stripe = match['digest'][:2] if match else hashlib.sha256(name.encode()).hexdigest()[:2]
+        directory = self.path('.locks')
+        os.makedirs(directory, exist_ok=True)
+
+        with open(os.path.join(directory, stripe), 'a') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            yield
+
+    def lease_path(self, name):
+        match = BLOB_RE.match(name)
+        return self.path(os.path.join('.leases', match['digest'])) if match else None
+
+    def renew_lease(self, name):
+        '''
+        renew_lease - blob oxirgi marta saqlangan vaqtni yangilaydi, parallel delete uni GRACE_PERIOD davomida o'chirmaydi.
+        '''
+
+        path = self.lease_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'a'):
+            os.utime(path)
+
+    def release(self, name):
+        super().delete(name)
+
+        try:
+            os.remove(self.lease_path(name) or '')
+        except FileNotFoundError:
+            pass
+
+    def blob_name(self, name, digest):
+        prefix = os.path.dirname(name)
+        return '/'.join(filter(None, [prefix, digest[:2], digest[2:4], digest]))
+
+    def _save(self, name, content):
+        chunk_size = get_options()['CHUNK_SIZE']
+        hasher = hashlib.sha256()
+
+        if hasattr(content, 'temporary_file_path'):
+            # Fayl diskda tayyor (masalan, api.uploads): faqat o'qib hash hisoblanadi, keyin nusxalamasdan ko'chiriladi
+            source = content.temporary_file_path()
+
+            with open(source, 'rb') as file:
+                for chunk in iter(lambda: file.read(chunk_size), b''):
+                    hasher.update(chunk)
+        else:
+            directory = self.path('.tmp')
+            os.makedirs(directory, exist_ok=True)
+            source = os.path.join(directory, uuid.uuid4().hex)
+
+            with open(source, 'wb') as file:
+                for chunk in content.chunks(chunk_size):
+                    chunk = chunk.encode() if isinstance(chunk, str) else chunk
+                    hasher.update(chunk)
+                    file.write(chunk)
+
+        name = self.blob_name(name, hasher.hexdigest())
+        path = self.path(name)
+
+        with self.lock(name):
+            if os.path.exists(path):
+                # Blob allaqachon bor, u o'zgartirilmaydi (mtime ham), faqat lease yangilanadi
+                os.remove(source)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(source, path)
+
+                if self.file_permissions_mode is not None:
+                    os.chmod(path, self.file_permissions_mode)
+
+            self.renew_lease(name)
+
+        return name
+
+    def is_referenced(self, name):
+        from .models import LessonFile
+
+        return LessonFile.objects.filter(file=name).exists()
+
+    def is_recent(self, name):
+        try:
+            return time.time() - os.path.getmtime(self.lease_path(name) or self.path(name)) < get_options()['GRACE_PERIOD']
+        except FileNotFoundError:
+            return False
+
+    def delete(self, name):
+        with self.lock(name):
+            if self.is_referenced(name) or self.is_recent(name):
+                return
+
+            self.release(name)
+
+    def collect_garbage(self, prefix='lessons', dry_run=False):
+        '''
+        collect_garbage - hech qaysi qatorda ishlatilmayotgan va GRACE_PERIOD dan eski bloblarni o'chiradi.
+        (fayllar soni, bo'shatilgan baytlar) qaytariladi.
+        '''
+
+        files = size = 0
+
+        for root, _, filenames in os.walk(self.path(prefix)):
+            for filename in filenames:
+                name = os.path.relpath(os.path.join(root, filename), self.location).replace(os.sep, '/')
+
+                if not BLOB_RE.match(name):
+                    continue
+
+                with self.lock(name):
+                    if self.is_referenced(name) or self.is_recent(name):
+                        continue
+
+                    files += 1
+                    size += self.size(name)
+
+                    if not dry_run:
+                        self.release(name)
+
+        return files, size
+
+
+content_storage = ContentAddressedStorage()
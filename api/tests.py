@@ -1,3 +1,1819 @@
-from django.test import TestCase
+import base64
+import decimal
+import hashlib
+import json
+import os
+import runpy
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from importlib import import_module
+from io import BytesIO, StringIO
+from smtplib import SMTPException
+from types import ModuleType
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.apps import apps
+from django.core import mail
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken as SimpleJWTBlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework.throttling import ScopedRateThrottle
+
+from .async_views import as_async_view, async_urlpatterns
+from .authentication import CachedJWTAuthentication, user_cache
+from .blacklist import BloomFilter, TokenBlacklist, token_blacklist, token_digest
+from .cache import bump_version
+from .renderers import EnvelopeJSONRenderer, EnvelopeResponse, ORJSONRenderer
+from .media import pending, pillow
+from .models import *
+from .notifications import claim_notification, process_next
+from .pagination import estimate_count
+from .profiling import Profile, ProfilingMiddleware, current_profile, timing
+from .reactions import ReactionBuffer
+from .search import indexes
+from .storage import content_storage
+from .throttling import CacheThrottleStore, SQLiteThrottleStore, get_store, sliding_window
+from .uploads import part_path, purge_stale_uploads
+from .urls import router
+from .views import CommentViewSet, CourseViewSet, LessonViewSet
+
+TEST_THROTTLE_STORE = {'BACKEND': 'api.throttling.CacheThrottleStore'}
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), API_CACHE={'ENABLED': False}, THROTTLE_STORE=TEST_THROTTLE_STORE)
+class QueryCountTests(TestCase):
+    '''
+    list va retrieve endpointlari sahifadagi qatorlar sonidan qat'i nazar bir xil sondagi so'rov bilan ishlashini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        teachers = [User.objects.create_user(username=f'teacher{i}', email=f'teacher{i}@example.com') for i in range(3)]
+
+        for i in range(12):
+            course = Courses.objects.create(name=f'Course {i}')
+            lesson = Lessons.objects.create(title=f'Lesson {i}', course=course, teacher=teachers[i % 3])
+            LessonFile.objects.create(lesson=lesson, file=ContentFile(b'data', name=f'file{i}.txt'))
+            comment = Comments.objects.create(text=f'Comment {i}', lesson=lesson, author=teachers[i % 3])
+            Comments.objects.create(text=f'Reply {i}', lesson=lesson, reply=comment, author=None)
+
+        cls.ids = {
+            'courses': Courses.objects.first().pk,
+            'lessons': Lessons.objects.first().pk,
+            'lesson-files': LessonFile.objects.first().pk,
+            'comments': Comments.objects.filter(author__isnull=True).first().pk,
+        }
+        # Meta.prefetch_related dagi har bir bog'lanish uchun qo'shimcha bitta so'rov
+        cls.prefetches = {'lesson-files': 1}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_list_endpoints(self):
+        for prefix in self.ids:
+            with self.subTest(prefix=prefix), self.assertNumQueries(2 + self.prefetches.get(prefix, 0)):
+                response = self.client.get(f'/api/v1/{prefix}/')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['data']), 10)
+
+    def test_retrieve_endpoints(self):
+        for prefix, pk in self.ids.items():
+            with self.subTest(prefix=prefix), self.assertNumQueries(1 + self.prefetches.get(prefix, 0)):
+                response = self.client.get(f'/api/v1/{prefix}/{pk}/')
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['data']['id'], pk)
+
+    def test_nested_data(self):
+        response = self.client.get(f"/api/v1/comments/{self.ids['comments']}/")
+        data = response.json()['data']
+
+        self.assertEqual(data['lesson']['course']['name'], Comments.objects.get(pk=data['id']).lesson.course.name)
+        self.assertEqual(data['author'], {'first_name': '', 'last_name': ''})
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class ResponseCacheTests(TestCase):
+    '''
+    Javoblar keshi, ETag bo'yicha 304 va model o'zgarganda keshning eskirishini tekshiradi.
+    '''
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course = Courses.objects.create(name='Python')
+
+    def test_conditional_get(self):
+        response = self.client.get('/api/v1/courses/')
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/courses/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/courses/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_invalidation(self):
+        response = self.client.get(f'/api/v1/courses/{self.course.pk}/')
+        etag = response['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.name = 'Django'
+            self.course.save()
+
+            # Versiya commit dan keyin oshiriladi, tranzaksiya ichida ModelVersion qatori qulflanmaydi
+            self.assertEqual(self.client.get(f'/api/v1/courses/{self.course.pk}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get(f'/api/v1/courses/{self.course.pk}/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['data']['name'], 'Django')
+
+
+    def test_one_version_bump_per_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            bump_version(Courses)
+            bump_version(Lessons, Courses)
+
+            with transaction.atomic():
+                bump_version(LessonFile)
+
+            # Bekor qilingan savepoint dagi nom tashqi callbackda qoladi (faqat kesh eskiradi)
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                bump_version(Comments)
+                raise IntegrityError
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(sorted(callbacks[0].labels), ['api.comments', 'api.courses', 'api.lessonfile', 'api.lessons'])
+
+        for name in callbacks[0].labels:
+            ModelVersion.objects.get_or_create(name=name)
+
+        versions = dict(ModelVersion.objects.values_list('name', 'version'))
+
+        # Barcha modellar uchun bitta SELECT va bitta UPDATE
+        with self.assertNumQueries(2):
+            callbacks[0]()
+
+        self.assertEqual(ModelVersion.objects.get(name='api.courses').version, versions['api.courses'] + 1)
+
+    def test_version_bump_in_rolled_back_savepoint(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                bump_version(Comments)
+                raise IntegrityError
+
+            # Savepoint bilan birga uning callbacki ham o'chgan, yangisi ro'yxatdan o'tadi
+            bump_version(Courses)
+
+        self.assertEqual([sorted(callback.labels) for callback in callbacks], [['api.courses']])
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE, REACTION_BUFFER={'ENABLED': False})
+class ReactionTests(TestCase):
+    '''
+    like/dislike almashtirish, hisoblagichlar manfiy bo'lmasligi va reconcile_reactions buyrug'ini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com')
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        cls.lesson = Lessons.objects.create(title='Lesson', course=Courses.objects.create(name='Course'), teacher=teacher)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def react(self, reaction):
+        response = self.client.post(f'/api/v1/lessons/{self.lesson.pk}/{reaction}/')
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()['data']
+        return data['like'], data['dislike']
+
+    def counters(self):
+        return tuple(Lessons.objects.values_list('like', 'dislike').get(pk=self.lesson.pk))
+
+    def test_transitions(self):
+        for reaction, expected, stored in [
+            ('like', (1, 0), ['like']),
+            ('dislike', (0, 1), ['dislike']),
+            ('like', (1, 0), ['like']),
+            ('like', (0, 0), []),
+        ]:
+            with self.subTest(reaction=reaction, expected=expected):
+                self.assertEqual(self.react(reaction), expected)
+                self.assertEqual(self.counters(), expected)
+                self.assertEqual(list(LessonReaction.objects.values_list('reaction', flat=True)), stored)
+
+    def test_counters_never_negative(self):
+        LessonReaction.objects.create(lesson=self.lesson, user=self.user, reaction='like')
+
+        # Hisoblagich reaksiyalardan orqada qolgan (masalan qo'lda o'zgartirilgan), Greatest uni 0 dan pastga tushirmaydi
+        self.assertEqual(self.react('like'), (0, 0))
+        self.assertEqual(self.counters(), (0, 0))
+
+        LessonReaction.objects.create(lesson=self.lesson, user=self.user, reaction='like')
+        self.assertEqual(self.react('dislike'), (0, 1))
+        self.assertEqual(self.counters(), (0, 1))
+
+    def test_reconcile(self):
+        other = User.objects.create_user(username='other', email='other@example.com')
+        LessonReaction.objects.create(lesson=self.lesson, user=self.user, reaction='like')
+        LessonReaction.objects.create(lesson=self.lesson, user=other, reaction='dislike')
+        Lessons.objects.filter(pk=self.lesson.pk).update(like=5, dislike=0)
+
+        stdout = StringIO()
+        call_command('reconcile_reactions', '--dry-run', stdout=stdout)
+        self.assertEqual(self.counters(), (5, 0))
+        self.assertIn('1 would be fixed', stdout.getvalue())
+
+        call_command('reconcile_reactions', stdout=StringIO())
+        self.assertEqual(self.counters(), (1, 1))
+
+        stdout = StringIO()
+        call_command('reconcile_reactions', stdout=stdout)
+        self.assertIn('0 fixed', stdout.getvalue())
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE, REACTION_BUFFER={'ENABLED': True, 'FLUSH_INTERVAL': 3600})
+class ReactionBufferTests(TestCase):
+    '''
+    Reaksiyalar buferi: o'qishda buferdagi deltalar qo'shilishi, flush va stop (atexit) da bazaga yozilishini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(username=f'student{i}', email=f'student{i}@example.com') for i in range(2)]
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        cls.lesson = Lessons.objects.create(title='Lesson', course=Courses.objects.create(name='Course'), teacher=teacher)
+
+    def setUp(self):
+        self.buffer = ReactionBuffer()
+        self.addCleanup(self.buffer.stop)
+
+    def toggle(self, user, reaction):
+        return self.buffer.toggle(Lessons.objects.get(pk=self.lesson.pk), user, reaction)
+
+    def counters(self):
+        return tuple(Lessons.objects.values_list('like', 'dislike').get(pk=self.lesson.pk))
+
+    def test_reads_merge_pending(self):
+        first, second = self.users
+
+        self.assertEqual(self.toggle(first, 'like'), (1, 0))
+        # Ikkinchi bosish bazadagi emas, buferdagi holatdan boshlanadi
+        self.assertEqual(self.toggle(first, 'dislike'), (0, 1))
+        self.assertEqual(self.toggle(second, 'like'), (1, 1))
+
+        self.assertEqual(self.counters(), (0, 0))
+        self.assertFalse(LessonReaction.objects.exists())
+
+    def test_flush(self):
+        first, second = self.users
+        self.toggle(first, 'like')
+        self.toggle(second, 'dislike')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.buffer.flush(), 2)
+
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(dict(LessonReaction.objects.values_list('user', 'reaction')), {first.pk: 'like', second.pk: 'dislike'})
+        self.assertIsNone(self.buffer.flushing)
+        self.assertEqual(self.buffer._pending(self.lesson.pk), {'like': 0, 'dislike': 0})
+        self.assertEqual(self.buffer.flush(), 0)
+
+        # Yozilgan holat bazadan o'qiladi: qayta bosish like ni qaytarib oladi
+        self.assertEqual(self.toggle(first, 'like'), (0, 1))
+        self.buffer.flush()
+        self.assertEqual(self.counters(), (0, 1))
+
+    def test_stale_lesson(self):
+        first, second = self.users
+        lesson = Lessons.objects.get(pk=self.lesson.pk)
+
+        self.toggle(first, 'like')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buffer.flush()
+
+        # Dars flush dan oldin o'qilgan: hisoblagichlar undan emas, bazadan olinadi
+        self.assertEqual(self.buffer.toggle(lesson, second, 'like'), (2, 0))
+
+    def test_stop_flushes_once_registered(self):
+        with patch('api.reactions.atexit.register') as register:
+            self.toggle(self.users[0], 'like')
+            thread = self.buffer.thread
+
+            self.assertEqual(self.buffer.stop(), 1)
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(self.counters(), (1, 0))
+
+            # Oqim qayta ishga tushadi, atexit hook esa qayta qo'shilmaydi
+            self.toggle(self.users[1], 'like')
+            self.assertTrue(self.buffer.thread.is_alive())
+            self.assertEqual(self.buffer.stop(), 1)
+
+        register.assert_called_once_with(self.buffer.stop)
+        self.assertEqual(self.counters(), (2, 0))
+
+
+class ThrottleTests(TestCase):
+    '''
+    Sliding window counter algoritmi, jarayonlar orasida umumiy SQLite store va 429 javobini tekshiradi.
+    '''
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'throttle.sqlite3')
+
+    def test_sliding_window(self):
+        self.assertEqual(sliding_window(0, 9, 0, 60, 10), (True, 0))
+        self.assertEqual(sliding_window(0, 10, 15, 60, 10), (False, 45))
+        self.assertEqual(sliding_window(10, 0, 30, 60, 10), (True, 0))
+        self.assertEqual(sliding_window(10, 5, 15, 60, 10), (False, 21))
+
+    def test_shared_store(self):
+        first, second = SQLiteThrottleStore(self.path), SQLiteThrottleStore(self.path)
+
+        results = [store.hit('throttle_course_1', 'course', 60, 3, 120.5)[0] for store in (first, second, first, second)]
+
+        self.assertEqual(results, [True, True, True, False])
+        self.assertEqual(second.stats(['course', 'lesson']), {
+            'course': {'hit': 3, 'reject': 1},
+            'lesson': {'hit': 0, 'reject': 0},
+        })
+
+    def test_cache_store_concurrent(self):
+        cache.clear()
+        store = CacheThrottleStore()
+        barrier = threading.Barrier(20)
+        read = cache.get
+
+        def get(*args, **kwargs):
+            # Barcha so'rovlar hisoblagichni bir vaqtda o'qiydi (eng yomon holat)
+            barrier.wait()
+            return read(*args, **kwargs)
+
+        with patch.object(cache, 'get', get), ThreadPoolExecutor(20) as executor:
+            results = list(executor.map(lambda _: store.hit('throttle_course_1', 'course', 60, 5, 120.5)[0], range(20)))
+
+        # Hisoblagich avval oshiriladi va qaror qaytgan qiymat bo'yicha qabul qilinadi, parallel so'rovlar limitdan oshmaydi
+        self.assertEqual(results.count(True), 5)
+        self.assertEqual(cache.get('throttle_course_1:2'), 5)
+        self.assertEqual(store.stats(['course']), {'course': {'hit': 5, 'reject': 15}})
+
+    def test_rejected_request(self):
+        rates = {'course': '2/minute', 'lesson': '60/minute', 'lesson-file': '60/minute', 'comment': '60/minute'}
+        store = {'BACKEND': 'api.throttling.SQLiteThrottleStore', 'OPTIONS': {'path': self.path}}
+
+        with override_settings(THROTTLE_STORE=store), \
+                patch.object(ScopedRateThrottle, 'THROTTLE_RATES', rates):
+            responses = [self.client.get('/api/v1/courses/') for _ in range(3)]
+            stats = get_store().stats(['course'])
+
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        self.assertGreater(int(responses[2]['Retry-After']), 0)
+        self.assertEqual(stats, {'course': {'hit': 2, 'reject': 1}})
+
+
+@override_settings(API_CACHE={'ENABLED': False}, THROTTLE_STORE=TEST_THROTTLE_STORE)
+class SearchTests(TestCase):
+    '''
+    To'liq matnli qidiruvdagi og'irliklar bo'yicha saralash, prefiks bo'yicha moslik va jarayon ichidagi indeksni tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        cls.course = Courses.objects.create(name='Course')
+
+    def setUp(self):
+        # TestCase tranzaksiyasi bekor qilinganda signal yuborilmaydi, indeks har bir testda bazadan qayta quriladi
+        for index in indexes.values():
+            index.postings = None
+
+        self.client = APIClient()
+
+    def lesson(self, title, description=''):
+        return Lessons.objects.create(title=title, description=description, course=self.course, teacher=self.teacher)
+
+    def search(self, path, query):
+        return [item['id'] for item in self.client.get(f'{path}?search={query}').json()['data']]
+
+    def test_ranking(self):
+        in_title = self.lesson('Django basics', 'Introduction')
+        in_description = self.lesson('Introduction', 'Django tips')
+
+        # title (A) dagi moslik description (B) dagisidan yuqori, pk kattaroq bo'lsa ham
+        self.assertEqual(self.search('/api/v1/lessons/', 'django'), [in_title.pk, in_description.pk])
+
+    def test_prefix_and_all_terms(self):
+        basics = self.lesson('Django basics')
+        tips = self.lesson('Django tips')
+
+        self.assertEqual(self.search('/api/v1/lessons/', 'djan'), [tips.pk, basics.pk])
+        self.assertEqual(self.search('/api/v1/lessons/', 'bas djan'), [basics.pk])
+        self.assertEqual(self.search('/api/v1/lessons/', 'flask'), [])
+        self.assertEqual(self.search('/api/v1/lessons/', str(tips.pk)), [tips.pk])
+
+    def test_comments_keep_rank_order(self):
+        lesson = self.lesson('Lesson')
+        first, second = [Comments.objects.create(text=f'Answer {i}', lesson=lesson) for i in range(2)]
+        Comments.objects.create(text='Unrelated', lesson=lesson)
+        Comments.objects.filter(pk=first.pk).update(created_at=timezone.now() + timedelta(days=1))
+
+        # Qidiruvsiz cursor paginatsiya created_at bo'yicha saralaydi
+        self.assertEqual(self.search('/api/v1/comments/', '')[0], first.pk)
+
+        response = self.client.get('/api/v1/comments/?search=answer')
+        self.assertEqual([item['id'] for item in response.json()['data']], [second.pk, first.pk])
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_index_updates(self):
+        lesson = self.lesson('Python basics')
+        self.assertEqual(self.search('/api/v1/lessons/', 'python'), [lesson.pk])
+
+        lesson.title = 'Rust basics'
+        lesson.save()
+
+        self.assertEqual(self.search('/api/v1/lessons/', 'python'), [])
+        self.assertEqual(self.search('/api/v1/lessons/', 'rust'), [lesson.pk])
+
+        pk = lesson.pk
+        lesson.delete()
+
+        self.assertEqual(indexes[Lessons].search(['rust']), {})
+        self.assertNotIn(pk, indexes[Lessons].documents)
+
+
+@override_settings(API_CACHE={'ENABLED': False}, THROTTLE_STORE=TEST_THROTTLE_STORE)
+class CursorPaginationTests(TestCase):
+    '''
+    CustomCursorPagination: bir xil created_at li qatorlarda ham barqaror tartib va count rejimlari (estimate, exact, none).
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(username='student', email='student@example.com')
+        lesson = Lessons.objects.create(title='Lesson', course=Courses.objects.create(name='Course'), teacher=user)
+        Comments.objects.bulk_create([Comments(text=f'Comment {i}', lesson=lesson, author=user) for i in range(25)])
+
+        # Uchtadan qator bir xil vaqtga ega, tartibni faqat id ajratadi
+        comments = list(Comments.objects.order_by('pk'))
+        created_at = timezone.now()
+
+        for index, comment in enumerate(comments):
+            comment.created_at = created_at - timedelta(minutes=index // 3)
+
+        Comments.objects.bulk_update(comments, ['created_at'])
+        cls.comments = comments
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url):
+        ids = []
+
+        while url:
+            data = self.client.get(url).json()
+            ids += [item['id'] for item in data['data']]
+            url = data['next']
+
+        return ids
+
+    def test_stable_ordering(self):
+        expected = [comment.pk for comment in sorted(self.comments, key=lambda comment: (comment.created_at, comment.pk), reverse=True)]
+        self.assertEqual(self.walk('/api/v1/comments/?count=none'), expected)
+
+        expected = [comment.pk for comment in sorted(self.comments, key=lambda comment: (comment.created_at, comment.pk))]
+        self.assertEqual(self.walk('/api/v1/comments/?ordering=created_at&count=none'), expected)
+
+    def test_previous_page(self):
+        first = self.client.get('/api/v1/comments/').json()
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(first['previous'])
+
+        previous = self.client.get(second['previous']).json()
+        self.assertEqual([item['id'] for item in previous['data']], [item['id'] for item in first['data']])
+
+    def test_count_modes(self):
+        def get(query):
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(f'/api/v1/comments/?{query}').json()
+
+            return data['count'], [query['sql'] for query in queries if 'COUNT(' in query['sql'].upper()]
+
+        count, counted = get('count=exact')
+        self.assertEqual(count, 25)
+        self.assertEqual(len(counted), 1)
+
+        count, counted = get('count=none')
+        self.assertIsNone(count)
+        self.assertEqual(counted, [])
+
+        # Noma'lum rejim standart (estimate) ga qaytadi
+        self.assertEqual(get('count=unknown')[0], get('count=estimate')[0])
+
+        count, counted = get('')
+        self.assertEqual(count, estimate_count(Comments.objects.all()))
+
+        if connection.vendor == 'postgresql':
+            # Planner statistikasi ishlatiladi, COUNT(*) bajarilmaydi
+            self.assertEqual(counted, [])
+        else:
+            self.assertEqual(count, 25)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THROTTLE_STORE=TEST_THROTTLE_STORE)
+class AsyncViewTests(TestCase):
+    '''
+    Async list/retrieve javoblari (status, body, ETag) sinxron viewset javoblari bilan bir xil ekanini tekshiradi.
+    '''
+
+    viewsets = {'courses': CourseViewSet, 'lessons': LessonViewSet, 'comments': CommentViewSet}
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+
+        for i in range(12):
+            course = Courses.objects.create(name=f'Course {i}')
+            lesson = Lessons.objects.create(title=f'Lesson {i}', course=course, teacher=teacher)
+            Comments.objects.create(text=f'Comment {i}', lesson=lesson, author=teacher if i % 2 else None)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    def call_async(self, prefix, actions, path, **kwargs):
+        view = as_async_view(self.viewsets[prefix], actions, basename=prefix)
+        response = async_to_sync(view)(self.factory.get(path), **kwargs)
+        return response.render()
+
+    def assertSameResponse(self, expected, actual):
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        self.assertEqual(actual.get('ETag'), expected.get('ETag'))
+
+    def test_list(self):
+        for prefix in self.viewsets:
+            for query in ('', '?page=2', '?search=1', '?ordering=-created_at', '?page=9'):
+                with self.subTest(prefix=prefix, query=query):
+                    path = f'/api/v1/{prefix}/{query}'
+                    self.assertSameResponse(self.client.get(path), self.call_async(prefix, {'get': 'list'}, path))
+
+    def test_retrieve(self):
+        for prefix, viewset in self.viewsets.items():
+            for pk in (viewset.queryset.first().pk, 0, 'abc'):
+                with self.subTest(prefix=prefix, pk=pk):
+                    path = f'/api/v1/{prefix}/{pk}/'
+                    self.assertSameResponse(self.client.get(path), self.call_async(prefix, {'get': 'retrieve'}, path, pk=pk))
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class ASGIStackTests(TransactionTestCase):
+    '''
+    ASGI rejimidagi (ASYNC_VIEWS=true) so'rov get_asgi_application() orqali to'liq middleware zanjiridan o'tishini va
+    hech bir middleware sinxron oqimga moslashtirilmasligini tekshiradi. ASGIHandler har bir so'rovni alohida oqimda
+    (ThreadSensitiveContext) bajargani uchun ma'lumotlar commit qilinishi kerak, shuning uchun TransactionTestCase.
+    '''
+
+    def setUp(self):
+        cache.clear()
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+
+        for i in range(3):
+            Lessons.objects.create(title=f'Lesson {i}', course=Courses.objects.create(name=f'Course {i}'), teacher=teacher)
+
+    async def get(self, application, path):
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'query_string': b'', 'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output()
+        body = await communicator.receive_output()
+        await communicator.wait()
+
+        return start['status'], body['body']
+
+    def test_no_sync_middleware(self):
+        with patch.dict(os.environ, {'ASYNC_VIEWS': 'true'}):
+            middleware = runpy.run_path(import_module('course.settings').__file__)['MIDDLEWARE']
+
+        self.assertNotIn('whitenoise.middleware.WhiteNoiseMiddleware', middleware)
+
+        urlconf = ModuleType('async_urls')
+        urlconf.urlpatterns = [path('api/v1/', include(async_urlpatterns(router)))]
+
+        # DEBUG da Django sinxron middleware ni moslashtirganda "Asynchronous handler adapted" deb log yozadi
+        # (get_asgi_application logging ni qayta sozlagani uchun assertLogs o'rniga logger almashtiriladi)
+        with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=urlconf, DEBUG=True), \
+                patch('django.core.handlers.base.logger') as logger:
+            application = get_asgi_application()
+            status, body = async_to_sync(self.get)(application, '/api/v1/courses/')
+
+        self.assertEqual(self.adapted(logger), [])
+        self.assertEqual(status, 200)
+        self.assertEqual(body, self.client.get('/api/v1/courses/').content)
+
+        # Taqqoslash uchun: WhiteNoise bilan zanjir sinxron oqimga moslashtiriladi
+        with override_settings(MIDDLEWARE=['whitenoise.middleware.WhiteNoiseMiddleware', *middleware], DEBUG=True), \
+                patch('django.core.handlers.base.logger') as logger:
+            get_asgi_application()
+
+        self.assertEqual(self.adapted(logger), ['middleware whitenoise.middleware.WhiteNoiseMiddleware'])
+
+    def adapted(self, logger):
+        return [call.args[1] for call in logger.debug.call_args_list if 'adapted' in call.args[0]]
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THROTTLE_STORE=TEST_THROTTLE_STORE)
+class FileDeliveryTests(TestCase):
+    '''
+    LessonFile download endpointidagi Range, If-Range, ETag va X-Accel-Redirect rejimini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        lesson = Lessons.objects.create(title='Lesson', course=Courses.objects.create(name='Course'), teacher=teacher)
+        cls.lesson_file = LessonFile.objects.create(lesson=lesson, file=ContentFile(b'0123456789', name='video.mp4'))
+        cls.path = f'/api/v1/lesson-files/{cls.lesson_file.pk}/download/'
+
+    def setUp(self):
+        cache.clear()
+
+    def test_full_and_conditional(self):
+        response = self.client.get(self.path, HTTP_ACCEPT='video/mp4')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.client.get(f'{self.path}?attachment=true')['Content-Disposition'], 'attachment; filename="video.mp4"')
+
+        response = self.client.get(self.path, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        etag = self.client.get(self.path)['ETag']
+
+        for header, if_range, status, content, content_range in [
+            ('bytes=2-5', None, 206, b'2345', 'bytes 2-5/10'),
+            ('bytes=-3', None, 206, b'789', 'bytes 7-9/10'),
+            ('bytes=8-', etag, 206, b'89', 'bytes 8-9/10'),
+            ('bytes=8-', '"stale"', 200, b'0123456789', None),
+            ('bytes=20-', None, 416, b'', 'bytes */10'),
+        ]:
+            with self.subTest(range=header, if_range=if_range):
+                extra = {'HTTP_RANGE': header}
+                if if_range:
+                    extra['HTTP_IF_RANGE'] = if_range
+
+                response = self.client.get(self.path, **extra)
+
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(b''.join(response.streaming_content) if response.streaming else response.content, content)
+                self.assertEqual(response.get('Content-Range'), content_range)
+
+    def test_reupload_keeps_validators(self):
+        response = self.client.get(self.path)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        self.assertEqual(etag, f'"{hashlib.sha256(b"0123456789").hexdigest()}"')
+        os.utime(self.lesson_file.file.path, (0, 0))
+        last_modified = self.client.get(self.path)['Last-Modified']
+
+        # Bir xil fayl boshqa darsga qayta yuklanadi: blob va uning validatorlari o'zgarmaydi
+        LessonFile.objects.create(lesson=self.lesson_file.lesson, file=ContentFile(b'0123456789', name='copy.mp4'))
+
+        response = self.client.get(self.path, HTTP_RANGE='bytes=8-', HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual((response['ETag'], response['Last-Modified']), (etag, last_modified))
+
+    def test_accel_redirect(self):
+        with override_settings(FILE_DELIVERY={'MODE': 'x-accel-redirect'}):
+            response = self.client.get(self.path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.lesson_file.file.name}')
+
+    def test_not_found(self):
+        response = self.client.get('/api/v1/lesson-files/0/download/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['success'], False)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THROTTLE_STORE=TEST_THROTTLE_STORE)
+class UploadTests(TestCase):
+    '''
+    Bo'laklab yuklash: offset tekshiruvi, checksum, yakunda LessonFile yaratilishi va eskirgan yuklashlarni tozalash.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', is_staff=True)
+        cls.lesson = Lessons.objects.create(title='Lesson', course=Courses.objects.create(name='Course'), teacher=cls.admin)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create(self, length, filename='lecture.mp4'):
+        metadata = ','.join(
+            f'{key} {base64.b64encode(str(value).encode()).decode()}' for key, value in
+            {'filename': filename, 'lesson': self.lesson.pk}.items()
+        )
+        return self.client.post('/api/v1/uploads/', HTTP_UPLOAD_LENGTH=str(length), HTTP_UPLOAD_METADATA=metadata)
+
+    def patch(self, location, offset, data, checksum=None):
+        headers = {'HTTP_UPLOAD_OFFSET': str(offset)}
+        if checksum:
+            headers['HTTP_UPLOAD_CHECKSUM'] = checksum
+        return self.client.generic('PATCH', location, data, content_type='application/offset+octet-stream', **headers)
+
+    def test_resumable_upload(self):
+        response = self.create(10)
+        location = response['Location']
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Upload-Offset'], '0')
+
+        response = self.patch(location, 0, b'01234')
+        self.assertEqual((response.status_code, response['Upload-Offset']), (204, '5'))
+
+        self.assertEqual(self.patch(location, 2, b'xx').status_code, 409)
+
+        digest = base64.b64encode(hashlib.sha256(b'other').digest()).decode()
+        self.assertEqual(self.patch(location, 5, b'56789', f'sha256 {digest}').status_code, 460)
+        self.assertEqual(self.client.head(location)['Upload-Offset'], '5')
+
+        digest = base64.b64encode(hashlib.sha256(b'56789').digest()).decode()
+        response = self.patch(location, 5, b'56789', f'sha256 {digest}')
+        self.assertEqual((response.status_code, response['Upload-Offset']), (204, '10'))
+
+        upload = Upload.objects.get()
+        self.assertEqual(upload.lesson_file.lesson, self.lesson)
+        self.assertEqual(upload.lesson_file.file.read(), b'0123456789')
+        self.assertFalse(os.path.exists(part_path(upload)))
+        self.assertEqual(self.client.get(location).json()['data']['lesson_file'], upload.lesson_file.pk)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.create(100, filename='').status_code, 400)
+        self.assertEqual(self.create(100 * 1024 ** 4).status_code, 413)
+
+        location = self.create(4)['Location']
+        self.assertEqual(self.patch(location, 0, b'too long').status_code, 400)
+        self.assertEqual(self.client.head(location)['Upload-Offset'], '0')
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.patch(location, 0, b'data').status_code, 401)
+
+    def test_purge_stale_uploads(self):
+        location = self.create(10)['Location']
+        self.patch(location, 0, b'01234')
+        Upload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(purge_stale_uploads(), (1, 1, 5))
+        self.assertFalse(Upload.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THROTTLE_STORE=TEST_THROTTLE_STORE, CONTENT_STORAGE={'GRACE_PERIOD': 0})
+class ContentStorageTests(TestCase):
+    '''
+    Bir xil fayllar bitta blobda saqlanishi, havolalar bo'yicha o'chirish va dedupe_media buyrug'ini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        course = Courses.objects.create(name='Course')
+        cls.lessons = [Lessons.objects.create(title=f'Lesson {i}', course=course, teacher=teacher) for i in range(2)]
+
+    def test_deduplication_and_delete(self):
+        first, second = [
+            LessonFile.objects.create(lesson=lesson, file=ContentFile(b'slides', name='deck.pdf')) for lesson in self.lessons
+        ]
+        path = first.file.path
+
+        self.assertEqual(first.file.name, second.file.name)
+        digest = hashlib.sha256(b'slides').hexdigest()
+        self.assertEqual(first.file.name, f'lessons/{digest[:2]}/{digest[2:4]}/{digest}')
+        self.assertEqual(first.name, 'deck.pdf')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(CONTENT_STORAGE={'GRACE_PERIOD': 3600})
+    def test_grace_period(self):
+        lesson_file = LessonFile.objects.create(lesson=self.lessons[0], file=ContentFile(b'handout', name='handout.pdf'))
+        path = lesson_file.file.path
+        mtime = os.path.getmtime(path)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson_file.delete()
+
+        # Blob yaqinda saqlangan (lease yangi), shuning uchun o'chirilmaydi va uning mtime i o'zgarmaydi
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(os.path.getmtime(path), mtime)
+
+        lease = content_storage.lease_path(lesson_file.file.name)
+        os.utime(lease, (0, 0))
+        content_storage.delete(lesson_file.file.name)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(lease))
+
+    def test_dedupe_media(self):
+        media = tempfile.mkdtemp()
+        os.makedirs(os.path.join(media, 'lessons'))
+
+        for name in ('a.pdf', 'b.pdf'):
+            with open(os.path.join(media, 'lessons', name), 'wb') as file:
+                file.write(b'same content')
+
+        with override_settings(MEDIA_ROOT=media):
+            for lesson, name in zip(self.lessons, ('a.pdf', 'b.pdf')):
+                LessonFile.objects.bulk_create([LessonFile(lesson=lesson, file=f'lessons/{name}', name=name)])
+
+            stdout = StringIO()
+            call_command('dedupe_media', stdout=stdout)
+
+            names = set(LessonFile.objects.values_list('file', flat=True))
+            self.assertEqual(len(names), 1)
+            self.assertEqual(sorted(os.listdir(os.path.join(media, 'lessons'))), [hashlib.sha256(b'same content').hexdigest()[:2]])
+            self.assertIn('Reclaimed 12 bytes.', stdout.getvalue())
+            self.assertEqual(content_storage.open(names.pop()).read(), b'same content')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), API_CACHE={'ENABLED': False}, THROTTLE_STORE=TEST_THROTTLE_STORE,
+                   MEDIA_PROCESSING={'MODE': 'sync', 'SIZES': [16, 64, 4096]})
+class MediaProcessingTests(TestCase):
+    '''
+    LessonFile saqlangandan keyin metadata va kichik nusxalar yaratilishini va API da chiqishini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        course = Courses.objects.create(name='Course')
+        cls.lesson = Lessons.objects.create(title='Lesson', course=course, teacher=teacher)
+
+    def create(self, content, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson_file = LessonFile.objects.create(lesson=self.lesson, file=ContentFile(content, name=name))
+
+        lesson_file.refresh_from_db()
+        return lesson_file
+
+    @skipUnless(pillow()[0], 'Pillow is not installed')
+    def test_image_renditions(self):
+        Image, _ = pillow()
+        buffer = BytesIO()
+        Image.new('RGB', (200, 100), 'red').save(buffer, 'PNG')
+        lesson_file = self.create(buffer.getvalue(), 'diagram.png')
+
+        self.assertEqual(lesson_file.metadata['status'], 'done')
+        self.assertEqual(lesson_file.metadata['mime_type'], 'image/png')
+        self.assertEqual((lesson_file.metadata['width'], lesson_file.metadata['height']), (200, 100))
+        self.assertEqual(
+            list(lesson_file.renditions.values_list('kind', 'width', 'height', 'mime_type')),
+            [('image', 16, 8, 'image/jpeg'), ('image', 64, 32, 'image/jpeg')],
+        )
+
+        data = APIClient().get(f'/api/v1/lesson-files/{lesson_file.pk}/').json()['data']
+        self.assertEqual([rendition['width'] for rendition in data['renditions']], [16, 64])
+        self.assertTrue(data['renditions'][0]['file'].startswith('http://testserver/'))
+
+        with self.assertNumQueries(2):
+            call_command('process_media', lesson_file.pk, stdout=StringIO())
+
+    def test_plain_file_metadata(self):
+        lesson_file = self.create(b'print(1)', 'main.py')
+
+        self.assertEqual(lesson_file.metadata['status'], 'done')
+        self.assertEqual(lesson_file.metadata['size'], 8)
+        self.assertEqual(lesson_file.metadata['source'], lesson_file.file.name)
+        self.assertFalse(lesson_file.renditions.exists())
+
+        stdout = StringIO()
+        call_command('process_media', stdout=stdout)
+        self.assertIn('nothing to do', stdout.getvalue())
+
+    def test_worker_mode(self):
+        with override_settings(MEDIA_PROCESSING={'MODE': 'worker', 'SIZES': [16]}):
+            lesson_file = self.create(b'print(1)', 'main.py')
+
+            # API jarayonida hech narsa bajarilmaydi, fayl workerni kutadi
+            self.assertEqual(lesson_file.metadata, {})
+            self.assertEqual(list(pending().values_list('pk', flat=True)), [lesson_file.pk])
+
+            with patch('api.management.commands.process_media.time.sleep', side_effect=KeyboardInterrupt) as sleep:
+                with self.assertRaises(KeyboardInterrupt):
+                    call_command('process_media', '--watch', '--poll-interval', '1')
+
+            sleep.assert_called_once_with(1)
+            lesson_file.refresh_from_db()
+            self.assertEqual(lesson_file.metadata['status'], 'done')
+            self.assertFalse(pending().exists())
+
+            # Fayl almashtirilsa u yana navbatga tushadi
+            lesson_file.file = ContentFile(b'print(2)', name='main.py')
+            lesson_file.save()
+            self.assertEqual(list(pending().values_list('pk', flat=True)), [lesson_file.pk])
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class CommentThreadTests(TestCase):
+    '''
+    Izohlar yo'li (path, depth), dars va izoh daraxti endpointlari hamda javobni boshqa izohga ko'chirishni tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com')
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        course = Courses.objects.create(name='Course')
+        cls.lesson = Lessons.objects.create(title='Lesson', course=course, teacher=teacher)
+        cls.other_lesson = Lessons.objects.create(title='Other', course=course, teacher=teacher)
+
+        cls.roots = [Comments.objects.create(text=f'Root {i}', lesson=cls.lesson, author=cls.user) for i in range(3)]
+        cls.chain = [cls.roots[0]]
+
+        for i in range(4):
+            cls.chain.append(Comments.objects.create(text=f'Reply {i}', lesson=cls.lesson, reply=cls.chain[-1], author=cls.user))
+
+        Comments.objects.create(text='Elsewhere', lesson=cls.other_lesson, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_path(self):
+        self.assertEqual([comment.depth for comment in self.chain], [0, 1, 2, 3, 4])
+        self.assertEqual(self.chain[2].path, self.chain[1].subtree_path)
+        self.assertEqual(
+            set(Comments.objects.filter(path__startswith=self.chain[1].subtree_path)),
+            set(self.chain[2:]),
+        )
+
+    def test_fill_paths_breaks_reply_cycles(self):
+        fill_paths = import_module('api.migrations.0010_comments_path').fill_paths
+        first, second, third = self.chain[1:4]
+
+        # Eski serializer reply ni izohning o'ziga (yoki avlodiga) PATCH qilishga ruxsat bergan
+        Comments.objects.filter(pk=first.pk).update(reply=third)
+        Comments.objects.filter(pk=self.roots[1].pk).update(reply=self.roots[1])
+        Comments.objects.update(path='', depth=0)
+
+        fill_paths(apps, None)
+
+        rows = dict(Comments.objects.values_list('pk', 'reply_id'))
+        self.assertTrue(rows[first.pk] is None or rows[second.pk] is None or rows[third.pk] is None)
+        self.assertIsNone(rows[self.roots[1].pk])
+
+        for comment in Comments.objects.all():
+            parent = Comments.objects.filter(pk=comment.reply_id).first()
+            self.assertEqual(comment.depth, parent.depth + 1 if parent else 0)
+            self.assertEqual(comment.path, parent.subtree_path if parent else '')
+
+    def test_fill_paths_reroots_deep_chains(self):
+        fill_paths = import_module('api.migrations.0010_comments_path').fill_paths
+        comments = Comments.objects.bulk_create(
+            Comments(text=f'Deep {i}', lesson=self.other_lesson, author=self.user) for i in range(Comments.MAX_DEPTH + 5)
+        )
+
+        for parent, comment in zip(comments, comments[1:]):
+            Comments.objects.filter(pk=comment.pk).update(reply=parent)
+
+        fill_paths(apps, None)
+
+        depths = list(Comments.objects.filter(pk__in=[c.pk for c in comments]).order_by('pk').values_list('depth', 'reply_id'))
+        self.assertEqual([depth for depth, _ in depths], [*range(Comments.MAX_DEPTH + 1), *range(4)])
+        self.assertIsNone(depths[Comments.MAX_DEPTH + 1][1])
+        self.assertLessEqual(max(len(path) for path in Comments.objects.values_list('path', flat=True)), 800)
+
+    def test_max_depth(self):
+        Comments.objects.filter(pk=self.roots[1].pk).update(depth=Comments.MAX_DEPTH)
+        parent = Comments.objects.get(pk=self.roots[1].pk)
+
+        with self.assertRaises(ValidationError):
+            Comments.objects.create(text='Too deep', lesson=self.lesson, reply=parent, author=self.user)
+
+        # Ko'chirilgan izohning avlodlari ham MAX_DEPTH dan oshmasligi kerak
+        Comments.objects.filter(pk=self.roots[2].pk).update(depth=Comments.MAX_DEPTH - 3)
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(f'/api/v1/comments/{self.chain[1].pk}/', {'reply': self.roots[2].pk}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('reply', response.json()['error']['errorMsg'])
+        self.assertEqual(Comments.objects.get(pk=self.chain[1].pk).reply_id, self.chain[0].pk)
+
+    def test_lesson_thread(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/v1/lessons/{self.lesson.pk}/thread/?depth=3&count=exact')
+
+        data = response.json()['data']
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual([node['id'] for node in data], [root.pk for root in reversed(self.roots)])
+
+        node = data[-1]
+        for comment in self.chain[1:3]:
+            self.assertEqual([child['id'] for child in node['replies']], [comment.pk])
+            node = node['replies'][0]
+
+        self.assertEqual(node['replies'], [])
+        self.assertTrue(node['has_more_replies'])
+        self.assertFalse(data[0]['has_more_replies'])
+
+        response = self.client.get(f"/api/v1/comments/{node['id']}/thread/")
+        data = response.json()['data']
+
+        self.assertEqual([child['id'] for child in data], [self.chain[3].pk])
+        self.assertEqual(data[0]['replies'][0]['id'], self.chain[4].pk)
+
+    def test_move_subtree(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(f'/api/v1/comments/{self.chain[2].pk}/', {'reply': self.roots[1].pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        moved = Comments.objects.get(pk=self.chain[4].pk)
+        self.assertEqual(moved.depth, 3)
+        self.assertTrue(moved.path.startswith(self.roots[1].subtree_path))
+
+        response = self.client.patch(f'/api/v1/comments/{self.chain[2].pk}/', {'reply': self.chain[3].pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/v1/comments/', {'text': 'x', 'lesson': self.other_lesson.pk, 'reply': self.roots[0].pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THROTTLE_STORE=TEST_THROTTLE_STORE, MEDIA_PROCESSING={'MODE': None})
+class CounterTests(TestCase):
+    '''
+    Kurs va dars hisoblagichlari qo'shish, ko'chirish, o'chirishda yangilanishi va rebuild_counters ni tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        cls.courses = [Courses.objects.create(name=f'Course {i}') for i in range(2)]
+
+    def counts(self, *objects):
+        return [
+            (type(obj).objects.values_list(*(['lesson_count'] if isinstance(obj, Courses) else ['comment_count', 'file_count'])).get(pk=obj.pk))
+            for obj in objects
+        ]
+
+    def test_write_paths(self):
+        lesson = Lessons.objects.create(title='Lesson', course=self.courses[0], teacher=self.teacher)
+        root = Comments.objects.create(text='Root', lesson=lesson)
+        Comments.objects.create(text='Reply', lesson=lesson, reply=root)
+        LessonFile.objects.create(lesson=lesson, file=ContentFile(b'data', name='notes.txt'))
+
+        self.assertEqual(self.counts(self.courses[0], lesson), [(1,), (2, 1)])
+
+        lesson = Lessons.objects.get(pk=lesson.pk)
+        lesson.course = self.courses[1]
+        lesson.save()
+        lesson.save()
+        self.assertEqual(self.counts(*self.courses), [(0,), (1,)])
+
+        root.delete()
+        self.assertEqual(self.counts(lesson), [(0, 1)])
+
+        response = APIClient().get(f'/api/v1/lessons/{lesson.pk}/')
+        self.assertEqual(response.json()['data']['file_count'], 1)
+        self.assertEqual(response.json()['data']['course']['lesson_count'], 1)
+
+        lesson.delete()
+        self.assertEqual(self.counts(self.courses[1]), [(0,)])
+
+    def test_rebuild(self):
+        lesson = Lessons.objects.create(title='Lesson', course=self.courses[0], teacher=self.teacher)
+        Comments.objects.bulk_create([Comments(text=f'Comment {i}', lesson=lesson) for i in range(3)])
+        Courses.objects.filter(pk=self.courses[1].pk).update(lesson_count=5)
+
+        stdout = StringIO()
+        call_command('rebuild_counters', stdout=stdout)
+
+        self.assertEqual(self.counts(*self.courses, lesson), [(1,), (0,), (3, 0)])
+        self.assertIn('api.Lessons.comment_count: 1 checked, 1 fixed.', stdout.getvalue())
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class CachedAuthenticationTests(TestCase):
+    '''
+    CachedJWTAuthentication foydalanuvchini keshdan olishi va foydalanuvchi saqlanganda kesh yangilanishini tekshiradi.
+    '''
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='student', email='student@example.com')
+        self.header = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=self.header)
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_cache_hit(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIsNot(user, self.authenticate())
+
+    def test_invalidation(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.header)
+
+        self.assertEqual(client.post('/api/v1/courses/', {'name': 'Python'}, format='json').status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(client.post('/api/v1/courses/', {'name': 'Python'}, format='json').status_code, 201)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_logout(self):
+        refresh = RefreshToken.for_user(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        self.assertEqual(client.post(f'/auth/logout/?refresh={refresh}').status_code, 200)
+        self.assertEqual(client.post('/api/v1/comments/', {'text': 'x'}, format='json').status_code, 401)
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class TokenBlacklistTests(TestCase):
+    '''
+    Bloom filterni yangilash, filter xato "bor" deganda bazaga qaytish va logoutdan keyin tokenning darhol rad etilishini tekshiradi.
+    '''
+
+    def blacklist(self, **options):
+        blacklist = TokenBlacklist()
+
+        with override_settings(TOKEN_BLACKLIST={'REFRESH_INTERVAL': 3600, **options}):
+            blacklist.refresh(force=True)
+
+        return blacklist
+
+    def test_refresh(self):
+        blacklist = self.blacklist()
+        digest = token_digest(uuid.uuid4())
+
+        # Boshqa jarayon logout qilgan: qator bazada, lekin bu jarayonning filteri hali yangilanmagan
+        BlacklistedToken.objects.create(jti_hash=digest)
+
+        with override_settings(TOKEN_BLACKLIST={'REFRESH_INTERVAL': 3600}):
+            self.assertFalse(blacklist.contains_digest(digest))
+
+        with override_settings(TOKEN_BLACKLIST={'REFRESH_INTERVAL': 0}):
+            self.assertTrue(blacklist.contains_digest(digest))
+
+    def test_false_positive_falls_back_to_database(self):
+        blacklisted = token_digest(uuid.uuid4())
+        BlacklistedToken.objects.create(jti_hash=blacklisted)
+        blacklist = self.blacklist()
+
+        with override_settings(TOKEN_BLACKLIST={'REFRESH_INTERVAL': 3600}):
+            with self.assertNumQueries(0):
+                self.assertFalse(blacklist.contains_digest(token_digest(uuid.uuid4())))
+
+            with patch.object(BloomFilter, '__contains__', return_value=True), self.assertNumQueries(1):
+                self.assertFalse(blacklist.contains_digest(token_digest(uuid.uuid4())))
+
+            self.assertTrue(blacklist.contains_digest(blacklisted))
+
+    def test_rejected_right_after_logout(self):
+        user = User.objects.create_user(username='student', email='student@example.com')
+        refresh = RefreshToken.for_user(user)
+        access = str(refresh.access_token)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        token_blacklist.refresh(force=True)
+
+        with override_settings(TOKEN_BLACKLIST={'REFRESH_INTERVAL': 3600}):
+            self.assertEqual(client.post(f'/auth/logout/?refresh={refresh}').status_code, 200)
+            self.assertTrue(token_blacklist.contains(access))
+            self.assertEqual(client.post('/api/v1/comments/', {'text': 'x'}, format='json').status_code, 401)
+
+
+class PurgeExpiredTokensTests(TestCase):
+    '''
+    purge_expired_tokens buyrug'i muddati tugagan qatorlarni bo'laklab o'chirishi va amaldagilarini qoldirishini tekshiradi.
+    '''
+
+    def test_purge(self):
+        now = timezone.now()
+        user = User.objects.create_user(username='student', email='student@example.com')
+
+        BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(jti_hash=token_digest(uuid.uuid4()), expires_at=now - timedelta(minutes=i + 1)) for i in range(5)
+        ])
+        live = BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(jti_hash=token_digest(uuid.uuid4()), expires_at=now + timedelta(minutes=5)),
+            BlacklistedToken(jti_hash=token_digest(uuid.uuid4())),
+        ])
+        # expires_at siz eski qator: blacklisted_at + ACCESS_TOKEN_LIFETIME o'tgan
+        legacy = BlacklistedToken.objects.create(jti_hash=token_digest(uuid.uuid4()))
+        BlacklistedToken.objects.filter(pk=legacy.pk).update(blacklisted_at=now - timedelta(days=1))
+
+        outstanding = [
+            OutstandingToken.objects.create(user=user, jti=uuid.uuid4().hex, token=f'token-{i}', expires_at=now + timedelta(days=i * 2 - 1))
+            for i in range(2)
+        ]
+        SimpleJWTBlacklistedToken.objects.create(token=outstanding[0])
+
+        stdout = StringIO()
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_expired_tokens', '--batch-size', '2', stdout=stdout)
+
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE FROM "api_blacklistedtoken"')]
+        self.assertEqual(len(deletes), 3)
+
+        self.assertEqual(set(BlacklistedToken.objects.values_list('pk', flat=True)), {token.pk for token in live})
+        self.assertEqual(list(OutstandingToken.objects.all()), outstanding[1:])
+        self.assertFalse(SimpleJWTBlacklistedToken.objects.exists())
+        # 5 + legacy + 1 OutstandingToken + unga bog'langan 1 BlacklistedToken (CASCADE)
+        self.assertIn('8 rows removed', stdout.getvalue())
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE)
+class RendererTests(TestCase):
+    '''
+    Konvert render paytida bir marta qo'shilishini va ORJSONRenderer natijasi JSONRenderer bilan bir xilligini tekshiradi.
+    '''
+
+    def render(self, renderer, data, **kwargs):
+        return renderer.render(data, renderer_context={'response': EnvelopeResponse(data, **kwargs)})
+
+    def test_envelope(self):
+        content = self.render(ORJSONRenderer(), [1], meta={'count': 1, 'next': None, 'previous': None})
+
+        self.assertEqual(content, b'{"data":[1],"count":1,"next":null,"previous":null,"error":null,"success":true}')
+        self.assertEqual(self.render(ORJSONRenderer(), {'errorMsg': 'x'}, status=400),
+                         b'{"data":null,"error":{"errorMsg":"x"},"success":false}')
+        self.assertEqual(self.render(ORJSONRenderer(), None, status=204), b'')
+
+    def test_native_types(self):
+        data = {
+            'created_at': timezone.now().replace(microsecond=0),
+            'price': decimal.Decimal('9.50'),
+            'id': uuid.UUID(int=1),
+            'text': 'satr\u2028',
+            1: 'key',
+        }
+
+        self.assertEqual(self.render(ORJSONRenderer(), data), self.render(EnvelopeJSONRenderer(), data))
+
+    def test_api_responses(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        response = client.post('/api/v1/courses/', {'name': 'Python'}, format='json')
+        self.assertEqual(response.json()['name'], 'Python')
+        self.assertNotIn('success', response.json())
+
+        response = client.get(f"/api/v1/courses/{response.json()['id']}/")
+        self.assertEqual(response.json()['data']['name'], 'Python')
+
+        response = client.post('/api/v1/courses/', {'name': 'Python'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['errorId'], 400)
+
+    def test_token_responses(self):
+        User.objects.create_user(username='member', email='member@example.com', password='secret-password')
+        client = APIClient()
+
+        response = client.post('/auth/login/', {'username': 'member', 'password': 'secret-password'}, format='json')
+        self.assertEqual(set(response.json()), {'access', 'refresh'})
+
+        response = client.post('/auth/login/token/verify/', {'token': response.json()['access']}, format='json')
+        self.assertEqual(response.json(), {})
+
+        response = client.post('/auth/login/', {'username': 'member', 'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['success'], False)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), API_CACHE={'ENABLED': False}, THROTTLE_STORE=TEST_THROTTLE_STORE)
+class FieldsetTests(TestCase):
+    '''
+    ?fields= va ?expand= javobni va SQL so'rovni (JOIN, ustunlar) so'ralgan ko'rinishga moslashini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        cls.course = Courses.objects.create(name='Python')
+        cls.lesson = Lessons.objects.create(title='Intro', description='Lorem ipsum', course=cls.course, teacher=cls.teacher)
+        cls.file = LessonFile.objects.create(lesson=cls.lesson, file=ContentFile(b'data', name='intro.txt'))
+        cls.comment = Comments.objects.create(text='Hello', lesson=cls.lesson, author=None)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['data']
+
+    def test_sparse_fields(self):
+        with self.assertNumQueries(1) as queries:
+            data = self.get(f'/api/v1/comments/{self.comment.pk}/?fields=id,text,lesson.title,lesson.course&expand=')
+
+        self.assertEqual(data, {'id': self.comment.pk, 'text': 'Hello', 'lesson': {'title': 'Intro', 'course': self.course.pk}})
+
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('description', sql)
+        self.assertNotIn('auth_user', sql)
+        self.assertNotIn('api_courses', sql)
+
+    def test_expand(self):
+        data = self.get(f'/api/v1/lessons/{self.lesson.pk}/?expand=')
+        self.assertEqual((data['course'], data['teacher']), (self.course.pk, self.teacher.pk))
+
+        data = self.get(f'/api/v1/comments/{self.comment.pk}/?expand=lesson.course,author')
+        self.assertEqual(data['lesson']['course']['name'], 'Python')
+        self.assertEqual(data['lesson']['teacher'], self.teacher.pk)
+        self.assertEqual(data['author'], {'first_name': '', 'last_name': ''})
+
+        # ?expand= berilmasa fields dagi nested maydonlar avvalgidek to'liq ochiladi
+        data = self.get(f'/api/v1/comments/{self.comment.pk}/?fields=lesson')
+        self.assertEqual(data['lesson']['course']['name'], 'Python')
+
+        # Parametrlarsiz javob avvalgidek to'liq
+        data = self.get(f'/api/v1/lesson-files/{self.file.pk}/')
+        self.assertEqual(data['lesson']['teacher']['username'], 'teacher')
+
+    def test_list_queries(self):
+        with self.assertNumQueries(2):
+            data = self.get('/api/v1/lesson-files/?fields=id,name,lesson&expand=')
+
+        self.assertEqual(data, [{'id': self.file.pk, 'name': 'intro.txt', 'lesson': self.lesson.pk}])
+
+        with self.assertNumQueries(1):
+            data = self.get('/api/v1/comments/?fields=id,text&count=none')
+
+        self.assertEqual(data, [{'id': self.comment.pk, 'text': 'Hello'}])
+
+    def test_unknown_fields(self):
+        for query in ('fields=id,missing', 'fields=lesson.missing', 'expand=text', 'expand=lesson.missing'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/v1/comments/?{query}')
+                self.assertEqual(response.status_code, 400)
+
+    def test_write_response(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', is_staff=True)
+        self.client.force_authenticate(admin)
+
+        response = self.client.patch(f'/api/v1/lessons/{self.lesson.pk}/?fields=id,title', {'title': 'Basics'}, format='json')
+
+        self.assertEqual(response.json(), {'id': self.lesson.pk, 'title': 'Basics'})
+        self.assertEqual(Lessons.objects.get(pk=self.lesson.pk).description, 'Lorem ipsum')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THROTTLE_STORE=TEST_THROTTLE_STORE, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class BulkWriteTests(TestCase):
+    '''
+    /bulk/ endpointlari: bitta tranzaksiyada yozish, har bir element uchun xatoliklar, hisoblagichlar, izoh yo'llari
+    va partiya uchun bitta xabarnoma.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(username='admin', email='admin@example.com', is_staff=True)
+        cls.courses = [Courses.objects.create(name=f'Course {i}') for i in range(2)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def lessons(self, count, course=None):
+        return [{'title': f'Lesson {i}', 'course': (course or self.courses[0]).pk} for i in range(count)]
+
+    def test_create(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post('/api/v1/lessons/bulk/', self.lessons(3), format='json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        data = response.json()
+        self.assertEqual([lesson['title'] for lesson in data], ['Lesson 0', 'Lesson 1', 'Lesson 2'])
+        self.assertEqual(data[0]['teacher']['username'], 'admin')
+        self.assertEqual(Courses.objects.get(pk=self.courses[0].pk).lesson_count, 3)
+
+        notification = LessonNotification.objects.get()
+        self.assertEqual(notification.lessons.count(), 3)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post('/api/v1/lessons/bulk/', self.lessons(30, self.courses[1]), format='json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        # So'rovlar soni elementlar soniga bog'liq emas (birinchi so'rovda ModelVersion qatorlari ham yaratiladi)
+        self.assertLessEqual(len(large), len(small))
+
+        # Birinchi partiyadagi uchta dars bitta xatda
+        process_next()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].alternatives[0][0].count('Title: Lesson'), 3)
+
+    def test_errors(self):
+        items = [*self.lessons(2), {'title': 'Lesson 1', 'course': self.courses[0].pk}, {'title': 'Other', 'course': 0}]
+        response = self.client.post('/api/v1/lessons/bulk/', items, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['error']['errorMsg']
+        self.assertEqual([bool(error) for error in errors], [False, False, False, True])
+        self.assertIn('course', errors[3])
+
+        response = self.client.post('/api/v1/lessons/bulk/', items[:3], format='json')
+        errors = response.json()['error']['errorMsg']
+        self.assertEqual([bool(error) for error in errors], [False, False, True])
+        self.assertFalse(Lessons.objects.exists())
+
+        response = self.client.post('/api/v1/lessons/bulk/', self.lessons(3), format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.post('/api/v1/lessons/bulk/', self.lessons(1), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Lessons.objects.count(), 3)
+
+        with override_settings(BULK_WRITE={'MAX_ITEMS': 2}):
+            response = self.client.post('/api/v1/lessons/bulk/', self.lessons(3, self.courses[1]), format='json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_comments(self):
+        lesson = Lessons.objects.create(title='Intro', course=self.courses[0], teacher=self.admin)
+        root = Comments.objects.create(text='Root', lesson=lesson)
+        child = Comments.objects.create(text='Child', lesson=lesson, reply=root)
+        Comments.objects.create(text='Grandchild', lesson=lesson, reply=child)
+
+        response = self.client.post('/api/v1/comments/bulk/', [
+            {'text': 'First answer', 'lesson': lesson.pk, 'reply': root.pk},
+            {'text': 'Second root', 'lesson': lesson.pk},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201, response.content)
+        first, second = Comments.objects.filter(pk__in=[item['id'] for item in response.json()]).order_by('pk')
+        self.assertEqual((first.path, first.depth, first.author), (root.subtree_path, 1, self.admin))
+        self.assertEqual((second.path, second.depth), ('', 0))
+        self.assertEqual(Lessons.objects.get(pk=lesson.pk).comment_count, 5)
+
+        response = self.client.get('/api/v1/comments/?search=answer')
+        self.assertEqual([item['id'] for item in response.json()['data']], [first.pk])
+
+        # child ni avlodlari bilan second ostiga ko'chirish
+        response = self.client.patch('/api/v1/comments/bulk/', [
+            {'id': child.pk, 'reply': second.pk},
+            {'id': first.pk, 'text': 'Edited answer'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()[1]['text'], 'Edited answer')
+        self.assertEqual(
+            list(Comments.objects.filter(path__startswith=second.subtree_path).values_list('text', 'depth').order_by('depth')),
+            [('Child', 1), ('Grandchild', 2)],
+        )
+
+    def test_update_and_delete(self):
+        response = self.client.post('/api/v1/lessons/bulk/', self.lessons(3), format='json')
+        ids = [lesson['id'] for lesson in response.json()]
+        updated_at = Lessons.objects.get(pk=ids[0]).updated_at
+
+        response = self.client.patch('/api/v1/lessons/bulk/', [
+            {'id': ids[0], 'course': self.courses[1].pk},
+            {'id': str(ids[1]), 'title': 'Renamed'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(list(Courses.objects.order_by('pk').values_list('lesson_count', flat=True)), [2, 1])
+        self.assertEqual(Lessons.objects.get(pk=ids[1]).title, 'Renamed')
+        self.assertGreater(Lessons.objects.get(pk=ids[0]).updated_at, updated_at)
+
+        response = self.client.patch('/api/v1/lessons/bulk/', [{'id': ids[2]}, {'id': 0}, {'id': ids[2]}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([bool(error) for error in response.json()['error']['errorMsg']], [False, True, True])
+
+        response = self.client.delete('/api/v1/lessons/bulk/', [ids[0], 0], format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.delete('/api/v1/lessons/bulk/', ids[:2], format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(Courses.objects.order_by('pk').values_list('lesson_count', flat=True)), [1, 0])
+
+    def test_destroy_query_count(self):
+        def delete(count):
+            lessons = Lessons.objects.bulk_create([
+                Lessons(title=f'Lesson {i}', course=self.courses[i % 2], teacher=self.admin) for i in range(count)
+            ])
+            Comments.objects.bulk_create([Comments(text='Comment', lesson=lesson, author=self.admin) for lesson in lessons])
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete('/api/v1/lessons/bulk/', [lesson.pk for lesson in lessons], format='json')
+
+            self.assertEqual(response.status_code, 204)
+            return len(queries)
+
+        Courses.objects.update(lesson_count=20)
+
+        # Hisoblagichlar har bir ota qator uchun emas, bir xil o'zgarishlar bo'yicha bitta UPDATE bilan kamayadi
+        self.assertEqual(delete(4), delete(30))
+        self.assertEqual(list(Courses.objects.order_by('pk').values_list('lesson_count', flat=True)), [3, 3])
+        self.assertFalse(Comments.objects.exists())
+
+    def test_permissions(self):
+        self.assertEqual(self.client.post('/api/v1/lesson-files/bulk/', [], format='json').status_code, 405)
+
+        self.client.force_authenticate(User.objects.create_user(username='student', email='student@example.com'))
+        self.assertEqual(self.client.post('/api/v1/lessons/bulk/', self.lessons(1), format='json').status_code, 403)
+
+
+@override_settings(THROTTLE_STORE=TEST_THROTTLE_STORE, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class NotificationOutboxTests(TestCase):
+    '''
+    send_notifications workeri: lease bilan band qilish, last_user_id dan davom ettirish va xatolikdan keyin qayta urinish.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com') for i in range(5)]
+        User.objects.create_user(username='no-email')
+        cls.lesson = Lessons.objects.create(title='Intro', course=Courses.objects.create(name='Python'), teacher=cls.users[0])
+
+    def setUp(self):
+        self.notification = LessonNotification.objects.get()
+
+    def expire(self):
+        LessonNotification.objects.filter(pk=self.notification.pk).update(next_attempt_at=timezone.now())
+
+    def test_claim_lease(self):
+        before = timezone.now()
+        notification = claim_notification(lease=300)
+
+        self.assertEqual(notification.pk, self.notification.pk)
+        self.assertEqual(notification.status, LessonNotification.PROCESSING)
+        self.assertGreaterEqual(notification.next_attempt_at, before + timedelta(seconds=300))
+
+        # Lease tugamaguncha boshqa worker uni ololmaydi, tugagach esa qayta olinadi
+        self.assertIsNone(claim_notification(lease=300))
+        self.assertFalse(process_next())
+
+        self.expire()
+        self.assertEqual(claim_notification(lease=300).pk, self.notification.pk)
+
+    def test_resume_from_last_user_id(self):
+        send_messages = locmem.EmailBackend.send_messages
+        calls = []
+
+        def flaky(backend, messages):
+            calls.append([message.to[0] for message in messages])
+
+            if len(calls) == 2:
+                raise SMTPException("Connection lost.")
+
+            return send_messages(backend, messages)
+
+        with patch.object(locmem.EmailBackend, 'send_messages', flaky), self.assertLogs('api.notifications', 'ERROR'):
+            self.assertTrue(process_next(chunk_size=2))
+
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.last_user_id, self.users[1].pk)
+        self.assertEqual(self.notification.status, LessonNotification.PENDING)
+        self.assertEqual(self.notification.attempts, 1)
+        self.assertEqual(self.notification.error, "Connection lost.")
+        self.assertEqual(len(mail.outbox), 2)
+
+        self.expire()
+        self.assertTrue(process_next(chunk_size=2))
+
+        # Birinchi bo'lakdagilar qayta xat olmaydi, email manzili yo'q foydalanuvchi o'tkazib yuboriladi
+        self.assertEqual([message.to[0] for message in mail.outbox], [user.email for user in self.users])
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, LessonNotification.SENT)
+        self.assertEqual(self.notification.last_user_id, self.users[-1].pk)
+        self.assertEqual(self.notification.error, '')
+
+    def test_deleted_lessons(self):
+        batch = [Lessons.objects.create(title=f'Batch {i}', course=self.lesson.course, teacher=self.users[0]) for i in range(3)]
+        LessonNotification.objects.exclude(pk=self.notification.pk).delete()
+        notification = LessonNotification.objects.create(lesson=batch[0])
+        notification.lessons.set(batch)
+
+        # Partiyaning birinchi darsi o'chirilsa xabarnoma qoladi, yakka xabarnoma esa darsi bilan yuborilmaydi
+        batch[0].delete()
+        self.lesson.delete()
+        notification.refresh_from_db()
+        self.assertIsNone(notification.lesson_id)
+
+        while process_next():
+            pass
+
+        self.assertFalse(LessonNotification.objects.filter(pk=self.notification.pk).exists())
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, LessonNotification.SENT)
+        self.assertEqual(len(mail.outbox), len(self.users))
+
+        html = mail.outbox[0].alternatives[0][0]
+        self.assertNotIn('Batch 0', html)
+        self.assertIn('Batch 1', html)
+        self.assertIn('Batch 2', html)
+
+    def test_retry_backoff(self):
+        delays = []
+
+        with patch.object(locmem.EmailBackend, 'send_messages', side_effect=SMTPException("Connection refused.")):
+            for _ in range(3):
+                before = timezone.now()
+
+                with self.assertLogs('api.notifications', 'ERROR'):
+                    self.assertTrue(process_next(max_attempts=3, retry_delay=60))
+
+                self.notification.refresh_from_db()
+
+                if self.notification.status == LessonNotification.PENDING:
+                    delays.append((self.notification.next_attempt_at - before).total_seconds())
+                    # Kechiktirish tugamaguncha qayta urinilmaydi
+                    self.assertFalse(process_next())
+                    self.expire()
+
+        self.assertEqual([round(delay, -1) for delay in delays], [60, 120])
+        self.assertEqual(self.notification.status, LessonNotification.FAILED)
+        self.assertEqual(self.notification.attempts, 3)
+        self.assertFalse(process_next())
+        self.assertEqual(mail.outbox, [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), THROTTLE_STORE=TEST_THROTTLE_STORE)
+class BenchmarkCommandTests(TestCase):
+    '''
+    seed_data izchil ma'lumot yaratishini va benchmark_api barcha endpointlarni kutilgan status bilan qamrab olishini tekshiradi.
+    '''
+
+    def test_seed_data(self):
+        stdout = StringIO()
+        call_command(
+            'seed_data', users=5, teachers=2, courses=2, lessons_per_course=3, comments_per_lesson=6,
+            files_per_lesson=1, reactions_per_lesson=4, json=True, stdout=stdout,
+        )
+        result = json.loads(stdout.getvalue())
+
+        self.assertEqual((result['lessons'], result['comments'], result['files']), (6, 36, 6))
+        self.assertEqual(list(Courses.objects.values_list('lesson_count', flat=True)), [3, 3])
+
+        for lesson in Lessons.objects.all():
+            self.assertEqual((lesson.comment_count, lesson.file_count, lesson.like + lesson.dislike), (6, 1, 4))
+
+        for comment in Comments.objects.filter(reply__isnull=False).select_related('reply'):
+            self.assertEqual((comment.path, comment.depth), (comment.reply.subtree_path, comment.reply.depth + 1))
+
+    def test_benchmark_api(self):
+        call_command('seed_data', users=3, courses=1, lessons_per_course=2, stdout=StringIO())
+
+        stdout = StringIO()
+        call_command('benchmark_api', iterations=1, warmup=0, slow_iterations=1, bulk_size=2, json=True, stdout=stdout)
+        output = json.loads(stdout.getvalue())
+
+        self.assertEqual(output['uncovered'], [])
+        self.assertIn('auth:logout', output['results'])
+        self.assertTrue(all(result['errors'] == 0 for result in output['results'].values()))
+        self.assertEqual(output['meta']['dataset']['api.lessons'], Lessons.objects.count())
+
+
+@override_settings(API_CACHE={'ENABLED': False}, THROTTLE_STORE=TEST_THROTTLE_STORE)
+class ProfilingTests(TestCase):
+    '''
+    ProfilingMiddleware tanlangan so'rovlarga Server-Timing qo'shishini va chegaradan oshgan so'rovlarni log qilishini tekshiradi.
+    '''
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create_user(username='teacher', email='teacher@example.com')
+        course = Courses.objects.create(name='Python')
+        Lessons.objects.bulk_create([Lessons(title=f'Lesson {i}', course=course, teacher=teacher) for i in range(3)])
+
+    def test_not_sampled(self):
+        with override_settings(PROFILING={'ENABLED': True, 'SAMPLE_RATE': 0}):
+            response = self.client.get('/api/v1/lessons/')
+
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_server_timing(self):
+        with override_settings(PROFILING={'ENABLED': True, 'SAMPLE_RATE': 1}):
+            response = self.client.get('/api/v1/lessons/')
+
+        metrics = {metric.split(';')[0]: metric for metric in response['Server-Timing'].split(', ')}
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('2 queries', metrics['db'])
+        self.assertLessEqual({'total', 'throttle', 'serialize', 'render'}, set(metrics))
+        self.assertFalse(any(connection.execute_wrappers for connection in connections.all()))
+
+    def test_slow_request_log(self):
+        with override_settings(PROFILING={'ENABLED': True, 'SAMPLE_RATE': 1, 'SLOW_QUERY_COUNT': 1}), \
+                self.assertLogs('api.profiling', 'WARNING') as logs:
+            self.client.get('/api/v1/lessons/')
+
+        record = logs.records[0].profile
+        self.assertEqual(record['reasons'], ['queries'])
+        self.assertEqual((record['path'], record['queries']), ('/api/v1/lessons/', 2))
+        self.assertTrue(all('SELECT' in query['sql'] for query in record['slowest']))
+
+    def test_slow_request_not_sampled(self):
+        options = {'ENABLED': True, 'SAMPLE_RATE': 0, 'SLOW_REQUEST_MS': 0, 'SLOW_QUERY_COUNT': 0}
+
+        with override_settings(PROFILING=options), self.assertLogs('api.profiling', 'WARNING') as logs:
+            response = self.client.get('/api/v1/lessons/')
+
+        # Tanlanmagan so'rov ham vaqti bo'yicha yoziladi, lekin SQL lari yig'ilmaydi
+        record = logs.records[0].profile
+        self.assertEqual(record['reasons'], ['duration'])
+        self.assertEqual((record['path'], record['status'], record['sampled']), ('/api/v1/lessons/', 200, False))
+        self.assertNotIn('queries', record)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_context_reset(self):
+        outer = Profile()
+        token = current_profile.set(outer)
+
+        try:
+            with override_settings(PROFILING={'ENABLED': True, 'SAMPLE_RATE': 1}):
+                self.client.get('/api/v1/lessons/')
+
+            self.assertIs(current_profile.get(), outer)
+        finally:
+            current_profile.reset(token)
+
+        self.assertIsNone(current_profile.get())
+
+    def test_async(self):
+        async def view(request):
+            with timing('render'):
+                return HttpResponse(str(current_profile.get() is not None))
+
+        middleware = ProfilingMiddleware(view)
+
+        with override_settings(PROFILING={'ENABLED': True, 'SAMPLE_RATE': 1}):
+            response = async_to_sync(middleware)(AsyncRequestFactory().get('/'))
+
+        self.assertEqual(response.content, b'True')
+        self.assertIn('render;dur=', response['Server-Timing'])
+        self.assertIsNone(current_profile.get())
+
+    def test_repeated_queries(self):
+        profile = Profile()
+        profile.queries = [('SELECT %s', (1,), 0.001), ('SELECT %s', (1,), 0.001), ('SELECT %s', (2,), 0.001), ('SELECT 1', (), 0.001)]
+
+        self.assertEqual(profile.repeated_queries(), [{'sql': 'SELECT %s', 'count': 3, 'duplicates': 1, 'ms': 3.0}])
@@ -0,0 +1,73 @@
+from django.db.models import Exists, OuterRef
+
+from .models import Comments, path_segment
+from .pagination import ThreadPagination
+from .serializers import CommentThreadSerializer
+
+
+def with_replies(queryset):
+    return queryset.select_related('author').annotate(
+        has_replies=Exists(Comments.objects.filter(reply=OuterRef('pk')))
+    )
+
+
+def subtrees(page, prefix, last_depth):
+    '''
+    subtrees - sahifadagi izohlarning last_depth darajasigacha bo'lgan barcha avlodlarini bitta so'rov bilan oladi.
+
+    Sahifadagi izohlar bir xil prefix ga ega va ularning avlodlari yo'li prefix + path_segment(id) bilan boshlanadi,
+    shuning uchun ular [eng kichik id, eng katta id] yo'l oralig'ida joylashadi (path indeksi bo'yicha range scan).
+    Oraliqqa tushgan, lekin sahifaga kirmagan izohlarning avlodlari build_tree da tashlab yuboriladi.
+    '''
+
+    if not page or page[0].depth >= last_depth:
+        return Comments.objects.none()
+
+    pks = [comment.pk for comment in page]
+
+    return with_replies(Comments.objects.filter(
+        lesson_id=page[0].lesson_id,
+        depth__lte=last_depth,
+        path__gte=prefix + path_segment(min(pks)),
+        path__lt=prefix + path_segment(max(pks)) + '~',
+    )).order_by('depth', 'created_at', 'pk')
+
+
+def build_tree(page, descendants, last_depth, context=None):
+    '''
+    build_tree - sahifa va uning avlodlaridan ichma-ich {..., replies: [...], has_more_replies} ro'yxatini tuzadi.
+    '''
+
+    nodes = {}
+    roots = []
+
+    for comment, data in zip(page, CommentThreadSerializer(page, many=True, context=context).data):
+        nodes[comment.pk] = {**data, 'replies': [], 'has_more_replies': comment.has_replies and comment.depth >= last_depth}
+        roots.append(nodes[comment.pk])
+
+    descendants = list(descendants)
+
+    for comment, data in zip(descendants, CommentThreadSerializer(descendants, many=True, context=context).data):
+        parent = nodes.get(comment.reply_id)
+
+        if parent is None:
+            continue
+
+        nodes[comment.pk] = {**data, 'replies': [], 'has_more_replies': comment.has_replies and comment.depth >= last_depth}
+        parent['replies'].append(nodes[comment.pk])
+
+    return roots
+
+
+def thread_response(request, queryset, prefix, context=None):
+    '''
+    thread_response - queryset dagi bir darajali izohlarni sahifalaydi va har biriga ?depth= darajagacha javoblarini qo'shadi.
+    Sahifa va uning barcha javoblari ikki so'rov bilan olinadi, javob sahifa hajmiga bog'liq bo'lmagan sondagi so'rovlardan iborat.
+    '''
+
+    paginator = ThreadPagination()
+    depth = paginator.get_depth(request)
+    page = paginator.paginate_queryset(with_replies(queryset), request)
+    last_depth = page[0].depth + depth - 1 if page else 0
+
+    return paginator.get_paginated_response(build_tree(page, subtrees(page, prefix, last_depth), last_depth, context))
@@ -0,0 +1,203 @@
+import math
+import random
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import ScopedRateThrottle
+
+from .profiling import timing
+
+
+def sliding_window(previous, current, elapsed, window, limit):
+    '''
+    sliding_window - sliding window counter algoritmi. Oldingi oynadagi so'rovlar qolgan vaqt ulushiga
+    ko'paytirilib joriy oyna bilan qo'shiladi. (ruxsat, kutish soniyalari) qaytariladi.
+    '''
+
+    weight = (window - elapsed) / window
+
+    if previous * weight + current + 1 <= limit:
+        return True, 0
+
+    if current + 1 > limit or not previous:
+        return False, window - elapsed
+
+    return False, max(0, window - elapsed - (limit - 1 - current) * window / previous)
+
+
+class CacheThrottleStore:
+    '''
+    CacheThrottleStore - hisoblagichlarni Django keshida (Redis, Memcached) saqlaydi.
+    Barcha jarayon va serverlar bitta keshdan foydalansa, limitlar klaster bo'yicha umumiy bo'ladi. LocMemCache
+    kabi jarayon ichidagi keshda esa limit har bir worker uchun alohida hisoblanadi.
+
+    Joriy oyna hisoblagichi avval atomar incr bilan oshiriladi va qaror qaytgan qiymat bo'yicha qabul qilinadi, shuning
+    uchun parallel so'rovlar limitdan oshib keta olmaydi. Rad etilgan so'rov hisoblagichdan qaytarib ayiriladi.
+    Har bir so'rov uchun 1 ta get va 2-3 ta incr/decr amali bajariladi.
+    '''
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def _incr(self, key, timeout=None):
+        self.cache.add(key, 0, timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Kalit add va incr orasida muddati tugab o'chib ketgan
+            self.cache.set(key, 1, timeout)
+            return 1
+
+    def hit(self, key, scope, window, limit, now):
+        number, elapsed = divmod(now, window)
+        current_key = f'{key}:{int(number)}'
+        previous_key = f'{key}:{int(number) - 1}'
+
+        current = self._incr(current_key, math.ceil(2 * window))
+        previous = self.cache.get(previous_key, 0)
+        allowed, wait = sliding_window(previous, current - 1, elapsed, window, limit)
+
+        if not allowed:
+            try:
+                self.cache.decr(current_key)
+            except ValueError:
+                pass
+
+        self._incr(f'throttle_stats:{scope}:{"hit" if allowed else "reject"}')
+
+        return allowed, wait
+
+    def stats(self, scopes):
+        keys = [f'throttle_stats:{scope}:{kind}' for scope in scopes for kind in ('hit', 'reject')]
+        values = self.cache.get_many(keys)
+
+        return {
+            scope: {kind: values.get(f'throttle_stats:{scope}:{kind}', 0) for kind in ('hit', 'reject')}
+            for scope in scopes
+        }
+
+
+class SQLiteThrottleStore:
+    '''
+    SQLiteThrottleStore - hisoblagichlarni fayldagi SQLite bazasida saqlaydi (lokal ishlab chiqish va bitta server uchun).
+    Bitta serverdagi barcha workerlar bitta faylni ishlatadi. Har bir so'rov bitta BEGIN IMMEDIATE tranzaksiyasida bajariladi.
+    Fayl har bir serverda alohida, shuning uchun bir nechta serverda limit klaster bo'yicha emas, har bir server
+    uchun alohida qo'llanadi (N ta server - N barobar ko'p so'rov).
+    '''
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS throttle (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires REAL)'
+        )
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+
+        return connection
+
+    def hit(self, key, scope, window, limit, now):
+        number, elapsed = divmod(now, window)
+        current_key = f'{key}:{int(number)}'
+        previous_key = f'{key}:{int(number) - 1}'
+
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+
+        try:
+            values = dict(connection.execute(
+                'SELECT key, value FROM throttle WHERE key IN (?, ?) AND (expires IS NULL OR expires > ?)',
+                (previous_key, current_key, now),
+            ).fetchall())
+            allowed, wait = sliding_window(values.get(previous_key, 0), values.get(current_key, 0), elapsed, window, limit)
+
+            upsert = (
+                'INSERT INTO throttle (key, value, expires) VALUES (?, 1, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = value + 1, expires = excluded.expires'
+            )
+
+            if allowed:
+                connection.execute(upsert, (current_key, now + 2 * window))
+            connection.execute(upsert, (f'throttle_stats:{scope}:{"hit" if allowed else "reject"}', None))
+
+            # Muddati o'tgan hisoblagichlar taxminan har 100 so'rovda bir marta o'chiriladi
+            if random.random() < 0.01:
+                connection.execute('DELETE FROM throttle WHERE expires < ?', (now,))
+
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+        return allowed, wait
+
+    def stats(self, scopes):
+        keys = [f'throttle_stats:{scope}:{kind}' for scope in scopes for kind in ('hit', 'reject')]
+        rows = dict(self._connection().execute(
+            f'SELECT key, value FROM throttle WHERE key IN ({", ".join("?" * len(keys))})', keys
+        ).fetchall())
+
+        return {
+            scope: {kind: rows.get(f'throttle_stats:{scope}:{kind}', 0) for kind in ('hit', 'reject')}
+            for scope in scopes
+        }
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    config = getattr(settings, 'THROTTLE_STORE', {'BACKEND': 'api.throttling.CacheThrottleStore'})
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+@receiver(setting_changed)
+def reset_store(setting, **kwargs):
+    if setting == 'THROTTLE_STORE':
+        get_store.cache_clear()
+
+
+class SharedScopedRateThrottle(ScopedRateThrottle):
+    '''
+    SharedScopedRateThrottle - ScopedRateThrottle bilan bir xil scope va rate larni (DEFAULT_THROTTLE_RATES) ishlatadi.
+
+    DRF dagi har bir kalit uchun vaqtlar ro'yxatini saqlash o'rniga O(1) sliding window counter algoritmi ishlatiladi
+    va hisoblagichlar THROTTLE_STORE dagi umumiy omborda saqlanadi, shuning uchun limit workerlar soniga bog'liq emas.
+    Har bir scope uchun o'tkazilgan (hit) va rad etilgan (reject) so'rovlar soni ham yig'iladi.
+    '''
+
+    timer = time.time
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+
+        if self.key is None:
+            return True
+
+        with timing('throttle'):
+            allowed, self.wait_seconds = get_store().hit(self.key, self.scope, self.duration, self.num_requests, self.timer())
+
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
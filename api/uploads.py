@@ -0,0 +1,304 @@
+import base64
+import binascii
+import fcntl
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import exceptions, status
+
+from .models import LessonFile, Lessons, Upload
+
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = 'creation,checksum,termination,expiration'
+
+CHECKSUM_ALGORITHMS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+}
+
+
+class UploadConflict(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Upload-Offset does not match the current offset."
+    default_code = 'upload_conflict'
+
+
+class UploadLocked(exceptions.APIException):
+    status_code = status.HTTP_423_LOCKED
+    default_detail = "Another request is writing to this upload."
+    default_code = 'upload_locked'
+
+
+class UploadTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Upload-Length exceeds the maximum upload size."
+    default_code = 'upload_too_large'
+
+
+class ChecksumMismatch(exceptions.APIException):
+    # tus checksum kengaytmasidagi "460 Checksum Mismatch"
+    status_code = 460
+    default_detail = "Upload-Checksum does not match the received chunk."
+    default_code = 'checksum_mismatch'
+
+
+def get_options():
+    return {
+        'TEMP_DIR': None,
+        'MAX_SIZE': 10 * 1024 ** 3,
+        'CHUNK_SIZE': 1024 * 1024,
+        'EXPIRE_AFTER': 24 * 3600,
+        **getattr(settings, 'UPLOADS', {}),
+    }
+
+
+def temp_dir():
+    return str(get_options()['TEMP_DIR'] or os.path.join(settings.MEDIA_ROOT, 'uploads'))
+
+
+def part_path(upload):
+    return os.path.join(temp_dir(), f'{upload.pk}.part')
+
+
+def expires_at(upload):
+    return upload.updated_at + timedelta(seconds=get_options()['EXPIRE_AFTER'])
+
+
+def parse_metadata(header):
+    '''
+    parse_metadata - "key base64,key base64" ko'rinishidagi Upload-Metadata sarlavhasini dict ga aylantiradi.
+    '''
+
+    metadata = {}
+
+    for pair in filter(None, (header or '').split(',')):
+        key, _, value = pair.strip().partition(' ')
+
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode() if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise exceptions.ParseError(f"Invalid Upload-Metadata value for '{key}'.")
+
+    return metadata
+
+
+def parse_checksum(header):
+    '''
+    parse_checksum - "sha256 <base64>" ko'rinishidagi Upload-Checksum sarlavhasini (algoritm, digest) qilib qaytaradi.
+    '''
+
+    if not header:
+        return None
+
+    algorithm, _, value = header.strip().partition(' ')
+
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise exceptions.ParseError(f"Unsupported checksum algorithm '{algorithm}'.")
+
+    try:
+        return algorithm, base64.b64decode(value, validate=True)
+    except binascii.Error:
+        raise exceptions.ParseError("Invalid Upload-Checksum value.")
+
+
+class PartFile(File):
+    '''
+    PartFile - FileSystemStorage faylni nusxalash o'rniga ko'chirishi (os.rename) uchun temporary_file_path beradi.
+    '''
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+class locked:
+    '''
+    locked - .part faylini ochib, unga eksklyuziv qulf (flock) qo'yadi. Qulf band bo'lsa UploadLocked.
+    '''
+
+    def __init__(self, upload):
+        self.path = part_path(upload)
+
+    def __enter__(self):
+        try:
+            self.file = open(self.path, 'r+b')
+        except FileNotFoundError:
+            raise exceptions.NotFound("Upload data not found.")
+
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.file.close()
+            raise UploadLocked()
+
+        return self.file
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+
+def create_upload(user, length, metadata):
+    '''
+    create_upload - Upload qatorini va bo'sh .part faylini yaratadi.
+    metadata da filename va lesson (dars ID si) bo'lishi kerak.
+    '''
+
+    if length > get_options()['MAX_SIZE']:
+        raise UploadTooLarge()
+
+    filename = os.path.basename(metadata.get('filename', '').strip())
+    lesson_id = metadata.get('lesson', '')
+
+    if not filename:
+        raise exceptions.ValidationError({'filename': "Upload-Metadata must contain filename."})
+
+    if not lesson_id.isdecimal() or not Lessons.objects.filter(pk=lesson_id).exists():
+        raise exceptions.ValidationError({'lesson': "Upload-Metadata must contain an existing lesson ID."})
+
+    upload = Upload.objects.create(lesson_id=lesson_id, user=user, filename=filename[:255], length=length)
+
+    os.makedirs(temp_dir(), exist_ok=True)
+    open(part_path(upload), 'xb').close()
+
+    if length == 0:
+        with locked(upload) as file:
+            complete_upload(upload, file)
+
+    return upload
+
+
+def append_chunk(upload, stream, offset, checksum=None):
+    '''
+    append_chunk - so'rov tanasini bo'laklab (CHUNK_SIZE) to'g'ridan-to'g'ri .part fayliga yozadi, xotirada saqlamaydi.
+
+    Joriy offset fayl hajmidan olinadi va Upload-Offset ga teng bo'lishi kerak (aks holda 409). Upload-Checksum berilgan
+    bo'lsa, mos kelmagan bo'lak fayldan kesib tashlanadi (460). Oxirgi bo'lakdan keyin LessonFile yaratiladi.
+    '''
+
+    options = get_options()
+
+    with locked(upload) as file:
+        current = os.fstat(file.fileno()).st_size
+
+        if upload.lesson_file_id is not None or offset != current:
+            raise UploadConflict(f"Upload-Offset must be {current}.")
+
+        hasher = CHECKSUM_ALGORITHMS[checksum[0]]() if checksum else None
+        remaining = upload.length - current
+        file.seek(current)
+
+        try:
+            while stream is not None:
+                chunk = stream.read(options['CHUNK_SIZE'])
+
+                if not chunk:
+                    break
+
+                if len(chunk) > remaining:
+                    raise exceptions.ParseError("Chunk exceeds Upload-Length.")
+
+                remaining -= len(chunk)
+                file.write(chunk)
+
+                if hasher is not None:
+                    hasher.update(chunk)
+
+            if hasher is not None and hasher.digest() != checksum[1]:
+                raise ChecksumMismatch()
+        except BaseException as exc:
+            # Rad etilgan yoki checksum bilan tekshirilmagan bo'lak saqlanmaydi, checksum siz uzilgan bo'lak esa saqlanib qoladi
+            if hasher is not None or isinstance(exc, exceptions.APIException):
+                file.truncate(current)
+            else:
+                file.flush()
+                Upload.objects.filter(pk=upload.pk).update(offset=file.tell(), updated_at=timezone.now())
+            raise
+
+        file.flush()
+        os.fsync(file.fileno())
+
+        upload.offset = file.tell()
+        upload.updated_at = timezone.now()
+        Upload.objects.filter(pk=upload.pk).update(offset=upload.offset, updated_at=upload.updated_at)
+
+        if upload.offset == upload.length:
+            complete_upload(upload, file)
+
+    return upload.offset
+
+
+def complete_upload(upload, file):
+    '''
+    complete_upload - .part faylini storage ga ko'chiradi (nusxalamasdan) va LessonFile ni bitta tranzaksiyada yaratadi.
+    Bazaga yozishda xatolik bo'lsa, fayl .part ga qaytariladi va yuklashni yakunlashni qayta urinish mumkin.
+    '''
+
+    lesson_file = LessonFile(lesson_id=upload.lesson_id, name=upload.filename)
+    lesson_file.file.save(upload.filename, PartFile(file, name=upload.filename), save=False)
+
+    try:
+        with transaction.atomic():
+            lesson_file.save()
+            Upload.objects.filter(pk=upload.pk).update(lesson_file=lesson_file, offset=upload.length)
+    except BaseException:
+        # Storage fayli (bir nechta qatorga tegishli blob bo'lishi mumkin) o'zgartirilmaydi, .part ga hard link qilinadi
+        if not os.path.exists(file.name):
+            os.link(lesson_file.file.path, file.name)
+        lesson_file.file.storage.delete(lesson_file.file.name)
+        raise
+
+    upload.lesson_file = lesson_file
+    return lesson_file
+
+
+def delete_upload(upload):
+    if upload.lesson_file_id is not None:
+        upload.delete()
+        return
+
+    with locked(upload):
+        os.remove(part_path(upload))
+        upload.delete()
+
+
+def purge_stale_uploads(max_age=None):
+    '''
+    purge_stale_uploads - max_age (soniya, standart EXPIRE_AFTER) davomida yangilanmagan tugallanmagan yuklashlarni
+    va bazada qatori yo'q .part fayllarni o'chiradi. (qatorlar, fayllar, baytlar) qaytariladi.
+    '''
+
+    max_age = get_options()['EXPIRE_AFTER'] if max_age is None else max_age
+    deadline = timezone.now() - timedelta(seconds=max_age)
+    rows = files = size = 0
+
+    for upload in Upload.objects.filter(lesson_file__isnull=True, updated_at__lt=deadline).iterator():
+        path = part_path(upload)
+
+        try:
+            with locked(upload):
+                size += os.path.getsize(path)
+                os.remove(path)
+                files += 1
+        except UploadLocked:
+            continue
+        except exceptions.NotFound:
+            pass
+
+        upload.delete()
+        rows += 1
+
+    if os.path.isdir(temp_dir()):
+        active = {f'{pk}.part' for pk in Upload.objects.filter(lesson_file__isnull=True).values_list('pk', flat=True)}
+
+        for entry in os.scandir(temp_dir()):
+            if entry.name.endswith('.part') and entry.name not in active and entry.stat().st_mtime < deadline.timestamp():
+                size += entry.stat().st_size
+                os.remove(entry.path)
+                files += 1
+
+    return rows, files, size
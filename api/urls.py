@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import routers
 
+from .async_views import async_urlpatterns
 from .views import *
 
 router = routers.DefaultRouter()
@@ -8,5 +10,9 @@ router.register('courses', CourseViewSet)
 router.register('lessons', LessonViewSet)
 router.register('lesson-files', LessonFileViewSet)
 router.register('comments', CommentViewSet)
+router.register('uploads', UploadViewSet)
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = router.urls
+
+if settings.ASYNC_VIEWS:
+    urlpatterns = async_urlpatterns(router) + urlpatterns
@@ -1,17 +1,32 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework import viewsets, filters, status
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import viewsets, filters, status, exceptions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import permissions
 from rest_framework import generics
 
+from .async_views import AsyncReadMixin
+from .blacklist import token_blacklist, token_digest
+from .cache import CachedResponseMixin
+from .delivery import PassthroughRenderer, serve_file
+from .mixins import BulkMixin, QueryPlanMixin, RetrieveEnvelopeMixin
+from .pagination import CustomCursorPagination, CustomPagination
 from .permissions import *
+from .reactions import react
+from .renderers import EnvelopeResponse, ORJSONRenderer
+from .search import FullTextSearchFilter
 from .serializers import *
+from .threads import thread_response
+from . import uploads
 from .models import *
 
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(CachedResponseMixin, RetrieveEnvelopeMixin, QueryPlanMixin, AsyncReadMixin, viewsets.ModelViewSet):
     '''
     CourseViewSet - Courses modeli ustida CRUD amallarni bajarish uchun ishlaydi.
 
@@ -31,17 +46,8 @@ class CourseViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'created_at']
     throttle_scope = "course"
 
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
-
-        return Response({
-            'data': response.data,
-            'error': None,
-            'success': True
-        }, status=status.HTTP_200_OK)
 
-
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(CachedResponseMixin, RetrieveEnvelopeMixin, QueryPlanMixin, BulkMixin, AsyncReadMixin, viewsets.ModelViewSet):
     '''
     LessonViewSet - Lessons modeli ustida CRUD amallarini bajarish uchun ishlaydi.
 
@@ -49,7 +55,7 @@ class LessonViewSet(viewsets.ModelViewSet):
     Ushbu modelda Search, ordering va DjangoFilterBackend filterlar ishlatilgan.
 
     Namuna:
-        Search: http://localhost:8000/lessons/?search=Python ( ID va TITLE bo'yicha )
+        Search: http://localhost:8000/lessons/?search=Python ( ID, TITLE va DESCRIPTION bo'yicha, to'liq matnli qidiruv )
         Ordering: http://localhost:8000/lessons/?ordering=-id ( ID va CREATED_AT bo'yicha )
         DjangoFilterBackend: http://localhost:8000/lessons/?course=1 ( ID bo'yicha )
 
@@ -63,91 +69,52 @@ class LessonViewSet(viewsets.ModelViewSet):
     Va har bir foydalanuvchi 1 ta lesson uchun faqat 1 marta layk yoki dislike boshishi mumkin.
     Agar avval like bosilgan bolsa, va yana like bosib ko'rsa u like qaytarib olinadi.
     Agar avval like bosib dislike bosilsa, like (-1) qaytarib olinadi va dislike (+1) bosiladi. Bu jarayon huddi shunday davom etaveradi.
+
+    thread - darsdagi izohlarni javoblari bilan birga daraxt ko'rinishida qaytaradi (ThreadPagination).
+
+    Namuna:
+        Thread: http://localhost:8000/lessons/1/thread/?depth=3
+
+    bulk - bir nechta darsni bitta so'rovda yaratish, yangilash va o'chirish (BulkMixin). Bir martada qo'shilgan darslar
+    haqida foydalanuvchilarga bitta email yuboriladi.
+
+    Namuna:
+        Bulk: http://localhost:8000/lessons/bulk/ ( POST, PATCH, DELETE )
     '''
 
     queryset = Lessons.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [IsAdminOrReadOnly]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['course']
-    search_fields = ['id', 'title']
+    search_fields = ['id', 'title', 'description']
     ordering_fields = ['title', 'created_at']
     throttle_scope = 'lesson'
 
     @action(detail=True, methods=['POST'], permission_classes=[permissions.IsAuthenticated])
     def like(self, request, pk=None):
-        lesson = self.get_object()
-        user = request.user
-
-        reaction, created = LessonReaction.objects.get_or_create(lesson=lesson, user=user)
-
-        if not created:
-            if reaction.reaction == 'like':
-                lesson.like -= 1
-                reaction.delete()
-            else:
-                lesson.dislike -= 1
-                lesson.like += 1
-                reaction.reaction = 'like'
-                reaction.save()
-        else:
-            lesson.like += 1
-            reaction.reaction = 'like'
-            reaction.save()
-
-        lesson.save()
-
-        return Response({
-            'data': {
-                'id': int(pk),
-                'like': lesson.like,
-                'dislike': lesson.dislike
-            },
-            'error': None,
-            'success': True
-        }, status=status.HTTP_200_OK)
+        return self.toggle(request, 'like')
 
     @action(detail=True, methods=['POST'], permission_classes=[permissions.IsAuthenticated])
     def dislike(self, request, pk=None):
+        return self.toggle(request, 'dislike')
+
+    @action(detail=True, methods=['GET'])
+    def thread(self, request, pk=None):
         lesson = self.get_object()
-        user = request.user
-
-        reaction, created = LessonReaction.objects.get_or_create(lesson=lesson, user=user)
-
-        if not created:
-            if reaction.reaction == 'dislike':
-                lesson.dislike -= 1
-                reaction.delete()
-            else:
-                lesson.like -= 1
-                lesson.dislike += 1
-                reaction.reaction = 'dislike'
-                reaction.save()
-        else:
-            lesson.dislike += 1
-            reaction.reaction = 'dislike'
-            reaction.save()
-
-        lesson.save()
-
-        return Response({
-            'data': {
-                'id': int(pk),
-                'like': lesson.like,
-                'dislike': lesson.dislike
-            },
-            'error': None,
-            'success': True
-        }, status=status.HTTP_200_OK)
+        queryset = Comments.objects.filter(lesson=lesson, reply__isnull=True)
 
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
+        return thread_response(request, queryset, '', self.get_serializer_context())
 
-        return Response({
-            'data': response.data,
-            'error': None,
-            'success': True
+    def toggle(self, request, reaction):
+        lesson = self.get_object()
+        like, dislike = react(lesson, request.user, reaction)
+
+        return EnvelopeResponse({
+            'id': lesson.pk,
+            'like': like,
+            'dislike': dislike
         }, status=status.HTTP_200_OK)
 
     def perform_create(self, serializer):
@@ -157,7 +124,7 @@ class LessonViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError({"error": "Foydalanuvchi autentifikatsiya qilinmagan!"})
 
 
-class LessonFileViewSet(viewsets.ModelViewSet):
+class LessonFileViewSet(CachedResponseMixin, RetrieveEnvelopeMixin, QueryPlanMixin, BulkMixin, viewsets.ModelViewSet):
     '''
     LessonFileViewSet - Lessons uchun istalgancha media fayllarni yuklash uchun ishlatiladi.
 
@@ -166,9 +133,21 @@ class LessonFileViewSet(viewsets.ModelViewSet):
     Namuna:
         Search: http://localhost:8000/?search=1 ( ID bo'yicha )
         DjangoFilterBackend: http://localhost:8000/?lesson=1 ( ID bo'yicha )
+
+    download - faylni Range (qismlab/davom ettirib yuklash), ETag va Last-Modified bilan qaytaradi.
+    FILE_DELIVERY['MODE'] sozlamasi bo'yicha fayl Django yoki front server (nginx X-Accel-Redirect, X-Sendfile) orqali uzatiladi.
+
+    Namuna:
+        Download: http://localhost:8000/lesson-files/1/download/ ( ?attachment=true - yuklab olish oynasi bilan )
+
+    bulk - bir nechta faylni bitta so'rovda yangilash va o'chirish (BulkMixin). Fayllar uploads orqali yuklanadi,
+    shuning uchun bulk yaratish (POST) yo'q.
+
+    Namuna:
+        Bulk: http://localhost:8000/lesson-files/bulk/ ( PATCH, DELETE )
     '''
 
-    queryset = LessonFile.objects.all().select_related('lesson')
+    queryset = LessonFile.objects.all()
     serializer_class = LessonFileSerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -176,18 +155,17 @@ class LessonFileViewSet(viewsets.ModelViewSet):
     filterset_fields = ['lesson']
     search_fields = ['id']
     throttle_scope = 'lesson-file'
+    bulk_methods = ['patch', 'delete']
 
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
-
-        return Response({
-            'data': response.data,
-            'error': None,
-            'success': True
-        }, status=status.HTTP_200_OK)
+    @action(detail=True, methods=['GET'], renderer_classes=[ORJSONRenderer, PassthroughRenderer])
+    def download(self, request, pk=None):
+        lesson_file = self.get_object()
+        return serve_file(
+            request, lesson_file.file, as_attachment=request.query_params.get('attachment') == 'true', filename=lesson_file.name
+        )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(CachedResponseMixin, RetrieveEnvelopeMixin, QueryPlanMixin, BulkMixin, AsyncReadMixin, viewsets.ModelViewSet):
     '''
     CommentViewSet - Comments modeli ustida CRUD amallarini bajarish uchun ishlatiladi.
     Foydalanuvchilar bir-birini comment'lariga reply qilish imkoniyatiga ham ega.
@@ -195,34 +173,144 @@ class CommentViewSet(viewsets.ModelViewSet):
     Ushbu modelda Search, Ordering va DjangoFilterBackend ishlatilgan.
 
     Namuna:
-        Search: http://localhost:8000/?search=1 ( ID va TEXT bo'yicha )
+        Search: http://localhost:8000/?search=1 ( ID va TEXT bo'yicha, to'liq matnli qidiruv )
         Ordering: http://localhost:8000/?ordering=-id ( ID va CREATED_AT bo'yicha )
         DjangoFilterBackend: http://localhost:8000/?lesson=1 ( ID bo'yicha )
+
+    Paginatsiya cursor (keyset) orqali ishlaydi: keyingi sahifa javobdagi next havolasi bilan olinadi. ?search= berilganda
+    natija search_rank bo'yicha saralanadi, cursor esa tartibni created_at ga almashtirib yuborgani uchun sahifa raqami
+    bilan paginatsiya (search_pagination_class) ishlatiladi.
+
+    thread - izohga yozilgan javoblarni daraxt ko'rinishida qaytaradi. Dars izohlari daraxtida has_more_replies
+    bo'lgan tugunlarning davomi shu endpoint orqali olinadi.
+
+    Namuna:
+        Thread: http://localhost:8000/comments/1/thread/?depth=3
+
+    bulk - bir nechta izohni bitta so'rovda yaratish, yangilash va o'chirish (BulkMixin).
+
+    Namuna:
+        Bulk: http://localhost:8000/comments/bulk/ ( POST, PATCH, DELETE )
     '''
 
-    queryset = Comments.objects.all().select_related('reply', 'lesson', 'author')
+    queryset = Comments.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CustomCursorPagination
+    search_pagination_class = CustomPagination
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['lesson']
     search_fields = ['id', 'text']
     ordering_fields = ['id', 'created_at']
     throttle_scope = 'comment'
 
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            searching = request is not None and request.query_params.get(FullTextSearchFilter.search_param, '').strip()
+            self._paginator = (self.search_pagination_class if searching else self.pagination_class)()
 
-        return Response({
-            'data': response.data,
-            'error': None,
-            'success': True
-        }, status=status.HTTP_200_OK)
+        return self._paginator
+
+    @action(detail=True, methods=['GET'])
+    def thread(self, request, pk=None):
+        comment = self.get_object()
+        queryset = Comments.objects.filter(reply=comment)
+
+        return thread_response(request, queryset, comment.subtree_path, self.get_serializer_context())
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
+class UploadViewSet(viewsets.GenericViewSet):
+    '''
+    UploadViewSet - katta fayllarni (tus protokoli uslubida) bo'laklab va uzilgan joyidan davom ettirib yuklash uchun ishlatiladi.
+    Faqat adminlar uchun. Yuklash tugaganda avtomatik ravishda LessonFile yaratiladi.
+
+    Namuna:
+        Yaratish: POST http://localhost:8000/uploads/
+            Upload-Length: 1073741824
+            Upload-Metadata: filename bGVjdHVyZS5tcDQ=,lesson MQ== ( qiymatlar base64 da )
+        Holati: HEAD http://localhost:8000/uploads/<id>/ ( Upload-Offset sarlavhasida yuklangan baytlar soni )
+        Bo'lak: PATCH http://localhost:8000/uploads/<id>/
+            Content-Type: application/offset+octet-stream
+            Upload-Offset: 0
+            Upload-Checksum: sha256 <base64> ( ixtiyoriy )
+        Bekor qilish: DELETE http://localhost:8000/uploads/<id>/
+    '''
+
+    queryset = Upload.objects.all()
+    serializer_class = UploadSerializer
+    permission_classes = [permissions.IsAdminUser]
+    throttle_scope = 'upload'
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def get_upload_headers(self, upload):
+        return {
+            'Upload-Offset': str(upload.offset),
+            'Upload-Length': str(upload.length),
+            'Upload-Expires': http_date(uploads.expires_at(upload).timestamp()),
+            'Cache-Control': 'no-store',
+        }
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        response['Tus-Resumable'] = uploads.TUS_VERSION
+
+        if request.method == 'OPTIONS':
+            response['Tus-Version'] = uploads.TUS_VERSION
+            response['Tus-Extension'] = uploads.TUS_EXTENSIONS
+            response['Tus-Max-Size'] = str(uploads.get_options()['MAX_SIZE'])
+            response['Tus-Checksum-Algorithm'] = ','.join(uploads.CHECKSUM_ALGORITHMS)
+
+        return response
+
+    def create(self, request, *args, **kwargs):
+        length = request.META.get('HTTP_UPLOAD_LENGTH', '')
+
+        if not length.isdecimal():
+            raise serializers.ValidationError({'Upload-Length': "A non-negative integer is required."})
+
+        upload = uploads.create_upload(
+            request.user, int(length), uploads.parse_metadata(request.META.get('HTTP_UPLOAD_METADATA'))
+        )
+
+        return EnvelopeResponse(self.get_serializer(upload).data, status=status.HTTP_201_CREATED, headers={
+            'Location': request.build_absolute_uri(reverse('upload-detail', args=[upload.pk])),
+            **self.get_upload_headers(upload),
+        })
+
+    def retrieve(self, request, *args, **kwargs):
+        upload = self.get_object()
+
+        return EnvelopeResponse(self.get_serializer(upload).data, status=status.HTTP_200_OK, headers=self.get_upload_headers(upload))
+
+    def partial_update(self, request, *args, **kwargs):
+        upload = self.get_object()
+        offset = request.META.get('HTTP_UPLOAD_OFFSET', '')
+
+        if request.content_type != 'application/offset+octet-stream':
+            raise exceptions.UnsupportedMediaType(request.content_type)
+
+        if not offset.isdecimal():
+            raise serializers.ValidationError({'Upload-Offset': "A non-negative integer is required."})
+
+        uploads.append_chunk(
+            upload, request.stream, int(offset), uploads.parse_checksum(request.META.get('HTTP_UPLOAD_CHECKSUM'))
+        )
+
+        return Response(status=status.HTTP_204_NO_CONTENT, headers=self.get_upload_headers(upload))
+
+    def destroy(self, request, *args, **kwargs):
+        uploads.delete_upload(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class RegisterView(generics.CreateAPIView):
     '''
     RegisterView - CreateAPIView dan meros olingan holatda ishlaydi.
@@ -239,11 +327,7 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
-        return Response({
-            'data': serializer.data,
-            'error': None,
-            'success': True
-        }, status=status.HTTP_201_CREATED)
+        return EnvelopeResponse(serializer.data, status=status.HTTP_201_CREATED)
 
 
 class LogoutView(generics.GenericAPIView):
@@ -263,8 +347,9 @@ class LogoutView(generics.GenericAPIView):
             token = RefreshToken(refresh)
             token.blacklist()
 
-            access = str(request.auth)
-            BlacklistedToken.objects.create(token=access)
+            digest = token_digest(request.auth[api_settings.JTI_CLAIM])
+            BlacklistedToken.objects.create(jti_hash=digest, expires_at=datetime_from_epoch(request.auth['exp']))
+            token_blacklist.add(digest)
 
             return Response({
                 'error': None,
@@ -273,10 +358,7 @@ class LogoutView(generics.GenericAPIView):
 
         except Exception as e:
             return Response({
-                'error': {
-                    'errorId': status.HTTP_400_BAD_REQUEST,
-                    'isFriendly': True,
-                    'errorMsg': "Bad request."
-                },
-                'success': False
+                'errorId': status.HTTP_400_BAD_REQUEST,
+                'isFriendly': True,
+                'errorMsg': "Bad request."
             }, status=status.HTTP_400_BAD_REQUEST)
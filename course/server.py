@@ -0,0 +1,91 @@
+"""
+Gunicorn configuration for the production run mode.
+
+Usage:
+    python manage.py collectstatic --noinput
+    gunicorn -c python:course.server
+
+Every setting can be overridden with a GUNICORN_* environment variable, e.g.
+GUNICORN_WORKERS=4 or, for ASGI with the async read views,
+ASYNC_VIEWS=true GUNICORN_APP=course.asgi:application GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker
+(uvicorn and uvicorn-worker are in requirements.txt).
+
+Signals (sent to the master process):
+    HUP   - graceful reload: new workers are started, old ones finish their requests and exit.
+            With preload_app the application code is loaded once in the master, so code changes
+            need a full restart (or USR2 + QUIT for a zero-downtime binary upgrade).
+    TTIN / TTOU - add / remove one worker.
+    TERM  - graceful shutdown within graceful_timeout.
+
+Load test (compare with runserver using the same data, throttle rates raised for the run):
+    python manage.py runserver 0.0.0.0:8001
+    GUNICORN_BIND=0.0.0.0:8002 gunicorn -c python:course.server
+    python manage.py loadtest --concurrency 16 --requests 2000 --url http://127.0.0.1:8001/api/v1/courses/
+    python manage.py loadtest --concurrency 16 --requests 2000 --url http://127.0.0.1:8002/api/v1/courses/
+Run the load generator on a separate machine, the numbers depend on the CPU count and the database.
+No before/after throughput has been measured for this configuration yet (WSGI or ASGI); record the
+loadtest output here once it has been run against a production-like database.
+
+For more information on this file, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import multiprocessing
+import os
+
+
+def env(name, default, cast=str):
+    value = os.environ.get(f'GUNICORN_{name}')
+    return default if value is None else cast(value)
+
+
+wsgi_app = env('APP', 'course.wsgi:application')
+bind = env('BIND', '0.0.0.0:8000')
+
+# (2 x CPU) + 1 - sync workerlar uchun tavsiya etilgan qiymat
+workers = env('WORKERS', multiprocessing.cpu_count() * 2 + 1, int)
+worker_class = env('WORKER_CLASS', 'sync')
+threads = env('THREADS', 1, int)
+
+# Ilova master jarayonda bir marta yuklanadi, workerlar fork orqali xotirani bo'lishadi
+preload_app = env('PRELOAD', 'true').lower() == 'true'
+
+# Xotira sizib chiqishining oldini olish uchun workerlar shuncha so'rovdan keyin qayta ishga tushiriladi,
+# jitter esa ularning bir vaqtda qayta ishga tushishiga yo'l qo'ymaydi
+max_requests = env('MAX_REQUESTS', 1000, int)
+max_requests_jitter = env('MAX_REQUESTS_JITTER', 100, int)
+
+timeout = env('TIMEOUT', 30, int)
+graceful_timeout = env('GRACEFUL_TIMEOUT', 30, int)
+keepalive = env('KEEPALIVE', 5, int)
+
+accesslog = env('ACCESS_LOG', '-')
+errorlog = env('ERROR_LOG', '-')
+loglevel = env('LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    '''
+    post_fork - preload_app da master jarayonda ochilgan baza ulanishlari workerlar orasida bo'lishilmasligi uchun yopiladi,
+    fork dan keyin yo'qoladigan fon oqimlari (token_sweeper) esa har bir workerda qayta ishga tushiriladi.
+    '''
+
+    from django.db import connections
+
+    from api.blacklist import token_sweeper
+
+    connections.close_all()
+    token_sweeper.start()
+
+
+def worker_exit(server, worker):
+    '''
+    worker_exit - worker qayta ishga tushirilishi (max_requests, HUP) yoki to'xtatilishidan oldin
+    xotirada yig'ilgan reaksiyalar bazaga yoziladi va media jarayonlari hovuzi yopiladi.
+    '''
+
+    from api.media import media_processor
+    from api.reactions import reaction_buffer
+
+    reaction_buffer.flush()
+    media_processor.shutdown()
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -45,8 +46,20 @@ INSTALLED_APPS = [
     'drf_yasg',
 ]
 
+# Async list/retrieve (api.async_views) - ASGI da (course.asgi) ishga tushirilganda yoqiladi
+
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'false').lower() == 'true'
+
+# WhiteNoise faqat sinxron middleware, ASGI da u har bir so'rov uchun oqim band qiladi. Shuning uchun ASYNC_VIEWS
+# rejimida u ro'yxatga kirmaydi (barcha middleware lar async), static fayllarni esa front server beradi:
+# nginx uchun: location /static/ { alias /rest-framework/staticfiles/; }
+
+STATIC_MIDDLEWARE = [] if ASYNC_VIEWS else ['whitenoise.middleware.WhiteNoiseMiddleware']
+
 MIDDLEWARE = [
+    'api.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    *STATIC_MIDDLEWARE,
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,6 +92,14 @@ WSGI_APPLICATION = 'course.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Ulanishlarni qayta ishlatish muhit o'zgaruvchilari orqali sozlanadi:
+# DB_CONN_MAX_AGE - ulanish necha soniya qayta ishlatiladi (0 - har so'rovda yangi ulanish, "none" - cheklanmagan)
+# DB_CONN_HEALTH_CHECKS - qayta ishlatishdan oldin ulanish tekshiriladi
+# DB_POOL=true - psycopg 3 connection pool (bunda CONN_MAX_AGE 0 bo'ladi), DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT
+
+DB_POOL = os.environ.get('DB_POOL', 'false').lower() == 'true'
+DB_CONN_MAX_AGE = os.environ.get('DB_CONN_MAX_AGE', '60')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -87,6 +108,15 @@ DATABASES = {
         'PASSWORD': "12345678",
         'HOST': "db",
         'PORT': "5432",
+        'CONN_MAX_AGE': 0 if DB_POOL else None if DB_CONN_MAX_AGE.lower() == 'none' else int(DB_CONN_MAX_AGE),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            },
+        } if DB_POOL else {},
     }
 }
 
@@ -97,15 +127,17 @@ DATABASES = {
 REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': "api.exceptions.exception",
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
 
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
 
+    # list, retrieve va xatolik javoblari render paytida {data, error, success} konvertiga o'raladi (api.renderers).
+    # orjson o'rnatilmagan bo'lsa ORJSONRenderer standart json ga qaytadi, EnvelopeJSONRenderer esa doim json ishlatadi.
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'api.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -115,16 +147,34 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.ScopedRateThrottle',
+        'api.throttling.SharedScopedRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'course': '60/minute',
         'lesson': '60/minute',
         'lesson-file': '60/minute',
-        'comment': '60/minute'
+        'comment': '60/minute',
+        'upload': '600/minute'
     }
 }
 
+# Bulk endpointlar (/lessons/bulk/, /lesson-files/bulk/, /comments/bulk/, api.mixins.BulkMixin)
+# MAX_ITEMS - bitta so'rovdagi elementlar soni
+
+BULK_WRITE = {
+    'MAX_ITEMS': 500,
+}
+
+
+# JWT foydalanuvchi keshi (api.authentication.CachedJWTAuthentication)
+# TTL - boshqa jarayonlarda o'zgargan foydalanuvchi (masalan bloklangan) shuncha soniyagacha eski holatda qolishi mumkin
+
+AUTH_USER_CACHE = {
+    'TTL': 30,
+    'MAX_SIZE': 10000,
+}
+
+
 # JWT token settings
 # https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html
 
@@ -169,6 +219,69 @@ SIMPLE_JWT = {
 }
 
 
+# Throttle counters store (api.throttling.SharedScopedRateThrottle)
+# Standart SQLiteThrottleStore bitta server ichida (barcha gunicorn workerlar uchun) umumiy, lekin har bir server
+# (konteyner) o'z faylini ishlatadi: bir nechta serverda limitlar global emas, har bir server uchun alohida bo'ladi.
+# Global limit uchun CACHES da umumiy kesh (Redis, Memcached) sozlang va CacheThrottleStore ishlating:
+# {'BACKEND': 'api.throttling.CacheThrottleStore', 'OPTIONS': {'alias': 'default'}}
+
+THROTTLE_STORE = {
+    'BACKEND': 'api.throttling.SQLiteThrottleStore',
+    'OPTIONS': {'path': BASE_DIR / 'throttle.sqlite3'},
+}
+
+
+# API response cache (api.cache.CachedResponseMixin)
+# Kalitlar modellar versiyasiga (api.models.ModelVersion) bog'liq, shuning uchun eskirgan javob qaytmaydi
+
+API_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+
+# Access token blacklist (api.blacklist.TokenBlacklist)
+# Har bir jarayonda BlacklistedToken jadvalining Bloom filter nusxasi saqlanadi
+# REFRESH_INTERVAL - logout boshqa jarayonlarda (workerlar, serverlar) shuncha soniyagacha kechikib kuchga kiradi
+# SWEEP_INTERVAL - muddati tugagan tokenlarni jarayon ichida tozalash oralig'i (soniya), None - o'chirilgan
+
+TOKEN_BLACKLIST = {
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.001,
+    'REFRESH_INTERVAL': 1,
+    'WATERMARK_OVERLAP': 5,
+    'REBUILD_INTERVAL': 3600,
+    'SWEEP_INTERVAL': None,
+    'SWEEP_BATCH_SIZE': 1000,
+}
+
+
+# Request profiling (api.profiling.ProfilingMiddleware)
+# SAMPLE_RATE - SQL va bosqichlari yoziladigan so'rovlar ulushi (0..1), SERVER_TIMING - natijani Server-Timing sarlavhasida qaytarish
+# SLOW_REQUEST_MS - har qanday so'rov bu chegaradan oshsa api.profiling loggeriga yoziladi (tanlanganlari SQL lari bilan)
+# SLOW_QUERY_COUNT, DUPLICATE_QUERIES - tanlangan so'rovlar uchun SQL chegaralari
+
+PROFILING = {
+    'ENABLED': os.environ.get('PROFILING', 'false').lower() == 'true',
+    'SAMPLE_RATE': 0.01,
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_QUERY_COUNT': 50,
+    'DUPLICATE_QUERIES': 5,
+    'MAX_LOGGED_QUERIES': 20,
+}
+
+
+# Like/dislike write-behind buffer (api.reactions.ReactionBuffer)
+# ENABLED - reaksiyalarni xotirada yig'ib, har FLUSH_INTERVAL soniyada bazaga bulk yozadi
+
+REACTION_BUFFER = {
+    'ENABLED': False,
+    'FLUSH_INTERVAL': 2,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -202,12 +315,70 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Static fayllar WhiteNoise orqali (gzip/brotli bilan siqilgan, nomida hash bo'lgan va uzoq muddat keshlanadigan) beriladi,
+# ASGI (ASYNC_VIEWS) rejimida esa front server orqali (STATIC_MIDDLEWARE)
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Media files
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# LessonFile download endpoint (api.delivery.serve_file)
+# MODE: 'django' - fayl Django orqali bo'laklab uzatiladi, 'x-accel-redirect' - nginx, 'x-sendfile' - Apache/lighttpd
+# nginx uchun: location /protected-media/ { internal; alias /rest-framework/media/; }
+
+FILE_DELIVERY = {
+    'MODE': 'django',
+    'ACCEL_PREFIX': '/protected-media/',
+    'CHUNK_SIZE': 64 * 1024,
+    'MAX_AGE': 3600,
+}
+
+# Resumable uploads (api.uploads)
+# TEMP_DIR - yuklanayotgan .part fayllar papkasi (None - MEDIA_ROOT/uploads, fayl oxirida ko'chirilishi uchun bitta diskda bo'lgani yaxshi)
+# EXPIRE_AFTER - shuncha soniya yangilanmagan yuklashlar purge_stale_uploads orqali o'chiriladi
+
+UPLOADS = {
+    'TEMP_DIR': None,
+    'MAX_SIZE': 10 * 1024 ** 3,
+    'CHUNK_SIZE': 1024 * 1024,
+    'EXPIRE_AFTER': 24 * 3600,
+}
+
+# Content-addressed storage for LessonFile (api.storage.ContentAddressedStorage)
+# GRACE_PERIOD - yaqinda saqlangan blob shuncha soniya o'chirilmaydi (parallel yuklashlar uchun)
+
+CONTENT_STORAGE = {
+    'GRACE_PERIOD': 3600,
+    'CHUNK_SIZE': 1024 * 1024,
+}
+
+# Media processing for LessonFile (api.media)
+# MODE - 'worker' (alohida process_media --watch workeri), 'process' (har bir API jarayonidagi jarayonlar hovuzi,
+# bitta jarayonli serverlar uchun), 'sync' (shu jarayonda, testlar uchun) yoki None (o'chirilgan)
+# WORKERS - 'process' rejimida har bir API jarayonidagi hovuz hajmi
+# SIZES - rasm nusxalarining eng katta tomoni (px), TRANSCODE - videoning 480p nusxasini yaratish (ffmpeg kerak)
+# TIMEOUT - har bir tashqi dastur (ffmpeg, ffprobe, pdftoppm, pdfinfo) uchun soniyalarda
+
+MEDIA_PROCESSING = {
+    'MODE': 'worker',
+    'WORKERS': 2,
+    'SIZES': [256, 640, 1280],
+    'TRANSCODE': False,
+    'TIMEOUT': 300,
+}
+
 # Django to send emails with SMTP
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'